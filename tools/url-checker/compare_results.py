@@ -0,0 +1,198 @@
+# =============================================================================
+# Compare URL Checker Results Against a Ground-Truth Manifest
+# =============================================================================
+# This script compares the JSON results of a URL checker run (--json-output)
+# with the manifest written by create_test_files.py, and reports how accurately
+# broken links were detected (precision/recall) and how fast the run was.
+# =============================================================================
+
+import os
+import sys
+import json
+import argparse
+from collections import defaultdict
+
+# ANSI color codes for terminal output
+class Colors:
+    OKGREEN = '\033[92m'  # Green for success
+    FAIL = '\033[91m'     # Red for errors
+    INFO = '\033[96m'     # Cyan for neutral/informational
+    NEUTRAL = '\033[93m'  # Yellow for warnings
+    ENDC = '\033[0m'      # Reset color
+
+# Characters the URL extractor may leave around a link
+URL_STRIP_CHARS = '"\''
+URL_TRAILING_CHARS = '.,;:)'
+
+def parse_arguments():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Compare URL checker results against a ground-truth manifest.")
+    parser.add_argument(
+        "--manifest",
+        required=True,
+        help="Manifest written by create_test_files.py"
+    )
+    parser.add_argument(
+        "--results",
+        required=True,
+        help="JSON results written by url_checker.py --json-output"
+    )
+    parser.add_argument(
+        "--json-output",
+        help="Also write the comparison metrics as JSON to this file"
+    )
+    parser.add_argument(
+        "--min-precision",
+        type=float,
+        help="Exit with status 1 if broken-link precision is below this value (0-1)"
+    )
+    parser.add_argument(
+        "--min-recall",
+        type=float,
+        help="Exit with status 1 if broken-link recall is below this value (0-1)"
+    )
+    return parser.parse_args()
+
+def normalize_url(url):
+    """Normalize a URL so manifest and result entries for the same link compare equal."""
+    return url.strip().strip(URL_STRIP_CHARS).rstrip(URL_TRAILING_CHARS)
+
+def normalize_category(category):
+    """Map a URL checker result category to the manifest's category names."""
+    status, _, name = category.partition('_')
+    if name.startswith('relative_'):
+        name = 'relative'
+    return ('broken' if status == 'broken' else 'ok'), name
+
+def load_manifest(manifest_path):
+    """
+    Load a manifest written by create_test_files.py.
+
+    Returns:
+        Tuple containing: (header, links)
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        links = [json.loads(line) for line in f if line.strip()]
+    return header, links
+
+def load_results(results_path):
+    """Load JSON results written by url_checker.py --json-output."""
+    with open(results_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def safe_ratio(numerator, denominator):
+    """Divide, returning None when the denominator is zero."""
+    return numerator / denominator if denominator else None
+
+def format_ratio(value):
+    """Format a ratio as a percentage, or n/a if undefined."""
+    return "n/a" if value is None else f"{value * 100:.1f}%"
+
+def compare(header, manifest_links, results):
+    """
+    Match every planted link to the checker's result for it and compute metrics.
+
+    Links are matched by source file (relative to the test directory) and URL.
+    A file can contain the same URL several times, so results are matched as a
+    multiset: each result is used for at most one planted link.
+
+    Returns:
+        Dictionary of metrics
+    """
+    root = os.path.realpath(header['root'])
+
+    # Results per (file, url), in the order they were reported
+    reported = defaultdict(list)
+    for record in results['links']:
+        file_path = os.path.relpath(os.path.realpath(record['file']), root).replace(os.sep, '/')
+        reported[(file_path, normalize_url(record['url']))].append(normalize_category(record['category']))
+
+    counts = defaultdict(int)
+    category_mismatches = 0
+    for link in manifest_links:
+        expected = link['expected_status']
+        matches = reported.get((link['file'], normalize_url(link['url'])))
+        if not matches:
+            counts['not_reported'] += 1
+            # A planted broken link the checker never reported is a missed detection
+            if expected == 'broken':
+                counts['false_negative'] += 1
+            continue
+        status, category = matches.pop(0)
+        if category != link['category']:
+            category_mismatches += 1
+        if expected == 'unknown':
+            counts['unknown'] += 1
+        elif expected == 'broken':
+            counts['true_positive' if status == 'broken' else 'false_negative'] += 1
+        else:
+            counts['false_positive' if status == 'broken' else 'true_negative'] += 1
+
+    # Results that do not correspond to a planted link (e.g. links in template boilerplate)
+    unplanted = sum(len(matches) for matches in reported.values())
+
+    runtime = results.get('runtime_seconds') or 0
+    return {
+        'planted_links': len(manifest_links),
+        'checked_links': len(results['links']),
+        'true_positive': counts['true_positive'],
+        'false_positive': counts['false_positive'],
+        'true_negative': counts['true_negative'],
+        'false_negative': counts['false_negative'],
+        'unknown': counts['unknown'],
+        'not_reported': counts['not_reported'],
+        'unplanted_results': unplanted,
+        'category_mismatches': category_mismatches,
+        'precision': safe_ratio(counts['true_positive'], counts['true_positive'] + counts['false_positive']),
+        'recall': safe_ratio(counts['true_positive'], counts['true_positive'] + counts['false_negative']),
+        'runtime_seconds': runtime,
+        'links_per_second': safe_ratio(len(results['links']), runtime),
+    }
+
+def print_metrics(metrics):
+    """Print the comparison metrics."""
+    print(f"\n{Colors.INFO}=== Ground-Truth Comparison ==={Colors.ENDC}")
+    print(f"Planted links:        {metrics['planted_links']}")
+    print(f"Checked links:        {metrics['checked_links']}")
+    print(f"{Colors.OKGREEN}Correctly broken:     {metrics['true_positive']}{Colors.ENDC}")
+    print(f"{Colors.OKGREEN}Correctly OK:         {metrics['true_negative']}{Colors.ENDC}")
+    print(f"{Colors.FAIL}False positives:      {metrics['false_positive']} (OK links reported broken){Colors.ENDC}")
+    print(f"{Colors.FAIL}False negatives:      {metrics['false_negative']} (broken links reported OK or not reported){Colors.ENDC}")
+    print(f"{Colors.NEUTRAL}Unknown expectation:  {metrics['unknown']}{Colors.ENDC}")
+    print(f"{Colors.NEUTRAL}Not reported:         {metrics['not_reported']}{Colors.ENDC}")
+    print(f"{Colors.NEUTRAL}Category mismatches:  {metrics['category_mismatches']}{Colors.ENDC}")
+    print(f"Unplanted results:    {metrics['unplanted_results']} (template boilerplate links, not in the manifest)")
+    print(f"\nPrecision (broken):   {format_ratio(metrics['precision'])}")
+    print(f"Recall (broken):      {format_ratio(metrics['recall'])}")
+    throughput = metrics['links_per_second']
+    print(f"Throughput:           {'n/a' if throughput is None else f'{throughput:.1f} links/s'}"
+          f" ({metrics['runtime_seconds']:.1f}s)")
+
+def main():
+    """Compare results against the manifest and report accuracy and throughput."""
+    args = parse_arguments()
+
+    header, manifest_links = load_manifest(args.manifest)
+    results = load_results(args.results)
+    if results.get('shard'):
+        print(f"{Colors.NEUTRAL}Warning: results are from shard {results['shard']} only - merge shards first for full recall{Colors.ENDC}")
+
+    metrics = compare(header, manifest_links, results)
+    print_metrics(metrics)
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump(metrics, f, indent=1)
+        print(f"Metrics written to: {args.json_output}")
+
+    # Fail if accuracy is below the requested thresholds
+    failed = False
+    for name, minimum in (('precision', args.min_precision), ('recall', args.min_recall)):
+        if minimum is not None and (metrics[name] is None or metrics[name] < minimum):
+            print(f"{Colors.FAIL}{name.capitalize()} {format_ratio(metrics[name])} is below {minimum * 100:.1f}%{Colors.ENDC}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ containing different kinds of URLs to test the URL checker.
 """
 
 import os
+import re
+import json
 import random
 import string
 import shutil
 import argparse
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from colorama import init, Fore, Style  # Add colorama import
 
@@ -23,11 +27,20 @@ class Colors:
     NEUTRAL = Fore.YELLOW
     ENDC = Style.RESET_ALL
 
+# Every directory created so far - maintained incrementally so picking a random
+# directory never needs to walk the test tree again
+ALL_DIRS = []
+_KNOWN_DIRS = set()
+
 def ensure_directory(directory):
-    """Creates a directory if it doesn't exist."""
+    """Creates a directory if it doesn't exist and records it in ALL_DIRS."""
+    if directory in _KNOWN_DIRS:
+        return
     if not os.path.exists(directory):
         os.makedirs(directory)
         print(f"Created directory: {directory}")
+    _KNOWN_DIRS.add(directory)
+    ALL_DIRS.append(directory)
 
 def parse_args():
     """Parse command-line arguments."""
@@ -57,15 +70,55 @@ def parse_args():
         choices=[1, 2, 3, 4, 5],
         help="Complexity level of directory structure (1=simple, 5=very complex)"
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="Random seed - the same seed and options always produce the same test tree"
+    )
+    parser.add_argument(
+        "--target-files",
+        type=int,
+        help="Total number of files to create (overrides --file-count, keeps the mix of file types)"
+    )
+    parser.add_argument(
+        "--target-links",
+        type=int,
+        help="Total number of links to plant - files are padded with extra links to reach it"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=min(32, (os.cpu_count() or 1) * 4),
+        help="Number of threads used to write files"
+    )
+    parser.add_argument(
+        "--manifest",
+        help="Ground-truth manifest of every planted link (default: <dir>_manifest.jsonl next to the test directory)"
+    )
+    parser.add_argument(
+        "--server",
+        help="Base URL of test_server.py (e.g. http://localhost:8800) - absolute links target its endpoints instead of real sites"
+    )
+    parser.add_argument(
+        "--tls-error-server",
+        help="Base URL of test_server.py's TLS error port (e.g. https://localhost:8844), planted as broken links"
+    )
     return parser.parse_args()
 
 # Parse arguments
 args = parse_args()
 
+# Seed the generator so benchmark corpora are reproducible
+if args.seed is not None:
+    random.seed(args.seed)
+
 # Configuration
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 TEST_ROOT = os.path.join(SCRIPT_DIR, args.dir)
 TEST_SIZE = args.file_count
+MANIFEST_PATH = args.manifest or f"{TEST_ROOT.rstrip(os.sep)}_manifest.jsonl"
+# Kept outside the test root, since the URL checker also scans .toml files
+SKIP_RULES_PATH = f"{TEST_ROOT.rstrip(os.sep)}_skip_rules.toml"
 COMPLEXITY = args.complexity
 
 # Adjust file counts based on the desired test size
@@ -94,12 +147,20 @@ NUM_FILES = {
 for key in NUM_FILES:
     NUM_FILES[key] = int(NUM_FILES[key])
 
+# Scale mode settings
+FILES_PER_DIRECTORY = 200   # Extra directories are added so directories stay around this size
+WRITE_BATCH_SIZE = 500      # Files handed to a writer thread at a time
+
 def clean_test_directory():
     """Remove existing test files and directories."""
     if os.path.exists(TEST_ROOT):
         print(f"Cleaning up existing test directory: {TEST_ROOT}")
         shutil.rmtree(TEST_ROOT)
         print(f"Removed {TEST_ROOT}")
+    for path in (MANIFEST_PATH, SKIP_RULES_PATH):
+        if os.path.exists(path):
+            os.remove(path)
+            print(f"Removed {path}")
 
 # Clean up if requested
 if args.clean:
@@ -219,6 +280,42 @@ INVALID_URLS = [
     "https://broken.link.example",
 ]
 
+# test_server.py endpoints with a deterministic result for the URL checker
+SERVER_OK_ENDPOINTS = [
+    "/ok",
+    "/slow/250",      # Slow, but well within the read timeout
+    "/redirect/3",    # Redirect chain ending at 200
+    "/no-head",       # HEAD is rejected, GET succeeds
+    "/huge/16",       # 16 MiB body - only the headers should be read
+    "/flaky/1",       # 503 once, then 200 on retry
+]
+SERVER_BROKEN_ENDPOINTS = [
+    "/status/404",
+    "/status/500",
+    "/status/502",    # Temporary error on every retry
+    "/status/503",
+    "/ratelimit/1",   # 429 with Retry-After on every retry
+    "/loop",          # Redirect loop
+]
+
+# Point the absolute links at a local test server instead of real sites
+if args.server:
+    server_base = args.server.rstrip('/')
+    VALID_URLS = [server_base + endpoint for endpoint in SERVER_OK_ENDPOINTS]
+    INVALID_URLS = [server_base + endpoint for endpoint in SERVER_BROKEN_ENDPOINTS]
+    if args.tls_error_server:
+        INVALID_URLS.append(args.tls_error_server.rstrip('/') + "/ok")
+
+# Server URLs get a unique query string so every planted link is a separate request
+UNIQUE_URL_COUNTER = itertools.count(1)
+
+def choose_absolute_url(urls):
+    """Choose an absolute URL, made unique when targeting a test server."""
+    url = random.choice(urls)
+    if args.server:
+        url = f"{url}?n={next(UNIQUE_URL_COUNTER)}"
+    return url
+
 # Generate random words for titles
 def random_word(length=8):
     """Generate a random word of specified length."""
@@ -238,7 +335,7 @@ This is a sample markdown file with various links:
 Read more about [this topic]({url_2}).
 
 ![Logo](assets/images/logo.png)
-"""
+{extra_links}"""
 
 HTML_TEMPLATE = """<!DOCTYPE html>
 <html>
@@ -252,7 +349,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
     <p>Visit our <a href="{url_2}">website</a>.</p>
     <img src="{relative_url}" alt="Sample Image">
     <script src="src/utils/main.js"></script>
-</body>
+{extra_links}</body>
 </html>
 """
 
@@ -271,7 +368,7 @@ body {{
 }}
 
 /* Imported from {url_2} */
-"""
+{extra_links}"""
 
 JS_TEMPLATE = """// {title}
 import {{ Component }} from 'library';
@@ -287,7 +384,7 @@ function fetchData() {{
 
 // Reference: {url_2}
 document.getElementById('link').href = './assets/document.pdf';
-"""
+{extra_links}"""
 
 PY_TEMPLATE = """# {title}
 import requests
@@ -306,7 +403,7 @@ def fetch_data():
 
 # Load configuration from {relative_url}
 config_path = os.path.join("config", "settings.json")
-"""
+{extra_links}"""
 
 JSON_TEMPLATE = """{{
     "name": "{title}",
@@ -315,6 +412,8 @@ JSON_TEMPLATE = """{{
     "homepage": "{url_1}",
     "documentation": "{url_2}",
     "logo": "{relative_url}",
+    "references": [
+{extra_links}    ],
     "dependencies": {{
         "library": "^2.0.0"
     }}
@@ -331,6 +430,8 @@ urls:
   docs: {url_2}
   logo: {relative_url}
 
+references:
+{extra_links}
 dependencies:
   - name: library
     version: ^2.0.0
@@ -346,7 +447,7 @@ XML_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
     <links>
         <link href="{url_2}" rel="external" />
         <image src="{relative_url}" />
-    </links>
+{extra_links}    </links>
 </root>
 """
 
@@ -357,7 +458,7 @@ This is a sample text file with URLs:
 Website: {url_1}
 Documentation: {url_2}
 Local file: {relative_url}
-
+{extra_links}
 End of file.
 """
 
@@ -379,7 +480,7 @@ curl -H "Content-Type: application/json" -X GET $API_URL
 
 # Common pattern in scripts - URLs in comments
 # See: {url_2}
-"""
+{extra_links}"""
 
 PS1_TEMPLATE = """# {title}
 # PowerShell script example
@@ -398,7 +499,7 @@ Import-Module "{relative_url}"
 
 # URL in a variable
 $ApiUrl = "{url_2}/api/v1"
-"""
+{extra_links}"""
 
 BAT_TEMPLATE = """@echo off
 REM {title}
@@ -418,7 +519,7 @@ echo %API_URL%
 
 REM Reference in comment
 REM See: {url_2}
-"""
+{extra_links}"""
 
 RB_TEMPLATE = """#!/usr/bin/env ruby
 # {title}
@@ -439,7 +540,7 @@ url = '{url_2}'
 uri = URI.parse(url)
 
 # Reference: {url_1}/docs
-"""
+{extra_links}"""
 
 PL_TEMPLATE = """#!/usr/bin/perl
 # {title}
@@ -460,7 +561,7 @@ my $url = '{url_2}';
 my $data = get($url);
 
 # Resource: {url_1}/docs
-"""
+{extra_links}"""
 
 PHP_TEMPLATE = """<?php
 // {title}
@@ -480,7 +581,7 @@ $output = curl_exec($ch);
 curl_close($ch);
 
 // Reference: {url_1}/docs
-?>
+{extra_links}?>
 """
 
 R_TEMPLATE = """# {title}
@@ -497,7 +598,7 @@ data <- read.csv("{url_2}")
 
 # Reference URL
 # Documentation: {url_1}/reference
-"""
+{extra_links}"""
 
 CONF_TEMPLATE = """# {title}
 # Configuration file example
@@ -511,21 +612,200 @@ images = {relative_url}
 
 [documentation]
 url = {url_1}/docs
-"""
+{extra_links}"""
+
+# Line formats for the extra links used to pad files in scale mode, in a syntax
+# the URL checker extracts from that file type: (line format, separator)
+EXTRA_LINK_FORMATS = {
+    'md': ("- [Reference {n}]({url})\n", ""),
+    'html': ("    <p><a href=\"{url}\">Reference {n}</a></p>\n", ""),
+    'css': (".ref-{n} {{ background-image: url('{url}'); }}\n", ""),
+    'js': ("const REF_{n} = '{url}';\n", ""),
+    'py': ("REF_{n} = \"{url}\"\n", ""),
+    'json': ("        \"{url}\"", ",\n"),
+    'yaml': ("  - \"{url}\"\n", ""),
+    'xml': ("        <link href=\"{url}\" rel=\"reference\" />\n", ""),
+    'txt': ("Reference {n}: {url}\n", ""),
+    'sh': ("curl -L \"{url}\" > /dev/null\n", ""),
+    'ps1': ("Invoke-WebRequest -Uri \"{url}\" -OutFile \"ref_{n}.txt\"\n", ""),
+    'bat': ("curl -o ref_{n}.txt \"{url}\"\n", ""),
+    'rb': ("ref_{n} = '{url}'\n", ""),
+    'pl': ("my $ref_{n} = '{url}';\n", ""),
+    'php': ("$ref_{n} = '{url}';\n", ""),
+    'r': ("ref_{n} <- \"{url}\"\n", ""),
+    'conf': ("ref_{n} = {url}\n", ""),
+}
+
+def get_template(ext):
+    """Get the content template for a file type."""
+    return globals().get(f"{ext.upper()}_TEMPLATE", TXT_TEMPLATE)
+
+def count_planted_links(ext):
+    """Count the links planted in a file of this type through template placeholders."""
+    template = get_template(ext)
+    return sum(template.count(placeholder) for placeholder in ("{url_1}", "{url_2}", "{relative_url}"))
+
+def choose_extra_links(count, relative_urls):
+    """Choose `count` extra links, a mix of absolute and relative URLs."""
+    urls = []
+    for _ in range(count):
+        if random.random() < 0.5:
+            urls.append(choose_absolute_url(VALID_URLS if random.random() < 0.8 else INVALID_URLS))
+        else:
+            urls.append(random.choice(relative_urls))
+    return urls
+
+def format_extra_links(ext, urls):
+    """Format extra links for a file type, one link per line."""
+    if not urls:
+        return ""
+    line_format, separator = EXTRA_LINK_FORMATS.get(ext, EXTRA_LINK_FORMATS['txt'])
+    content = separator.join(line_format.format(n=n, url=url) for n, url in enumerate(urls, 1))
+    # Formats without a trailing newline need one before the template continues
+    return content if content.endswith("\n") else content + "\n"
+
+# A URL placeholder plus any path the template appends to it (e.g. "{url_1}/docs")
+PLACEHOLDER_REGEX = re.compile(r'\{(url_1|url_2|relative_url)\}([^\s\'"()<>,;]*)')
+
+def render_template(ext, title, url_1, url_2, relative_url, extra_urls):
+    """
+    Render a file from its template and record where each link was planted.
+    
+    Templates are rendered line by line so the line number of every planted
+    link is known.
+    
+    Returns:
+        Tuple containing: (content, planted) where planted is a list of
+        (line, url, has_suffix) tuples - has_suffix marks URLs that the template
+        extended with an extra path
+    """
+    values = {'title': title, 'url_1': url_1, 'url_2': url_2, 'relative_url': relative_url}
+    extra_content = format_extra_links(ext, extra_urls)
+    
+    rendered_lines = []
+    planted = []
+    line_number = 1
+    for template_line in get_template(ext).split("\n"):
+        for match in PLACEHOLDER_REGEX.finditer(template_line):
+            planted.append((line_number, values[match.group(1)] + match.group(2), bool(match.group(2))))
+        if "{extra_links}" in template_line:
+            planted.extend((line_number + offset, url, False) for offset, url in enumerate(extra_urls))
+        rendered = template_line.format(extra_links=extra_content, **values)
+        rendered_lines.append(rendered)
+        line_number += rendered.count("\n") + 1
+    return "\n".join(rendered_lines), planted
+
+def apply_scale_targets():
+    """
+    Resize NUM_FILES and compute the extra links per file for --target-files/--target-links.
+    
+    The relative mix of file types is kept. Returns the number of extra links to
+    add to each file (a list indexed by creation order) or None outside scale mode.
+    """
+    if not args.target_files and not args.target_links:
+        return None
+    
+    weights = dict(NUM_FILES)
+    total_weight = sum(weights.values()) or 1
+    average_links = sum(count_planted_links(ext) * weight for ext, weight in weights.items()) / total_weight
+    
+    target_files = args.target_files or max(1, int(args.target_links / average_links))
+    
+    # Distribute the files over the types proportionally, handing out the remainder in order
+    counts = {ext: int(target_files * weight / total_weight) for ext, weight in weights.items()}
+    remainder = target_files - sum(counts.values())
+    for ext in sorted(weights, key=weights.get, reverse=True)[:remainder]:
+        counts[ext] += 1
+    NUM_FILES.update(counts)
+    
+    # Spread the links that the templates don't provide evenly over all files
+    planted = sum(count_planted_links(ext) * count for ext, count in NUM_FILES.items())
+    extra_total = max(0, (args.target_links or 0) - planted)
+    return [extra_total // target_files + (1 if i < extra_total % target_files else 0) for i in range(target_files)]
+
+class BatchWriter:
+    """Write files on a thread pool in batches, keeping a bounded number of batches in flight."""
+    
+    def __init__(self, workers):
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.max_pending = max(1, workers) * 2
+        self.pending = []
+        self.batch = []
+        self.files_written = 0
+        self.bytes_written = 0
+    
+    @staticmethod
+    def _write_batch(batch):
+        for filepath, content in batch:
+            with open(filepath, 'w') as f:
+                f.write(content)
+    
+    def add(self, filepath, content):
+        """Queue a file to be written."""
+        self.batch.append((filepath, content))
+        self.files_written += 1
+        self.bytes_written += len(content)
+        if len(self.batch) >= WRITE_BATCH_SIZE:
+            self._submit()
+    
+    def _submit(self):
+        if self.batch:
+            self.pending.append(self.executor.submit(self._write_batch, self.batch))
+            self.batch = []
+        # Wait for the oldest batches so queued content doesn't pile up in memory
+        while len(self.pending) > self.max_pending:
+            self.pending.pop(0).result()
+    
+    def close(self):
+        """Write any remaining files and wait for all writes to finish."""
+        self._submit()
+        for future in self.pending:
+            future.result()
+        self.pending = []
+        self.executor.shutdown()
+
+# Every file created so far, relative to the test root
+CREATED_FILES = []
+
+# Skip rule patterns that cannot share one combined regex (inline global flags,
+# backreferences, a named group used by two patterns), and a link each of them
+# must skip. The hosts do not exist, so a rule that fails to match shows up as
+# a broken link.
+SKIP_RULE_CASES = [
+    (r'(?i)^https?://SKIP-RULE-FLAGS\.invalid/', "https://skip-rule-flags.invalid/page"),
+    (r'^https?://(mirror)\.skip-rule\.invalid/\1/', "https://mirror.skip-rule.invalid/mirror/file.zip"),
+    (r'^https?://(?P<name>alpha)\.skip-rule\.invalid/', "https://alpha.skip-rule.invalid/"),
+    (r'^https?://(?P<name>beta)\.skip-rule\.invalid/', "https://beta.skip-rule.invalid/"),
+    (r'^https?://plain\.skip-rule\.invalid/', "https://plain.skip-rule.invalid/"),
+]
+
+def write_skip_rule_cases():
+    """Write a skip rules file with the SKIP_RULE_CASES patterns and a file linking to each case."""
+    with open(SKIP_RULES_PATH, 'w', encoding='utf-8') as f:
+        f.write("# Use with: python url_checker.py --rules=<this file>\n")
+        f.write("[rules.skip_rule_cases]\n")
+        f.write("patterns = [\n")
+        for pattern, _ in SKIP_RULE_CASES:
+            f.write(f"    '{pattern}',\n")
+        f.write("]\n")
+    filepath = os.path.join(TEST_ROOT, "skip_rule_cases.md")
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write("# Skip Rule Cases\n\nEvery link below is skipped when the checker runs with the generated rules file.\n\n")
+        for index, (_, url) in enumerate(SKIP_RULE_CASES, 1):
+            f.write(f"- [Case {index}]({url})\n")
+    record_created_file(filepath)
+    print(f"Wrote {len(SKIP_RULE_CASES)} skip rule cases to {SKIP_RULES_PATH}")
+
+def record_created_file(filepath):
+    """Remember a created file so relative URLs can target it without walking the tree."""
+    CREATED_FILES.append(os.path.relpath(filepath, TEST_ROOT).replace(os.sep, '/'))
 
 def generate_relative_urls(test_root, num_urls=10):
     """Generate a list of relative URLs pointing to actual files in the test directory."""
     relative_urls = []
     
-    # Walk the directory structure to find all files
-    all_files = []
-    root_len = len(test_root) + 1  # +1 for the trailing slash
-    
-    for root, dirs, files in os.walk(test_root):
-        for file in files:
-            full_path = os.path.join(root, file)
-            rel_path = full_path[root_len:]  # Path relative to test_root
-            all_files.append(rel_path)
+    # Use the files recorded during creation instead of walking the directory tree
+    all_files = list(CREATED_FILES)
     
     if not all_files:
         # Fallback if no files found yet
@@ -580,15 +860,27 @@ def create_files():
     print(f"Creating test files in {TEST_ROOT}...")
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
+    # Resize the file counts when a target corpus size was requested
+    extra_links_per_file = apply_scale_targets()
+    total_to_create = sum(NUM_FILES.values())
+    
     # Create base directory structure
     generate_random_directory_structure(TEST_ROOT, max_depth=COMPLEXITY+1)
     
+    # Add more directories for large corpora so no single directory gets huge
+    for i in range(total_to_create // FILES_PER_DIRECTORY):
+        parent = random.choice(ALL_DIRS)
+        ensure_directory(os.path.join(parent, f"bulk_{random_word()}_{i}"))
+    
+    # Reproducible runs must not embed the current time
+    generated_info = f"Files generated at: {timestamp}" if args.seed is None else f"Files generated with seed: {args.seed}"
+    
     # Create a README.md in the test root
     with open(os.path.join(TEST_ROOT, "README.md"), 'w') as f:
         f.write(f"""# URL Checker Test Files
 
 This directory contains various file types with URLs for testing the URL checker script.
-Files generated at: {timestamp}
+{generated_info}
 
 ## Test Environment
 
@@ -618,7 +910,7 @@ Total test files: {sum(NUM_FILES.values())}
 ## Command Used
 
 Test files generated with:
-python create_test_files.py --dir="{args.dir}" --file-count={TEST_SIZE} --complexity={COMPLEXITY}
+python create_test_files.py {format_command_options()}
 
 ## Generated Files
 
@@ -629,6 +921,7 @@ Each file contains a mix of:
 - Directory paths
 - Special characters and edge cases
 """)
+    record_created_file(os.path.join(TEST_ROOT, "README.md"))
     
     # Create image placeholder files in multiple locations
     for img_dir in ["assets/images", "docs/examples/images", "src/components/icons"]:
@@ -638,12 +931,24 @@ Each file contains a mix of:
         for img_name in ["logo.png", "banner.jpg", "icon.svg", "background.webp"]:
             with open(os.path.join(img_path, img_name), 'w') as f:
                 f.write(f"# This is a placeholder for an image file: {img_name}")
+            record_created_file(os.path.join(img_path, img_name))
+    
+    # Create the skip rule cases
+    write_skip_rule_cases()
+    
+    writer = BatchWriter(args.workers)
+    manifest = ManifestRecorder()
+    file_index = 0  # Position in creation order, used to look up extra links
+    
+    def next_extra_links(relative_urls):
+        nonlocal file_index
+        count = extra_links_per_file[file_index] if extra_links_per_file else 0
+        file_index += 1
+        return choose_extra_links(count, relative_urls)
     
     # First, create some initial files to build up the directory structure
     print("Creating initial files to establish directory structure...")
     for ext, count in NUM_FILES.items():
-        template = globals().get(f"{ext.upper()}_TEMPLATE", TXT_TEMPLATE)
-        
         # Create just a few files to populate the directory structure
         for i in range(min(3, count)):
             directory = get_directory_for_filetype(ext, TEST_ROOT)
@@ -653,20 +958,23 @@ Each file contains a mix of:
             filepath = os.path.join(directory, filename)
             
             # Generate content with placeholder URLs
-            content = template.format(
+            content, planted = render_template(
+                ext,
                 title=f"TEST FILE - Initial {ext.upper()} File {i + 1}",
-                url_1=random.choice(VALID_URLS),
-                url_2=random.choice(VALID_URLS),
-                relative_url="README.md"  # Placeholder
+                url_1=choose_absolute_url(VALID_URLS),
+                url_2=choose_absolute_url(VALID_URLS),
+                relative_url="README.md",  # Placeholder
+                extra_urls=next_extra_links(["README.md"])
             )
             
             # Write the file
-            with open(filepath, 'w') as f:
-                f.write(content)
+            writer.add(filepath, content)
+            record_created_file(filepath)
+            manifest.add(filepath, planted)
     
-    # Now generate relative URLs to the created files
+    # Now generate relative URLs to the created files - larger corpora get a larger pool
     print("Generating relative URLs based on created directory structure...")
-    relative_urls = generate_relative_urls(TEST_ROOT, num_urls=20)
+    relative_urls = generate_relative_urls(TEST_ROOT, num_urls=max(20, total_to_create // 5))
     
     # Create the rest of the files using the generated relative URLs
     print("Creating remaining files with relative links...")
@@ -674,8 +982,6 @@ Each file contains a mix of:
     
     # Create files for all the specified types
     for ext, count in NUM_FILES.items():
-        template = globals().get(f"{ext.upper()}_TEMPLATE", TXT_TEMPLATE)
-        
         # Skip the first few files we've already created
         for i in range(3, count):
             # Choose directory based on file type, but with more randomness
@@ -686,35 +992,131 @@ Each file contains a mix of:
             filepath = os.path.join(directory, filename)
             
             # Generate content with URLs
-            content = template.format(
+            content, planted = render_template(
+                ext,
                 title=f"TEST FILE - Sample {ext.upper()} File {i + 1}",
-                url_1=random.choice(VALID_URLS),
-                url_2=random.choice(VALID_URLS if i % 4 != 0 else INVALID_URLS),
-                relative_url=random.choice(relative_urls)
+                url_1=choose_absolute_url(VALID_URLS),
+                url_2=choose_absolute_url(VALID_URLS if i % 4 != 0 else INVALID_URLS),
+                relative_url=random.choice(relative_urls),
+                extra_urls=next_extra_links(relative_urls)
             )
             
             # Write the file
-            with open(filepath, 'w') as f:
-                f.write(content)
+            writer.add(filepath, content)
+            record_created_file(filepath)
+            manifest.add(filepath, planted)
             
             total_files += 1
+            if total_files % 10000 == 0:
+                print(f"Generated {total_files}/{total_to_create} files...")
+    
+    # Wait for the writer threads to finish
+    writer.close()
+    print(f"Created {total_files} test files in {TEST_ROOT} ({writer.bytes_written / (1024 * 1024):.1f} MB)")
     
-    print(f"Created {total_files} test files in {TEST_ROOT}")
+    # Record the expected result of every planted link, now that all targets exist
+    manifest.write(MANIFEST_PATH)
     
     # Collect statistics about the test environment
     return total_files
 
+# Image and SVG extensions, matching the URL checker's categorization
+IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp', '.ico']
+SVG_EXTENSIONS = ['.svg']
+
+MANIFEST_VERSION = 1
+
+def get_expected_category(url):
+    """Get the URL checker category a planted link is expected to be reported in."""
+    if url.startswith(('http://', 'https://')):
+        return 'absolute'
+    if url.startswith('#'):
+        return 'header'
+    lower_url = url.lower()
+    if any(lower_url.endswith(ext) for ext in SVG_EXTENSIONS):
+        return 'svg'
+    if any(lower_url.endswith(ext) for ext in IMAGE_EXTENSIONS):
+        return 'image'
+    if url.startswith('/'):
+        return 'root_relative'
+    return 'relative'
+
+class ManifestRecorder:
+    """
+    Collect every planted link and write a ground-truth manifest for it.
+    
+    Absolute links are expected to be OK or broken depending on whether they come
+    from VALID_URLS or INVALID_URLS; URLs the templates extend with an extra path
+    are marked "unknown". Relative links are resolved against the directory of the
+    file containing them, the same way the URL checker resolves them.
+    """
+    
+    def __init__(self):
+        self.planted = []   # (filepath, line, url, has_suffix)
+    
+    def add(self, filepath, planted):
+        """Record the links planted in a file."""
+        self.planted.extend((filepath, line, url, has_suffix) for line, url, has_suffix in planted)
+    
+    def expected_status(self, filepath, url, has_suffix, existing_paths):
+        """Get the expected status ("ok", "broken" or "unknown") of a planted link."""
+        if url.startswith(('http://', 'https://')):
+            if has_suffix:
+                return 'unknown'
+            if args.server:
+                url = url.split('?', 1)[0]  # Drop the unique query string
+            if url in INVALID_URLS:
+                return 'broken'
+            return 'ok' if url in VALID_URLS else 'unknown'
+        target = os.path.normpath(os.path.join(os.path.dirname(filepath), url.split('#', 1)[0]))
+        if target in existing_paths or os.path.exists(target):
+            return 'ok'
+        return 'broken'
+    
+    def write(self, manifest_path):
+        """Write the manifest as JSON Lines: a header line, then one line per planted link."""
+        existing_paths = {os.path.normpath(os.path.join(TEST_ROOT, path)) for path in CREATED_FILES}
+        existing_paths.update(os.path.normpath(directory) for directory in ALL_DIRS)
+        
+        counts = {}
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'manifest_version': MANIFEST_VERSION,
+                'root': TEST_ROOT,
+                'seed': args.seed,
+                'links': len(self.planted),
+            }) + "\n")
+            for filepath, line, url, has_suffix in self.planted:
+                status = self.expected_status(filepath, url, has_suffix, existing_paths)
+                counts[status] = counts.get(status, 0) + 1
+                f.write(json.dumps({
+                    'file': os.path.relpath(filepath, TEST_ROOT).replace(os.sep, '/'),
+                    'line': line,
+                    'url': url,
+                    'category': get_expected_category(url),
+                    'expected_status': status,
+                }) + "\n")
+        summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+        print(f"Wrote manifest of {len(self.planted)} planted links ({summary}) to {manifest_path}")
+
+def format_command_options():
+    """Format the options this corpus was generated with, so it can be recreated."""
+    options = [f'--dir="{args.dir}"', f"--file-count={TEST_SIZE}", f"--complexity={COMPLEXITY}"]
+    if args.seed is not None:
+        options.append(f"--seed={args.seed}")
+    if args.target_files:
+        options.append(f"--target-files={args.target_files}")
+    if args.target_links:
+        options.append(f"--target-links={args.target_links}")
+    return " ".join(options)
+
 def get_directory_for_filetype(ext, test_root, randomize=False):
     """Get an appropriate directory for a file type, with optional randomization."""
     # Get all directories recursively
     if randomize and random.random() < 0.3:
-        # Get all directories
-        all_dirs = []
-        for root, dirs, files in os.walk(test_root):
-            all_dirs.extend([os.path.join(root, d) for d in dirs])
-        
-        if all_dirs:
-            return random.choice(all_dirs)
+        # Pick from the directories created so far (tracked in memory, no tree walk)
+        if ALL_DIRS:
+            return random.choice(ALL_DIRS)
     
     # Default directories based on file type
     if ext in ['md', 'txt']:
@@ -882,6 +1284,8 @@ if __name__ == "__main__":
     print("\n🚀 NEXT STEPS:")
     print(f"  • Run URL checker on test files only:")
     print(f"    python url_checker.py --dir={args.dir}")
+    print(f"  • Apply the generated skip rule cases:")
+    print(f"    python url_checker.py --dir={args.dir} --rules={os.path.relpath(SKIP_RULES_PATH, SCRIPT_DIR)}")
     print(f"  • Clean up when done:")
     print(f"    python create_test_files.py --dir={args.dir} --clean")
     
@@ -0,0 +1,329 @@
+# =============================================================================
+# Fault-Injecting Test Server for the URL Checker
+# =============================================================================
+# This script runs a local HTTP/HTTPS server with scripted endpoints (slow
+# responses, rate limiting, server errors, redirect chains, TLS errors,
+# HEAD-not-allowed and huge bodies) so the URL checker can be tested and
+# load-tested offline with deterministic results.
+# =============================================================================
+
+import os
+import re
+import ssl
+import sys
+import time
+import argparse
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# ANSI color codes for terminal output
+class Colors:
+    OKGREEN = '\033[92m'  # Green for success
+    FAIL = '\033[91m'     # Red for errors
+    INFO = '\033[96m'     # Cyan for neutral/informational
+    NEUTRAL = '\033[93m'  # Yellow for warnings
+    ENDC = '\033[0m'      # Reset color
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CERT_DIR = os.path.join(SCRIPT_DIR, '.cache', 'test_server')
+
+BODY_CHUNK_SIZE = 64 * 1024  # Bytes written per chunk for huge bodies
+MAX_SLOW_MS = 600000         # Upper bound for /slow/<ms> so a typo cannot hang a worker forever
+REQUEST_QUEUE_SIZE = 1024    # Listen backlog, large enough for heavily concurrent checkers
+
+# Endpoints, documented on the index page: (pattern, description)
+ENDPOINTS = [
+    ('/ok', "200 with a small HTML body"),
+    ('/status/<code>', "Respond with the given status code (e.g. /status/404, /status/502)"),
+    ('/slow/<ms>', "Wait <ms> milliseconds, then respond 200"),
+    ('/ratelimit/<seconds>', "429 Too Many Requests with Retry-After: <seconds>"),
+    ('/flaky/<n>', "503 for the first <n> requests to this exact URL, then 200"),
+    ('/redirect/<n>', "A chain of <n> 302 redirects ending at 200"),
+    ('/loop', "A redirect loop between /loop and /loop/back"),
+    ('/no-head', "405 Method Not Allowed for HEAD, 200 for GET"),
+    ('/huge/<mb>', "200 with a body of <mb> MiB"),
+]
+
+def parse_arguments():
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Run a fault-injecting local HTTP/HTTPS server for testing the URL checker.")
+    parser.add_argument(
+        "--host",
+        default="localhost",
+        help="Host name or address to listen on (default: localhost)"
+    )
+    parser.add_argument(
+        "--http-port",
+        type=int,
+        default=8800,
+        help="Port for plain HTTP (default: 8800)"
+    )
+    parser.add_argument(
+        "--https-port",
+        type=int,
+        default=8843,
+        help="Port for HTTPS with a certificate signed by the test CA, 0 to disable (default: 8843)"
+    )
+    parser.add_argument(
+        "--tls-error-port",
+        type=int,
+        default=8844,
+        help="Port for HTTPS with an untrusted self-signed certificate, 0 to disable (default: 8844)"
+    )
+    parser.add_argument(
+        "--cert-dir",
+        default=CERT_DIR,
+        help="Directory for the generated CA and certificates"
+    )
+    parser.add_argument(
+        "--latency",
+        type=int,
+        default=0,
+        help="Extra latency in milliseconds added to every response"
+    )
+    parser.add_argument(
+        "--quiet",
+        action="store_true",
+        help="Do not log every request"
+    )
+    return parser.parse_args()
+
+# =============================================================================
+# CERTIFICATES
+# =============================================================================
+
+def run_openssl(arguments):
+    """Run an openssl command, raising CalledProcessError on failure."""
+    subprocess.run(['openssl'] + arguments, check=True, capture_output=True)
+
+def ensure_certificates(cert_dir, host):
+    """
+    Create a test CA, a server certificate signed by it and an untrusted
+    self-signed certificate, unless they already exist.
+
+    The openssl command-line tool is used so no extra Python packages are needed.
+
+    Args:
+        cert_dir: Directory to store the certificates in
+        host: Host name the server certificates are issued for
+
+    Returns:
+        Dictionary of certificate paths, or None if openssl is not available
+    """
+    paths = {name: os.path.join(cert_dir, f"{name}.pem") for name in
+             ('ca', 'ca_key', 'server', 'server_key', 'untrusted', 'untrusted_key')}
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+
+    os.makedirs(cert_dir, exist_ok=True)
+    subject_alt_names = f"subjectAltName=DNS:{host},DNS:localhost,IP:127.0.0.1"
+    csr_path = os.path.join(cert_dir, 'server.csr')
+    ext_path = os.path.join(cert_dir, 'server.ext')
+    try:
+        # Test CA
+        run_openssl(['req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '3650',
+                     '-subj', '/CN=URL Checker Test CA',
+                     '-keyout', paths['ca_key'], '-out', paths['ca']])
+        # Server certificate signed by the test CA
+        run_openssl(['req', '-newkey', 'rsa:2048', '-nodes', '-subj', f'/CN={host}',
+                     '-keyout', paths['server_key'], '-out', csr_path])
+        with open(ext_path, 'w', encoding='utf-8') as f:
+            f.write(subject_alt_names + "\n")
+        run_openssl(['x509', '-req', '-in', csr_path, '-days', '3650',
+                     '-CA', paths['ca'], '-CAkey', paths['ca_key'], '-CAcreateserial',
+                     '-extfile', ext_path, '-out', paths['server']])
+        # Untrusted self-signed certificate for TLS errors
+        run_openssl(['req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '3650',
+                     '-subj', f'/CN={host}', '-addext', subject_alt_names,
+                     '-keyout', paths['untrusted_key'], '-out', paths['untrusted']])
+    except FileNotFoundError:
+        print(f"{Colors.NEUTRAL}Warning: openssl not found - HTTPS endpoints are disabled{Colors.ENDC}")
+        return None
+    except subprocess.CalledProcessError as e:
+        print(f"{Colors.NEUTRAL}Warning: could not create certificates ({e.stderr.decode(errors='replace').strip()}) - HTTPS endpoints are disabled{Colors.ENDC}")
+        return None
+    print(f"Created test certificates in {cert_dir}")
+    return paths
+
+# =============================================================================
+# REQUEST HANDLING
+# =============================================================================
+
+class FaultInjectingHandler(BaseHTTPRequestHandler):
+    """Serve the scripted test endpoints."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "URLCheckerTestServer/1.0"
+
+    # Set by the server: extra latency in seconds, whether to log requests
+    latency = 0
+    quiet = False
+
+    # Requests seen per flaky URL, shared by all servers
+    flaky_counts = {}
+    flaky_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def send_body(self, status, body, headers=None):
+        """Send a complete response with a text body."""
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    def send_redirect(self, location):
+        """Send a 302 redirect."""
+        self.send_body(302, f"Redirecting to {location}\n", {'Location': location})
+
+    def send_index(self):
+        """Send a page listing every endpoint."""
+        rows = "".join(f"<li><a href=\"{pattern}\">{pattern}</a> - {description}</li>\n" for pattern, description in ENDPOINTS)
+        self.send_body(200, f"<html><body><h1>URL Checker Test Server</h1>\n<ul>\n{rows}</ul></body></html>\n")
+
+    def send_huge(self, megabytes):
+        """Send a body of the given size in chunks, stopping if the client disconnects."""
+        remaining = megabytes * 1024 * 1024
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(remaining))
+        self.end_headers()
+        if self.command == 'HEAD':
+            return
+        chunk = b'0' * BODY_CHUNK_SIZE
+        try:
+            while remaining > 0:
+                self.wfile.write(chunk[:remaining])
+                remaining -= BODY_CHUNK_SIZE
+        except (BrokenPipeError, ConnectionResetError, ssl.SSLError):
+            self.close_connection = True  # The checker only reads the headers
+
+    def increment_flaky_count(self):
+        """Count a request to the current flaky URL and return the new count."""
+        with self.flaky_lock:
+            count = self.flaky_counts.get(self.path, 0) + 1
+            self.flaky_counts[self.path] = count
+        return count
+
+    def handle_request(self):
+        """Dispatch a GET or HEAD request to its endpoint."""
+        if self.latency:
+            time.sleep(self.latency)
+
+        path = urlparse(self.path).path.rstrip('/') or '/'
+        match = re.fullmatch(r'/([a-z-]+)(?:/(\d+))?', path)
+        name, number = (match.group(1), int(match.group(2))) if match and match.group(2) else (path.strip('/'), None)
+
+        if path == '/':
+            self.send_index()
+        elif path == '/ok':
+            self.send_body(200, "<html><body>OK</body></html>\n")
+        elif name == 'status' and number is not None and 100 <= number <= 599:
+            self.send_body(number, f"Status {number}\n")
+        elif name == 'slow' and number is not None:
+            time.sleep(min(number, MAX_SLOW_MS) / 1000)
+            self.send_body(200, f"Slept {number} ms\n")
+        elif name == 'ratelimit' and number is not None:
+            self.send_body(429, "Too Many Requests\n", {'Retry-After': str(number)})
+        elif name == 'flaky' and number is not None:
+            if self.increment_flaky_count() <= number:
+                self.send_body(503, "Service Unavailable\n", {'Retry-After': '1'})
+            else:
+                self.send_body(200, "Recovered\n")
+        elif name == 'redirect' and number is not None:
+            if number > 0:
+                self.send_redirect(f"/redirect/{number - 1}")
+            else:
+                self.send_body(200, "End of redirect chain\n")
+        elif path == '/loop':
+            self.send_redirect("/loop/back")
+        elif path == '/loop/back':
+            self.send_redirect("/loop")
+        elif path == '/no-head':
+            if self.command == 'HEAD':
+                self.send_body(405, "Method Not Allowed\n", {'Allow': 'GET'})
+            else:
+                self.send_body(200, "GET only\n")
+        elif name == 'huge' and number is not None:
+            self.send_huge(number)
+        else:
+            self.send_body(404, "Not Found\n")
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_HEAD(self):
+        self.handle_request()
+
+class TestServer(ThreadingHTTPServer):
+    """Threaded HTTP server with a large listen backlog for load tests."""
+
+    daemon_threads = True
+    request_queue_size = REQUEST_QUEUE_SIZE
+
+def create_server(host, port, handler, cert=None, key=None):
+    """Create a server, wrapped in TLS if a certificate is given."""
+    server = TestServer((host, port), handler)
+    if cert:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    return server
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+
+def main():
+    """Start the HTTP, HTTPS and TLS-error servers and serve until interrupted."""
+    args = parse_arguments()
+
+    handler = type('Handler', (FaultInjectingHandler,), {'latency': args.latency / 1000, 'quiet': args.quiet})
+
+    # (label, port, certificate, key)
+    listeners = [('HTTP', args.http_port, None, None)]
+    if args.https_port or args.tls_error_port:
+        certificates = ensure_certificates(args.cert_dir, args.host)
+        if certificates:
+            if args.https_port:
+                listeners.append(('HTTPS', args.https_port, certificates['server'], certificates['server_key']))
+            if args.tls_error_port:
+                listeners.append(('TLS error', args.tls_error_port, certificates['untrusted'], certificates['untrusted_key']))
+            print(f"Test CA certificate: {certificates['ca']} (pass it to url_checker.py --ca-bundle)")
+
+    servers = []
+    for label, port, cert, key in listeners:
+        try:
+            server = create_server(args.host, port, handler, cert, key)
+        except OSError as e:
+            print(f"{Colors.FAIL}Could not listen on port {port}: {e}{Colors.ENDC}")
+            sys.exit(1)
+        scheme = 'https' if cert else 'http'
+        print(f"{Colors.OKGREEN}{label} server: {scheme}://{args.host}:{port}/{Colors.ENDC}")
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+
+    print(f"{Colors.INFO}Endpoints:{Colors.ENDC}")
+    for pattern, description in ENDPOINTS:
+        print(f"  {pattern:<22} {description}")
+    print("Press Ctrl+C to stop")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nStopping test server")
+        for server in servers:
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -4,21 +4,30 @@
 # This script scans all Markdown files in a repository for URLs and checks
 # whether they are valid. It handles both absolute URLs (http/https) and
 # relative file paths, providing a detailed report of broken links.
+#
+# Startup is kept cheap for pre-commit hooks: the HTTP stack (requests), colorama
+# and other heavy modules are imported on first use, and nothing runs at import
+# time - the repository root, log directory and terminal setup are resolved in
+# main() or when first needed.
 # =============================================================================
 
 import os
 import re
-import requests
-import subprocess
 from urllib.parse import urljoin, urlparse
-from datetime import datetime
-import ipaddress
-from colorama import init
+from datetime import datetime, timedelta
 import sys
 import argparse
+import json
+import hashlib
+import socket
+import threading
+import time
+from collections import deque
 
-# Initialize colorama for Windows compatibility and force color output in GitHub Actions
-init(strip=False, convert=False)
+def init_colors():
+    """Initialize colorama for Windows compatibility and force color output in GitHub Actions."""
+    from colorama import init
+    init(strip=False, convert=False)
 
 # =============================================================================
 # CONFIGURATION
@@ -35,27 +44,54 @@ class Colors:
 
 def get_repo_root():
     """Find the root directory of the Git repository."""
+    import subprocess
     try:
         return subprocess.check_output(['git', 'rev-parse', '--show-toplevel'], text=True).strip()
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, OSError):
         return '.'  # Default to current directory if not in a Git repo
 
 # Script configuration settings
-REPO_PATH = get_repo_root()
+REPO_PATH = None  # Resolved on first use by get_repo_path(), since it costs a git subprocess
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 LOG_DIR = os.path.join(SCRIPT_DIR, 'logs')
 
-# Create logs directory and handle any errors gracefully
-try:
-    os.makedirs(LOG_DIR, exist_ok=True)
-    print(f"Logs will be saved to: {LOG_DIR}")
-except Exception as e:
-    print(f"Warning: Could not create logs directory: {e}")
-    LOG_DIR = SCRIPT_DIR  # Fallback to script directory
-    print(f"Using fallback log directory: {LOG_DIR}")
+def get_repo_path():
+    """Get the repository root, running git only the first time it is needed."""
+    global REPO_PATH
+    if REPO_PATH is None:
+        REPO_PATH = get_repo_root()
+    return REPO_PATH
 
-TIMEOUT = 15  # Request timeout in seconds - increase this if you get many timeout errors
+def ensure_log_dir():
+    """Create the logs directory, falling back to the script directory if that fails."""
+    global LOG_DIR
+    try:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        print(f"Logs will be saved to: {LOG_DIR}")
+    except Exception as e:
+        print(f"Warning: Could not create logs directory: {e}")
+        LOG_DIR = SCRIPT_DIR  # Fallback to script directory
+        print(f"Using fallback log directory: {LOG_DIR}")
+
+LOG_FLUSH_INTERVAL = 0.25  # Seconds between flushes of the real-time log
+
+# Extraction cache - stores the URLs found in each file between runs so unchanged
+# files can skip reading and regex matching entirely
+CACHE_DIR = os.path.join(SCRIPT_DIR, '.cache')
+EXTRACTION_CACHE_FILE = os.path.join(CACHE_DIR, 'extraction_cache.json')
+EXTRACTION_VERSION = 1  # Bump when extraction behaviour changes outside extract_urls_by_file_type
+
+TIMEOUT = 15  # Read timeout in seconds - increase this if you get many timeout errors
+CONNECT_TIMEOUT = 5  # Connect timeout in seconds - a healthy host accepts connections quickly
+MAX_READ_TIMEOUT = 30  # Upper bound for adaptive per-host read deadlines
+
+# Adaptive timeout settings - per-host read deadlines derived from observed latency
+ADAPTIVE_TIMEOUT_MULTIPLIER = 3   # Deadline is this multiple of the host's p95 latency
+ADAPTIVE_MIN_SAMPLES = 5          # Samples needed before a host's deadline is adapted
+LATENCY_WINDOW = 200              # Most recent samples kept per host
 HEADERS = {"User-Agent": "Mozilla/5.0 (compatible; LinkChecker/1.0)"}  # Browser-like user agent
+CA_BUNDLE = None  # Combined bundle of the default CAs and the --ca-bundle CAs (e.g. a local test server's CA)
+ALLOW_LOCAL_URLS = False  # Check localhost and IP-based URLs instead of skipping them
 
 # File types to check - maps extensions to descriptive names
 SUPPORTED_FILE_TYPES = {
@@ -184,279 +220,610 @@ TRUSTED_DOMAINS_WITH_CERT_ISSUES = [
     "azurefd.net",          # Azure Front Door domain
 ]
 
-# Function to detect false positive URLs that should be skipped
-def is_false_positive(url):
-    """Check if a URL is a known false positive pattern that should be skipped."""
-    # Skip direct domain matches first (most efficient check)
-    try:
-        parsed_url = urlparse(url)
-        if parsed_url.netloc in KNOWN_VALID_DOMAINS:
-            print(f"Skipping trusted domain URL: {url}")
-            return True
-    except:
-        pass  # Continue with other checks if parsing fails
-
-    # Simple string patterns that should be skipped
-    simple_skip_patterns = [
-        "http://\\", 
-        "http:\\", 
-        "http://\\\\", 
-        "http:\\\\\\", 
-        "https://\\", 
-        "https://\\\\"
-    ]
-    
-    for pattern in simple_skip_patterns:
-        if pattern in url:
-            print(f"Skipping URL with backslashes: {url}")
-            return True
-    
-    # Template Base URL patterns
-    template_patterns = [
-        r'\(\$templateBaseUrl',
-        r'\(\$env:templateBaseUrl',
-        r'\(\$Using:templateBaseUrl',
-        r'\$Env:templateBaseUrl',  # PowerShell environment variable syntax
-    ]
-    
-    # Storage account and GitHub patterns
-    placeholder_patterns = [
-        r'https://\{STORAGEACCOUNT\}\.blob\.core\.windows\.net/',
-        r'https://\$githubPat@github\.com/\$githubUser/\$appsRepo\.git',
-        r'http://\$URL:\$PORT',
-        r'https://\$\(\$HCIBoxConfig\.WACVMName\)\.',
-        r'https://\$stagingStorageAccountName\.blob\.core\.windows\.net/\$containerName/config',
-    ]
-    
-    # PowerShell variable names that look like URLs or paths but aren't actual URLs
-    powershell_variable_patterns = [
-        r'\$websiteUrls',          # Variable holding website URLs
-        r'\$websiteUrls\[',        # With array indexing
-        r'\$websiteUrls\.',        # With property/method access
-        r'\$mqttExplorerReleasesUrl', # MQTT Explorer releases URL variable
-        r'\$mqttExplorerReleaseDownloadUrl', # MQTT Explorer download URL variable
-        r'\$terminalDownloadUri',   # Terminal download URI variable
-        r'\$uri',                  # Generic URI variable
-        r'\$url',                  # Generic URL variable
-        r'\$downloadUrl',          # Download URL variable
-        r'\$aksEEReleasesUrl',     # AKS EE releases URL variable
-        r'\$AKSEEReleaseDownloadUrl', # AKS EE download URL variable
-        r'\$localPathStorageUrl',  # Local path storage URL variable
-        r'\$acsadeployYamlUrl',    # ACSA deploy YAML URL variable
-        r'\$aksEEk3sUrl',          # AKS EE K3s URL variable
-        r'\$githubApiUrl',         # GitHub API URL variable
-        r'\$fabricHeaders',        # Fabric API headers variable
-        r'\$_',                    # PowerShell automatic variable for current pipeline object
-    ]
-    
-    # Script files and commands that appear to be URLs but aren't
-    script_file_patterns = [
-        r'get_helm\.sh',           # Helm installation script
-        r'http://\\',              # Escaped backslash in URL (not a real URL)
-        r'http://\\\\',            # Multiple escaped backslashes in URL
-        r'http://\\\\\S*',         # Multiple escaped backslashes with any additional characters
-        r'https://\\\\\S*',        # Multiple escaped backslashes with HTTPS
-    ]
-    
-    # Escaped backslashes in URLs or JSON path patterns - expanded patterns
-    escaped_backslash_patterns = [
-        r'http://\\+',             # One or more backslashes after http://
-        r'https://\\+',            # One or more backslashes after https://
-        r'http:\\+',               # Backslashes without forward slashes
-        r'https:\\+',              # Backslashes without forward slashes
-        r'http://\\\\\S*',         # Multiple escaped backslashes with any additional characters 
-        r'http://\\',              # Single backslash
-        r'http:/\\',               # Malformed backslash
-        r'https://\\',             # HTTPS with backslash
-    ]
-    
-    # Template variable patterns (JavaScript-style ${var} and shell-style $var)
-    template_variable_patterns = [
-        r'http://\${[^}]+}', # ${variable} format
-        r'https://\${[^}]+}',
-        r'http://\${[^}]+}:[0-9]+', # With port
-        r'https://\${[^}]+}:[0-9]+',
-        r'http://\${[^}]+}:[0-9]+/\w+', # With path after port
-        r'https://\${[^}]+}:[0-9]+/\w+',
-        r'http://\$[a-zA-Z0-9_]+', # $variable format (without braces)
-        r'https://\$[a-zA-Z0-9_]+',
-        r'http://\$[a-zA-Z0-9_]+:[0-9]+', # With port
-        r'https://\$[a-zA-Z0-9_]+:[0-9]+',
-        r'https://\$[a-zA-Z0-9_]+/\w+', # With path (no port)
-        r'https://\${[^}]+}/\w+', # With path (no port) for braced variables
-        r'https://[^/]+/\$[a-zA-Z0-9_]+', # Variable in path
-        r'https://[^/]+/\${[^}]+}', # Braced variable in path
-        r'https://\$Env:[a-zA-Z0-9_]+', # PowerShell Env variables in URLs
-        r'https://\$env:[a-zA-Z0-9_]+', # PowerShell env variables in URLs (lowercase)
-    ]
-    
-    # Query string variable patterns
-    query_variable_patterns = [
-        r'https://[^?]+\?[^=]+=\$[a-zA-Z0-9_]+',  # https://example.com?param=$variable
-        r'https://[^?]+\?[^=]+=\${[^}]+}',        # https://example.com?param=${variable}
-    ]
-    
-    # XML namespace URLs that aren't meant to be accessed directly
-    xml_namespace_urls = [
-        'http://www.w3.org/2000/svg',
-        'http://www.w3.org/1999/xlink',
-    ]
-    
-    # Special placeholder hostnames (typically used in configs/templates)
-    placeholder_hostnames = [
-        r'influxPlaceholder',
-    ]
-    
-    # Patterns for specific GitHub raw URLs that are placeholders
-    github_raw_urls = [
-        r'https://raw\.githubusercontent\.com/microsoft/azure_arc/main/azure_jumpstart_ag/',
-        r'https://raw\.githubusercontent\.com/microsoft/azure_arc/main/.+/'
-    ]
-    
-    # Local script file patterns that shouldn't be checked as URLs
-    local_script_patterns = [
-        r'^\.\/[a-zA-Z0-9_-]+\.sh$',         # ./script.sh
-        r'^\.\/[a-zA-Z0-9_-]+\.ps1$',        # ./script.ps1
-        r'^\.\/[a-zA-Z0-9_-]+\.bat$',        # ./script.bat
-        r'^\.\/[a-zA-Z0-9_-]+\.cmd$',        # ./script.cmd
-        r'\.\/akri\.sh$',                    # ./akri.sh specifically
-    ]
-    
-    # GitHub API URL patterns with variables
-    github_api_variable_patterns = [
-        r'\$gitHubAPIBaseUri\/repos\/\$githubUser\/\$appsRepo',
-        r'\$gitHubAPIBaseUri\/repos\/[^\/]+\/[^\/]+',
-        r'\$githubApiUrl',
-        r'api\.github\.com\/repos\/\$[a-zA-Z0-9_]+\/',
-    ]
+# False positive patterns - built-in skip rules (see SKIP RULES below)
+
+# Template Base URL patterns
+TEMPLATE_PATTERNS = [
+    r'\(\$templateBaseUrl',
+    r'\(\$env:templateBaseUrl',
+    r'\(\$Using:templateBaseUrl',
+    r'\$Env:templateBaseUrl',  # PowerShell environment variable syntax
+]
+
+# Storage account and GitHub patterns
+PLACEHOLDER_PATTERNS = [
+    r'https://\{STORAGEACCOUNT\}\.blob\.core\.windows\.net/',
+    r'https://\$githubPat@github\.com/\$githubUser/\$appsRepo\.git',
+    r'http://\$URL:\$PORT',
+    r'https://\$\(\$HCIBoxConfig\.WACVMName\)\.',
+    r'https://\$stagingStorageAccountName\.blob\.core\.windows\.net/\$containerName/config',
+]
+
+# PowerShell variable names that look like URLs or paths but aren't actual URLs
+POWERSHELL_VARIABLE_PATTERNS = [
+    r'\$websiteUrls',          # Variable holding website URLs
+    r'\$websiteUrls\[',        # With array indexing
+    r'\$websiteUrls\.',        # With property/method access
+    r'\$mqttExplorerReleasesUrl', # MQTT Explorer releases URL variable
+    r'\$mqttExplorerReleaseDownloadUrl', # MQTT Explorer download URL variable
+    r'\$terminalDownloadUri',   # Terminal download URI variable
+    r'\$uri',                  # Generic URI variable
+    r'\$url',                  # Generic URL variable
+    r'\$downloadUrl',          # Download URL variable
+    r'\$aksEEReleasesUrl',     # AKS EE releases URL variable
+    r'\$AKSEEReleaseDownloadUrl', # AKS EE download URL variable
+    r'\$localPathStorageUrl',  # Local path storage URL variable
+    r'\$acsadeployYamlUrl',    # ACSA deploy YAML URL variable
+    r'\$aksEEk3sUrl',          # AKS EE K3s URL variable
+    r'\$githubApiUrl',         # GitHub API URL variable
+    r'\$fabricHeaders',        # Fabric API headers variable
+    r'\$_',                    # PowerShell automatic variable for current pipeline object
+]
+
+# Script files and commands that appear to be URLs but aren't
+SCRIPT_FILE_PATTERNS = [
+    r'get_helm\.sh',           # Helm installation script
+    r'http://\\',              # Escaped backslash in URL (not a real URL)
+    r'http://\\\\',            # Multiple escaped backslashes in URL
+    r'http://\\\\\S*',         # Multiple escaped backslashes with any additional characters
+    r'https://\\\\\S*',        # Multiple escaped backslashes with HTTPS
+]
+
+# Escaped backslashes in URLs or JSON path patterns - expanded patterns
+ESCAPED_BACKSLASH_PATTERNS = [
+    r'http://\\+',             # One or more backslashes after http://
+    r'https://\\+',            # One or more backslashes after https://
+    r'http:\\+',               # Backslashes without forward slashes
+    r'https:\\+',              # Backslashes without forward slashes
+    r'http://\\\\\S*',         # Multiple escaped backslashes with any additional characters 
+    r'http://\\',              # Single backslash
+    r'http:/\\',               # Malformed backslash
+    r'https://\\',             # HTTPS with backslash
+]
+
+# Template variable patterns (JavaScript-style ${var} and shell-style $var)
+TEMPLATE_VARIABLE_PATTERNS = [
+    r'http://\${[^}]+}', # ${variable} format
+    r'https://\${[^}]+}',
+    r'http://\${[^}]+}:[0-9]+', # With port
+    r'https://\${[^}]+}:[0-9]+',
+    r'http://\${[^}]+}:[0-9]+/\w+', # With path after port
+    r'https://\${[^}]+}:[0-9]+/\w+',
+    r'http://\$[a-zA-Z0-9_]+', # $variable format (without braces)
+    r'https://\$[a-zA-Z0-9_]+',
+    r'http://\$[a-zA-Z0-9_]+:[0-9]+', # With port
+    r'https://\$[a-zA-Z0-9_]+:[0-9]+',
+    r'https://\$[a-zA-Z0-9_]+/\w+', # With path (no port)
+    r'https://\${[^}]+}/\w+', # With path (no port) for braced variables
+    r'https://[^/]+/\$[a-zA-Z0-9_]+', # Variable in path
+    r'https://[^/]+/\${[^}]+}', # Braced variable in path
+    r'https://\$Env:[a-zA-Z0-9_]+', # PowerShell Env variables in URLs
+    r'https://\$env:[a-zA-Z0-9_]+', # PowerShell env variables in URLs (lowercase)
+]
+
+# Query string variable patterns
+QUERY_VARIABLE_PATTERNS = [
+    r'https://[^?]+\?[^=]+=\$[a-zA-Z0-9_]+',  # https://example.com?param=$variable
+    r'https://[^?]+\?[^=]+=\${[^}]+}',        # https://example.com?param=${variable}
+]
+
+# XML namespace URLs that aren't meant to be accessed directly
+XML_NAMESPACE_URLS = [
+    'http://www.w3.org/2000/svg',
+    'http://www.w3.org/1999/xlink',
+]
+
+# Special placeholder hostnames (typically used in configs/templates)
+PLACEHOLDER_HOSTNAMES = [
+    r'influxPlaceholder',
+]
+
+# Patterns for specific GitHub raw URLs that are placeholders
+GITHUB_RAW_URLS = [
+    r'https://raw\.githubusercontent\.com/microsoft/azure_arc/main/azure_jumpstart_ag/',
+    r'https://raw\.githubusercontent\.com/microsoft/azure_arc/main/.+/'
+]
+
+# Local script file patterns that shouldn't be checked as URLs
+LOCAL_SCRIPT_PATTERNS = [
+    r'^\.\/[a-zA-Z0-9_-]+\.sh$',         # ./script.sh
+    r'^\.\/[a-zA-Z0-9_-]+\.ps1$',        # ./script.ps1
+    r'^\.\/[a-zA-Z0-9_-]+\.bat$',        # ./script.bat
+    r'^\.\/[a-zA-Z0-9_-]+\.cmd$',        # ./script.cmd
+    r'\.\/akri\.sh$',                    # ./akri.sh specifically
+]
+
+# GitHub API URL patterns with variables
+GITHUB_API_VARIABLE_PATTERNS = [
+    r'\$gitHubAPIBaseUri\/repos\/\$githubUser\/\$appsRepo',
+    r'\$gitHubAPIBaseUri\/repos\/[^\/]+\/[^\/]+',
+    r'\$githubApiUrl',
+    r'api\.github\.com\/repos\/\$[a-zA-Z0-9_]+\/',
+]
+
+# Additional Management API domains that are valid but often give auth errors
+MANAGEMENT_API_DOMAINS = [
+    r'management\.core\.windows\.net',
+]
+
+# HTTP verbs that are commonly used in PowerShell scripts and not actual URLs
+HTTP_VERBS = [
+    r'^Get$', 
+    r'^POST$',
+    r'^GET$',
+    r'^PUT$',
+    r'^PATCH$',
+    r'^DELETE$',
+    r'^OPTIONS$',
+    r'^HEAD$',
+    r'^CONNECT$',
+    r'^TRACE$',
+    r'^Post$'
+]
+
+# Exact URLs that are known to be problematic
+HARDCODED_SKIP_URLS = [
+    "https://api.fabric.microsoft.com",
+    "https://api.powerbi.com",
+    "https://dashboards.kusto.windows.net",
+    "https://api.kusto.windows.net",
+    "https://analysis.windows.net",
+    "https://wabi-us-central-b-primary-redirect.analysis.windows.net",
+    "https://raw.githubusercontent.com/microsoft/azure_arc/main/azure_jumpstart_ag/",
+    "http://influxPlaceholder:8086",
+    "https://management.core.windows.net/", # Azure Management API
+]
+
+# Simple string patterns of URLs with backslashes
+BACKSLASH_URL_SUBSTRINGS = [
+    "http://\\",
+    "http:\\",
+    "http://\\\\",
+    "http:\\\\\\",
+    "https://\\",
+    "https://\\\\"
+]
+
+# =============================================================================
+# SKIP RULES
+# =============================================================================
+# The lists above are the built-in skip rules. A rules file (TOML, or YAML when
+# PyYAML is installed) can extend or replace any category, add new categories
+# and override rules for individual directories, without editing this script.
+# Each category is compiled into an indexed matcher: a set of hosts, a set of
+# exact URLs and one combined regex with a named group per pattern, so a match
+# also tells which rule was hit. Patterns that cannot share a regex (inline
+# global flags, backreferences, named groups) make their category fall back to
+# one regex per pattern.
+# =============================================================================
+
+SKIP_RULES_FILE = os.path.join(SCRIPT_DIR, 'skip_rules.toml')  # Loaded if it exists and no --rules file is given
+SKIP_RULES = None  # Created on first use by get_skip_rules()
+
+# Built-in skip rule categories in the order they are checked:
+# (category, message logged on a match, hosts, exact URLs, regex patterns)
+BUILTIN_SKIP_RULES = [
+    ('known_valid_domains', "Skipping trusted domain URL", KNOWN_VALID_DOMAINS, [], []),
+    ('backslash_urls', "Skipping URL with backslashes", [], [], [re.escape(text) for text in BACKSLASH_URL_SUBSTRINGS]),
+    ('http_verbs', "Skipping HTTP verb", [], [], [f'^(?:{verb})' for verb in HTTP_VERBS]),
+    ('placeholder_hostnames', "Skipping placeholder hostname URL", [], [],
+     [rf'(?i:https?://{hostname}(?::[0-9]+)?/?)' for hostname in PLACEHOLDER_HOSTNAMES]),
+    ('github_raw_urls', "Skipping GitHub raw placeholder URL", [], [], GITHUB_RAW_URLS),
+    ('template', "Skipping false positive template URL", [], [], TEMPLATE_PATTERNS),
+    ('placeholder', "Skipping false positive placeholder URL", [], [], PLACEHOLDER_PATTERNS),
+    ('powershell_variable', "Skipping PowerShell variable URL", [], [], POWERSHELL_VARIABLE_PATTERNS),
+    ('script_file', "Skipping script file or command URL", [], [], SCRIPT_FILE_PATTERNS),
+    ('escaped_backslash', "Skipping escaped backslash URL pattern", [], [], ESCAPED_BACKSLASH_PATTERNS),
+    ('template_variable', "Skipping template variable URL", [], [], TEMPLATE_VARIABLE_PATTERNS),
+    ('query_variable', "Skipping query variable URL", [], [], QUERY_VARIABLE_PATTERNS),
+    ('local_script', "Skipping local script file", [], [], LOCAL_SCRIPT_PATTERNS),
+    ('github_api_variable', "Skipping GitHub API URL variable", [], [], GITHUB_API_VARIABLE_PATTERNS),
+    ('management_api_domains', "Skipping management API domain", [], [], MANAGEMENT_API_DOMAINS),
+    ('xml_namespaces', "Skipping XML namespace URL", [], [], ['^' + re.escape(url) for url in XML_NAMESPACE_URLS]),
+    ('hardcoded_urls', "Skipping hardcoded URL", [], HARDCODED_SKIP_URLS, []),
+]
+
+# Keys allowed in a rule category of the rules file
+SKIP_RULE_KEYS = {'message', 'hosts', 'urls', 'patterns', 'replace'}
+
+# Group references whose meaning changes once a pattern is wrapped in a combined regex:
+# numbered backreferences, named backreferences and conditional groups
+SKIP_RULE_GROUP_REFERENCE_REGEX = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+def load_rules_config(path):
+    """
+    Read a rules file. TOML needs Python 3.11+ (or tomli), YAML needs PyYAML.
     
-    # Additional Management API domains that are valid but often give auth errors
-    management_api_domains = [
-        r'management\.core\.windows\.net',
-    ]
+    Raises:
+        ValueError: If the file cannot be read or parsed
+    """
+    try:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("YAML rules files need PyYAML (pip install pyyaml)")
+            with open(path, 'r', encoding='utf-8') as f:
+                try:
+                    data = yaml.safe_load(f) or {}
+                except yaml.YAMLError as e:
+                    raise ValueError(str(e))
+        else:
+            try:
+                import tomllib
+            except ImportError:
+                try:
+                    import tomli as tomllib
+                except ImportError:
+                    raise ValueError("TOML rules files need Python 3.11+ or tomli (pip install tomli)")
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+    except OSError as e:
+        raise ValueError(str(e))
+    if not isinstance(data, dict):
+        raise ValueError("expected a table/mapping at the top level")
+    return data
+
+def merge_skip_rules(categories, rules, source):
+    """
+    Apply the rule categories of a rules file (or one of its directories) to a rule set.
     
-    # HTTP verbs that are commonly used in PowerShell scripts and not actual URLs
-    http_verbs = [
-        r'^Get$', 
-        r'^POST$',
-        r'^GET$',
-        r'^PUT$',
-        r'^PATCH$',
-        r'^DELETE$',
-        r'^OPTIONS$',
-        r'^HEAD$',
-        r'^CONNECT$',
-        r'^TRACE$',
-        r'^Post$'
-    ]
+    Args:
+        categories: Dict of category -> {'message', 'hosts', 'urls', 'patterns'} (modified in place)
+        rules: The "rules" table from the rules file
+        source: Where the rules come from, used to report rule hits
+        
+    Raises:
+        ValueError: If a category is malformed or a pattern is not a valid regex
+    """
+    if not isinstance(rules, dict):
+        raise ValueError(f"{source}: 'rules' must be a table of categories")
+    for name, rule in rules.items():
+        if not isinstance(rule, dict) or not set(rule) <= SKIP_RULE_KEYS:
+            raise ValueError(f"{source}: rule category '{name}' must be a table with keys {', '.join(sorted(SKIP_RULE_KEYS))}")
+        category = categories.get(name)
+        if category is None or rule.get('replace'):
+            message = rule.get('message') or (category['message'] if category else f"Skipping {name.replace('_', ' ')} URL")
+            category = categories[name] = {'message': message, 'hosts': {}, 'urls': {}, 'patterns': {}}
+        elif rule.get('message'):
+            category['message'] = rule['message']
+        for kind in ('hosts', 'urls', 'patterns'):
+            values = rule.get(kind, [])
+            if not isinstance(values, list) or not all(isinstance(value, str) for value in values):
+                raise ValueError(f"{source}: '{name}.{kind}' must be a list of strings")
+            for value in values:
+                if kind == 'patterns':
+                    try:
+                        re.compile(value)
+                    except re.error as e:
+                        raise ValueError(f"{source}: invalid pattern in '{name}': {value} ({e})")
+                category[kind][value] = source
+
+def can_combine_pattern(pattern):
+    """
+    Check if a skip rule pattern keeps its meaning inside a combined regex.
     
-    # Check for standalone HTTP verbs
-    for verb in http_verbs:
-        if re.match(verb, url):
-            print(f"Skipping HTTP verb: {url}")
-            return True
+    Inline global flags like (?i) are only allowed at the start of a regex, named
+    groups clash when two patterns use the same name, and numbered backreferences
+    point at the wrong group once every pattern is wrapped in its own group.
+    """
+    compiled = re.compile(pattern)
+    if compiled.flags != re.compile('').flags or compiled.groupindex:
+        return False
+    return not (compiled.groups and SKIP_RULE_GROUP_REFERENCE_REGEX.search(pattern))
+
+def compile_skip_patterns(patterns):
+    """
+    Compile the patterns of one skip rule category.
     
-    # Check for placeholder hostnames
-    for hostname in placeholder_hostnames:
-        if re.search(rf'https?://{hostname}(?::[0-9]+)?/?', url, re.IGNORECASE):
-            print(f"Skipping placeholder hostname URL: {url}")
-            return True
+    Returns:
+        Tuple containing: (combined regex or None, list of (regex, pattern) for
+        categories that need one regex per pattern)
+    """
+    if not patterns:
+        return None, []
+    if all(can_combine_pattern(pattern) for pattern in patterns):
+        try:
+            return re.compile('|'.join(f'(?P<rule_{index}>{pattern})' for index, pattern in enumerate(patterns))), []
+        except re.error:
+            pass  # Fall back to one regex per pattern
+    return None, [(re.compile(pattern), pattern) for pattern in patterns]
+
+class SkipRuleMatcher:
+    """
+    Indexed matcher for one set of skip rule categories.
     
-    # Check for specific GitHub raw URLs that are placeholders
-    for pattern in github_raw_urls:
-        if re.search(pattern, url):
-            print(f"Skipping GitHub raw placeholder URL: {url}")
-            return True
+    Each category is checked with a host set lookup, an exact URL set lookup and
+    a single search of its combined regex (or of each pattern, see
+    compile_skip_patterns), in category order. Verdicts are memoized per URL, so
+    repeated URLs cost one dict lookup however many rules there are.
     
-    # Check if URL matches any of the template patterns
-    for pattern in template_patterns:
-        if re.search(pattern, url):
-            print(f"Skipping false positive template URL: {url}")
-            return True
+    Args:
+        categories: Ordered dict of category -> {'message', 'hosts', 'urls', 'patterns'}
+        exempt_hosts: Hosts that host rules never match (e.g. hosts validated against a sitemap)
+        
+    Raises:
+        re.error: If a pattern is not a valid regex
+    """
+    def __init__(self, categories, exempt_hosts=frozenset()):
+        self.exempt_hosts = exempt_hosts
+        self.categories = []
+        for name, category in categories.items():
+            patterns = list(category['patterns'])
+            regex, pattern_regexes = compile_skip_patterns(patterns)
+            self.categories.append((name, category['message'], frozenset(category['hosts']),
+                                    frozenset(category['urls']), regex, patterns, pattern_regexes))
+        self.uses_hosts = any(hosts for _, _, hosts, _, _, _, _ in self.categories)
+        self.verdicts = {}  # URL -> (category, rule, message), or None if no rule matches
     
-    # Check if URL matches any of the placeholder patterns
-    for pattern in placeholder_patterns:
-        if re.search(pattern, url):
-            print(f"Skipping false positive placeholder URL: {url}")
-            return True
+    def match(self, url):
+        """
+        Find the first rule that matches a URL.
+        
+        Returns:
+            Tuple containing: (category, rule, message), or None
+        """
+        try:
+            return self.verdicts[url]
+        except KeyError:
+            pass
+        netloc = None
+        if self.uses_hosts:
+            try:
+                netloc = urlparse(url).netloc
+            except ValueError:
+                pass  # Continue with other checks if parsing fails
+        verdict = None
+        for name, message, hosts, urls, regex, patterns, pattern_regexes in self.categories:
+            if netloc in hosts and netloc not in self.exempt_hosts:
+                verdict = (name, netloc, message)
+            elif url in urls:
+                verdict = (name, url, message)
+            elif regex is not None:
+                match = regex.search(url)
+                if match:
+                    verdict = (name, patterns[int(match.lastgroup[len('rule_'):])], message)
+            else:
+                for pattern_regex, pattern in pattern_regexes:
+                    if pattern_regex.search(url):
+                        verdict = (name, pattern, message)
+                        break
+            if verdict:
+                break
+        self.verdicts[url] = verdict
+        return verdict
+
+def get_applicable_directories(relative_folder, directories):
+    """Get the configured directories whose rules apply to a folder (relative to the repository root)."""
+    return tuple(directory for directory, _ in directories
+                 if relative_folder == directory or relative_folder.startswith(directory + '/'))
+
+def merge_directory_rules(categories, directories, applicable):
+    """Copy the top-level rule categories and apply the rules of the applicable directories to the copy."""
+    merged = {name: {'message': category['message'], **{kind: dict(category[kind]) for kind in ('hosts', 'urls', 'patterns')}}
+              for name, category in categories.items()}
+    for directory, rules in directories:
+        if directory in applicable:
+            merge_skip_rules(merged, rules, directory)
+    return merged
+
+class SkipRules:
+    """
+    Skip rules from the built-in lists and an optional rules file.
     
-    # Check if URL matches any of the PowerShell variable patterns
-    for pattern in powershell_variable_patterns:
-        if re.search(pattern, url):
-            print(f"Skipping PowerShell variable URL: {url}")
-            return True
+    The rules file may define top-level rules, which apply to every file, and
+    per-directory rules under "directories", which apply to files in that
+    directory (relative to the repository root) and its subdirectories. One
+    matcher is compiled per distinct combination of directories and cached per
+    source directory; the matchers for the top level and for every configured
+    directory are compiled when the file is loaded, so a rule set that cannot be
+    compiled fails at startup (or is rejected on reload). The file is reloaded
+    when its modification time changes (see reload_if_changed), which keeps
+    watch mode and the daemon up to date.
     
-    # Check if URL matches any of the script file patterns
-    for pattern in script_file_patterns:
-        if re.search(pattern, url):
-            print(f"Skipping script file or command URL: {url}")
-            return True
-            
-    # Check if URL matches escaped backslash patterns
-    for pattern in escaped_backslash_patterns:
-        if re.search(pattern, url):
-            print(f"Skipping escaped backslash URL pattern: {url}")
-            return True
+    Args:
+        path: Rules file, or None for the built-in rules only
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.mtime = None
+        self.hits = {}  # (category, rule) -> number of links skipped by the rule
+        self.exempt_hosts = frozenset()
+        self.load()
     
-    # Check if URL matches any of the template variable patterns
-    for pattern in template_variable_patterns:
-        if re.search(pattern, url):
-            print(f"Skipping template variable URL: {url}")
-            return True
+    def set_exempt_hosts(self, hosts):
+        """Never skip links because of these hosts (they are validated another way)."""
+        self.exempt_hosts = frozenset(host.lower() for host in hosts)
+        self.matchers = {}
+        self.matchers_by_folder = {}
     
-    # Check if URL matches any of the query variable patterns
-    for pattern in query_variable_patterns:
-        if re.search(pattern, url):
-            print(f"Skipping query variable URL: {url}")
-            return True
+    def load(self):
+        """
+        (Re)load the rules and drop all compiled matchers.
+        
+        Raises:
+            ValueError: If the rules file is invalid
+        """
+        categories = {name: {'message': message,
+                             'hosts': dict.fromkeys(hosts, 'built-in'),
+                             'urls': dict.fromkeys(urls, 'built-in'),
+                             'patterns': dict.fromkeys(patterns, 'built-in')}
+                      for name, message, hosts, urls, patterns in BUILTIN_SKIP_RULES}
+        cert_issue_domains = list(TRUSTED_DOMAINS_WITH_CERT_ISSUES)
+        directories = []
+        mtime = None
+        if self.path:
+            mtime = os.stat(self.path).st_mtime_ns if os.path.exists(self.path) else None
+            config = load_rules_config(self.path)
+            unknown = set(config) - {'rules', 'directories', 'trusted_domains_with_cert_issues'}
+            if unknown:
+                raise ValueError(f"unknown top-level keys: {', '.join(sorted(unknown))}")
+            merge_skip_rules(categories, config.get('rules', {}), os.path.basename(self.path))
+            cert_issue_domains.extend(config.get('trusted_domains_with_cert_issues', []))
+            for directory, override in config.get('directories', {}).items():
+                if not isinstance(override, dict) or set(override) - {'rules'}:
+                    raise ValueError(f"directory '{directory}' must be a table with a 'rules' table")
+                # Validate now, so a broken override fails at startup rather than mid-run
+                merge_skip_rules({}, override.get('rules', {}), directory)
+                directories.append((directory.strip('/'), override.get('rules', {})))
+        # Shallow directories first, so deeper overrides are applied last
+        directories.sort(key=lambda entry: entry[0].count('/'))
+        
+        # Compile the matcher of the top level and of each directory (merged with its
+        # parent directories) now, so every combined regex is known to work
+        matchers = {}
+        for applicable in [()] + [get_applicable_directories(directory, directories) for directory, _ in directories]:
+            if applicable not in matchers:
+                try:
+                    matchers[applicable] = SkipRuleMatcher(merge_directory_rules(categories, directories, applicable),
+                                                           self.exempt_hosts)
+                except re.error as e:
+                    raise ValueError(f"{applicable[-1] if applicable else 'top-level rules'}: patterns cannot be compiled ({e})")
+        
+        self.categories = categories
+        self.cert_issue_domains = cert_issue_domains
+        self.known_valid_hosts = frozenset(categories.get('known_valid_domains', {}).get('hosts', {}))
+        self.directories = directories
+        self.mtime = mtime
+        self.matchers = matchers      # Tuple of applicable directories -> SkipRuleMatcher
+        self.matchers_by_folder = {}  # Source folder -> SkipRuleMatcher
+        for name, rule in self.get_rule_sources():
+            self.hits.setdefault((name, rule), 0)
     
-    # Check for local script file patterns
-    for pattern in local_script_patterns:
-        if re.search(pattern, url):
-            print(f"Skipping local script file: {url}")
-            return True
+    def reload_if_changed(self):
+        """Reload the rules file if it changed on disk, keeping the current rules if it is invalid."""
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self.mtime:
+            return
+        try:
+            self.load()
+            print(f"{Colors.INFO}Reloaded skip rules from {self.path}{Colors.ENDC}")
+        except ValueError as e:
+            self.mtime = mtime
+            print(f"{Colors.FAIL}Error: Could not reload skip rules from {self.path}: {e} - keeping the previous rules{Colors.ENDC}")
     
-    # Check for GitHub API URL variable patterns
-    for pattern in github_api_variable_patterns:
-        if re.search(pattern, url):
-            print(f"Skipping GitHub API URL variable: {url}")
-            return True
+    def get_matcher(self, file_path):
+        """Get the compiled matcher for links in a file (None for links without a source file)."""
+        folder = os.path.dirname(os.path.abspath(file_path)) if file_path and self.directories else None
+        matcher = self.matchers_by_folder.get(folder)
+        if matcher is not None:
+            return matcher
+        
+        applicable = ()
+        if folder is not None:
+            relative_folder = os.path.relpath(folder, get_repo_path()).replace(os.sep, '/')
+            applicable = get_applicable_directories(relative_folder, self.directories)
+        matcher = self.matchers.get(applicable)
+        if matcher is None:
+            categories = merge_directory_rules(self.categories, self.directories, applicable)
+            for name, category in categories.items():
+                for kind in ('hosts', 'urls', 'patterns'):
+                    for rule in category[kind]:
+                        self.hits.setdefault((name, rule), 0)
+            matcher = self.matchers[applicable] = SkipRuleMatcher(categories, self.exempt_hosts)
+        self.matchers_by_folder[folder] = matcher
+        return matcher
     
-    # Check if URL contains management API domains
-    for domain in management_api_domains:
-        if re.search(domain, url):
-            print(f"Skipping management API domain: {url}")
-            return True
+    def match(self, url, file_path=None):
+        """
+        Find the skip rule that matches a link and count the hit.
+        
+        Returns:
+            Tuple containing: (category, rule, message), or None
+        """
+        verdict = self.get_matcher(file_path).match(url)
+        if verdict is not None:
+            key = verdict[:2]
+            self.hits[key] = self.hits.get(key, 0) + 1
+        return verdict
     
-    # Check if URL is an XML namespace
-    if url in xml_namespace_urls or url.startswith('http://www.w3.org/2000/svg') or url.startswith('http://www.w3.org/1999/xlink'):
-        print(f"Skipping XML namespace URL: {url}")
-        return True
+    def get_rule_sources(self):
+        """Map every known rule to where it was defined ("built-in", the rules file or a directory)."""
+        sources = {}
+        for name, category in self.categories.items():
+            for kind in ('hosts', 'urls', 'patterns'):
+                for rule, source in category[kind].items():
+                    sources[(name, rule)] = source
+        for directory, rules in self.directories:
+            for name, rule in rules.items():
+                for kind in ('hosts', 'urls', 'patterns'):
+                    for value in rule.get(kind, []):
+                        sources.setdefault((name, value), directory)
+        return sources
     
-    # Additional check for specific URLs that we know are problematic
-    hardcoded_urls_to_skip = [
-        "https://api.fabric.microsoft.com",
-        "https://api.powerbi.com",
-        "https://dashboards.kusto.windows.net",
-        "https://api.kusto.windows.net",
-        "https://analysis.windows.net",
-        "https://wabi-us-central-b-primary-redirect.analysis.windows.net",
-        "https://raw.githubusercontent.com/microsoft/azure_arc/main/azure_jumpstart_ag/",
-        "http://influxPlaceholder:8086",
-        "https://management.core.windows.net/", # Azure Management API
-    ]
+    def get_hit_counts(self):
+        """Get the hit count of every rule as a list of dicts, in rule order."""
+        sources = self.get_rule_sources()
+        return [{'category': name, 'rule': rule, 'source': sources.get((name, rule), 'removed'), 'hits': hits}
+                for (name, rule), hits in self.hits.items()]
+
+def get_skip_rules():
+    """Get the skip rules, loading the default rules file on first use."""
+    global SKIP_RULES
+    if SKIP_RULES is None:
+        SKIP_RULES = SkipRules(SKIP_RULES_FILE if os.path.exists(SKIP_RULES_FILE) else None)
+    return SKIP_RULES
+
+# Function to detect false positive URLs that should be skipped
+def is_false_positive(url, file_path=None):
+    """
+    Check if a URL matches a skip rule and should be skipped.
     
-    if url in hardcoded_urls_to_skip:
-        print(f"Skipping hardcoded URL: {url}")
-        return True
-            
-    return False
+    Args:
+        url: The URL to check
+        file_path: Source file of the link, used to apply per-directory rules
+    """
+    verdict = get_skip_rules().match(url, file_path)
+    if verdict is None:
+        return False
+    print(f"{verdict[2]}: {url}")
+    return True
 
 # Image file extensions to identify image links
 IMAGE_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp', '.ico']
 # SVG files get special treatment
 SVG_EXTENSIONS = ['.svg']
 
+MEDIA_EXTENSIONS = tuple(IMAGE_EXTENSIONS + SVG_EXTENSIONS)
+
+# Kinds of links that can be selected with --only
+LINK_KINDS = ['external', 'relative', 'anchors', 'images']
+ENABLED_LINK_KINDS = set(LINK_KINDS)  # Kinds of links to check (set by --only and --skip-external)
+
+def is_absolute_link(url):
+    """Check if a link is an absolute http(s) URL."""
+    return url.strip('"\'').lstrip()[:6].lower().startswith(('http:', 'https:'))
+
+def get_link_kind(url):
+    """
+    Classify a link for --only, in the same order check_relative_url handles them.
+    
+    Returns:
+        "external" for http(s) URLs, "anchors" for links with a #fragment, "images" for
+        image and SVG paths, and "relative" for other (document- or root-relative) paths
+    """
+    if is_absolute_link(url):
+        return 'external'
+    url = url.strip('"\'')
+    if '#' in url:
+        return 'anchors'
+    if url.lower().endswith(MEDIA_EXTENSIONS):
+        return 'images'
+    return 'relative'
+
+def parse_link_kinds(value):
+    """Parse a comma-separated list of link kinds for --only."""
+    kinds = [kind.strip() for kind in value.split(',') if kind.strip()]
+    unknown = [kind for kind in kinds if kind not in LINK_KINDS]
+    if not kinds or unknown:
+        raise argparse.ArgumentTypeError(f"invalid link kind(s): '{value}' (choose from {', '.join(LINK_KINDS)})")
+    return set(kinds)
+
 # Parse command line arguments
 def parse_arguments():
     """Parse command-line arguments."""
@@ -470,8 +837,27 @@ def parse_arguments():
     parser.add_argument(
         "--timeout",
         type=int,
-        default=TIMEOUT,
-        help=f"Timeout in seconds for HTTP requests (default: {TIMEOUT})"
+        help="Timeout in seconds for HTTP requests - sets both the connect and read timeout"
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        help=f"Connect timeout in seconds (default: {CONNECT_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        help=f"Read timeout in seconds before a host's latency is known (default: {TIMEOUT})"
+    )
+    parser.add_argument(
+        "--max-read-timeout",
+        type=float,
+        help=f"Upper bound for adaptive per-host read deadlines (default: {MAX_READ_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--no-adaptive-timeout",
+        action="store_true",
+        help="Always use the read timeout instead of per-host deadlines based on observed latency"
     )
     parser.add_argument(
         "--exclude",
@@ -479,7 +865,208 @@ def parse_arguments():
         default=[],
         help="Folders to exclude from checking (can specify multiple paths)"
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--cache-file",
+        default=EXTRACTION_CACHE_FILE,
+        help=f"File used to cache extracted URLs between runs (default: {EXTRACTION_CACHE_FILE})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the extraction cache and re-read every file"
+    )
+    parser.add_argument(
+        "--host-failure-threshold",
+        type=int,
+        default=HOST_FAILURE_THRESHOLD,
+        help=f"Consecutive connection failures before a host's remaining URLs are marked broken without a request, 0 to disable (default: {HOST_FAILURE_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--rules",
+        help=f"TOML (or YAML, with PyYAML) file with skip rules and per-directory overrides (default: {os.path.basename(SKIP_RULES_FILE)} next to this script, if it exists)"
+    )
+    parser.add_argument(
+        "--allow-local",
+        action="store_true",
+        help="Check localhost and IP-based URLs instead of skipping them (e.g. for test_server.py)"
+    )
+    parser.add_argument(
+        "--ca-bundle",
+        help="Extra CA certificates to trust for HTTPS URLs, in addition to the default CAs (e.g. the CA of test_server.py)"
+    )
+    parser.add_argument(
+        "--check-fragments",
+        action="store_true",
+        help="Also check that the #fragment of absolute URLs exists on the page (each page is downloaded once)"
+    )
+    parser.add_argument(
+        "--fragment-max-bytes",
+        type=int,
+        default=FRAGMENT_MAX_BYTES,
+        help=f"Stop reading a page for anchors after this many bytes (default: {FRAGMENT_MAX_BYTES})"
+    )
+    parser.add_argument(
+        "--sitemap",
+        type=parse_sitemap_argument,
+        action="append",
+        default=[],
+        metavar="HOST[=SITEMAP_URL]",
+        help="Validate links on HOST against its sitemap instead of skipping or requesting them (can be repeated); "
+             "the sitemap is found via robots.txt unless given"
+    )
+    parser.add_argument(
+        "--sitemap-ttl",
+        type=float,
+        default=SITEMAP_TTL_HOURS,
+        help=f"Hours a downloaded sitemap is reused before it is downloaded again (default: {SITEMAP_TTL_HOURS})"
+    )
+    parser.add_argument(
+        "--sitemap-throttle",
+        type=float,
+        default=SITEMAP_THROTTLE_SECONDS,
+        help=f"Minimum seconds between requests for paths missing from a host's sitemap (default: {SITEMAP_THROTTLE_SECONDS})"
+    )
+    parser.add_argument(
+        "--no-github-trees",
+        action="store_true",
+        help="Request GitHub file links one by one instead of validating them against repository trees"
+    )
+    parser.add_argument(
+        "--github-clone",
+        type=parse_github_clone,
+        action="append",
+        default=[],
+        metavar="OWNER/REPO=PATH",
+        help="Local clone to list the tree of a GitHub repository from (can be repeated; the checked repository's origin is used automatically)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=CHECK_WORKERS,
+        help=f"Initial number of unique absolute URLs checked concurrently, most referenced first and interleaved across hosts (default: {CHECK_WORKERS})"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=CHECK_MAX_WORKERS,
+        help=f"Upper bound the concurrency may grow to while hosts respond quickly (default: {CHECK_MAX_WORKERS})"
+    )
+    parser.add_argument(
+        "--no-adaptive-concurrency",
+        action="store_true",
+        help="Always check --workers URLs concurrently instead of adapting to timeouts, 429s and latency"
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=parse_duration,
+        metavar="DURATION",
+        help="Stop starting new checks in time to finish within this duration (e.g. 90s, 5m, 1h); "
+             "unchecked URLs are deferred to the next run, which checks them first"
+    )
+    parser.add_argument(
+        "--deferred-file",
+        default=DEFERRED_FILE,
+        help=f"File recording the URLs a time-budgeted run did not reach (default: {DEFERRED_FILE})"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=CHECKPOINT_FILE,
+        help=f"File the completed results and pending links are saved to while checking (default: {CHECKPOINT_FILE})"
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=CHECKPOINT_INTERVAL,
+        help=f"Seconds between checkpoints, 0 to only write one when interrupted (default: {CHECKPOINT_INTERVAL})"
+    )
+    parser.add_argument(
+        "--resume",
+        nargs="?",
+        const=CHECKPOINT_FILE,
+        metavar="CHECKPOINT",
+        help="Continue an interrupted run from its checkpoint (default: the --checkpoint file) instead of starting over"
+    )
+    parser.add_argument(
+        "--no-dns-preresolve",
+        action="store_true",
+        help="Do not resolve the DNS names of all hosts before checking"
+    )
+    parser.add_argument(
+        "--skip-external",
+        action="store_true",
+        help="Only check relative links, images and headers - absolute URLs are skipped and no HTTP library is loaded"
+    )
+    parser.add_argument(
+        "--only",
+        type=parse_link_kinds,
+        metavar="KINDS",
+        help=f"Only check these kinds of links, comma-separated ({', '.join(LINK_KINDS)}) - without 'external' the run is fully offline"
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="i/N",
+        help="Only check shard i of N (1-based); URLs are partitioned by hashing the URL"
+    )
+    parser.add_argument(
+        "--json-output",
+        help="Write machine-readable results to this file (sharded runs default to logs/results_shard_i_of_N.json)"
+    )
+    parser.add_argument(
+        "--max-broken",
+        type=parse_policy_gate,
+        action="append",
+        default=[],
+        metavar="GATE=N",
+        help="Allow up to N broken links for a gate before the run fails (can be repeated). Gates: total, "
+             "external, relative, anchors, images or a single category such as root_relative; "
+             "categories no gate covers allow none (default: total=0)"
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Stop as soon as a --max-broken gate is exceeded and cancel the checks that haven't started"
+    )
+    parser.add_argument(
+        "--baseline",
+        help="JSON file of known broken links - they are not reported, and known broken external URLs are only re-checked when due"
+    )
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Write the broken links of this run to the --baseline file (creating it if needed) and drop fixed ones"
+    )
+    parser.add_argument(
+        "--baseline-recheck-days",
+        type=float,
+        default=BASELINE_RECHECK_DAYS,
+        help=f"Days before a known broken external URL is requested again (default: {BASELINE_RECHECK_DAYS})"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After the first check, keep running and re-check links in files as they are saved"
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        default=WATCH_POLL_INTERVAL,
+        help=f"Seconds between scans when watching without watchdog installed (default: {WATCH_POLL_INTERVAL})"
+    )
+    args = parser.parse_args()
+    if args.watch and args.shard:
+        parser.error("--watch cannot be combined with --shard")
+    if args.watch and args.fail_fast:
+        parser.error("--watch cannot be combined with --fail-fast")
+    if args.update_baseline and not args.baseline:
+        parser.error("--update-baseline requires --baseline")
+    if args.workers < 1 or args.max_workers < 1:
+        parser.error("--workers and --max-workers must be at least 1")
+    if args.watch and args.time_budget:
+        parser.error("--watch cannot be combined with --time-budget")
+    if args.watch and args.resume:
+        parser.error("--watch cannot be combined with --resume")
+    return args
 
 # =============================================================================
 # FILE & URL PROCESSING FUNCTIONS
@@ -505,13 +1092,13 @@ def find_files_to_check(exclude_folders=None):
         if os.path.isabs(folder):
             abs_exclude_folders.append(os.path.normpath(folder))
         else:
-            abs_exclude_folders.append(os.path.normpath(os.path.join(REPO_PATH, folder)))
+            abs_exclude_folders.append(os.path.normpath(os.path.join(get_repo_path(), folder)))
     
     if exclude_folders:
         print(f"Excluding folders: {', '.join(exclude_folders)}")
     
     files_to_check = []
-    for root, dirs, files in os.walk(REPO_PATH):
+    for root, dirs, files in os.walk(get_repo_path()):
         # Skip 'archive' folders, hidden directories, and excluded folders
         dirs[:] = [d for d in dirs if d.lower() != 'archive' and not d.startswith('.')]
         
@@ -663,46 +1250,387 @@ def extract_urls_by_file_type(file_path):
     
     return urls
 
-def extract_urls(file_path):
-    """Extract all URLs from a file using the appropriate method based on file type."""
-    return extract_urls_by_file_type(file_path)
-
-def extract_headers(md_file):
-    """Extract all headers from a markdown file and convert to slug format for link validation."""
-    headers = []
-    # Only attempt to extract headers from markdown files
-    if not md_file.lower().endswith('.md'):
-        print(f"Warning: Attempted to extract headers from non-markdown file: {md_file}")
-        return headers
+def extract_urls(file_path, cache=None):
+    """
+    Extract all URLs from a file using the appropriate method based on file type.
+    
+    Args:
+        file_path: File to extract URLs from
+        cache: Optional ExtractionCache - unchanged files are served from it
         
-    try:
-        with open(md_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                if line.strip().startswith('#'):
-                    # Extract the header text (remove the # and any leading/trailing whitespace)
-                    header_text = line.lstrip('#').strip()
-                    
-                    # Convert to lowercase
-                    header_text_lower = header_text.lower()
-                    
-                    # Remove markdown formatting (bold, italic, code)
-                    header_text_clean = re.sub(r'[*_`]', '', header_text_lower)
-                    
-                    # Create slug: keep only alphanumeric chars and hyphens, replace spaces with hyphens
-                    header_slug = re.sub(r'[^\w\- ]', '', header_text_clean)
-                    header_slug = re.sub(r'\s+', '-', header_slug)
-                    
-                    # Add to the list of headers
-                    headers.append(header_slug)
-                    print(f"Found header: '{header_text}' -> slug: '{header_slug}'")
+    Returns:
+        List of URLs found in the file
+    """
+    if cache is None:
+        return extract_urls_by_file_type(file_path)
+    
+    urls = cache.get(file_path)
+    if urls is not None:
+        print(f"Found {len(urls)} URLs in {file_path} (cached)")
+        return urls
+    
+    urls = extract_urls_by_file_type(file_path)
+    cache.put(file_path, urls)
+    return urls
+
+def get_extraction_fingerprint():
+    """
+    Build a fingerprint of the inputs that affect URL extraction.
+    
+    Covers EXTRACTION_VERSION, the regexes, the supported file types and the
+    source of extract_urls_by_file_type. Changes elsewhere that alter what gets
+    extracted should bump EXTRACTION_VERSION so old cache entries are dropped.
+    """
+    patterns = [
+        MD_URL_REGEX, HTML_HREF_REGEX, HTML_SRC_REGEX, HTML_LINK_HREF_REGEX,
+        HTML_META_CONTENT_REGEX, CSS_URL_REGEX, JS_URL_REGEX, PY_URL_REGEX,
+        JSON_URL_REGEX, XML_URL_REGEX, SHELL_URL_REGEX, PS_URL_REGEX,
+        BATCH_URL_REGEX, SCRIPT_URL_REGEX, CONFIG_URL_REGEX,
+    ]
+    digest = hashlib.sha1(f"{EXTRACTION_VERSION}\x00".encode('utf-8'))
+    for pattern in patterns:
+        digest.update(f"{pattern.pattern}\x00{pattern.flags}\x00".encode('utf-8'))
+    digest.update(json.dumps(sorted(SUPPORTED_FILE_TYPES)).encode('utf-8'))
+    
+    import inspect
+    try:
+        digest.update(inspect.getsource(extract_urls_by_file_type).encode('utf-8'))
+    except (OSError, TypeError):
+        pass  # Source unavailable (e.g. frozen build) - rely on EXTRACTION_VERSION
+    return digest.hexdigest()
+
+class ExtractionCache:
+    """
+    Persistent cache of extracted URLs keyed by file path, size and mtime.
+    
+    Entries are only reused when the file's size and modification time are
+    unchanged, so any edit to a file forces it to be re-read. Entries for files
+    not looked up during a run can be dropped with prune().
+    """
+    
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.fingerprint = get_extraction_fingerprint()
+        self.entries = {}
+        self.seen = set()
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+    
+    def load(self):
+        """Load cache entries from disk, discarding them if the fingerprint changed."""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read extraction cache {self.cache_file}: {e}")
+            return
+        
+        if data.get('fingerprint') != self.fingerprint:
+            print("Extraction rules changed since the cache was written - ignoring cached URLs")
+            self.dirty = True
+            return
+        self.entries = data.get('files', {})
+    
+    def save(self):
+        """Write the cache to disk atomically if anything changed."""
+        if not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'fingerprint': self.fingerprint, 'files': self.entries}, f)
+            os.replace(tmp_file, self.cache_file)
+            self.dirty = False
+        except OSError as e:
+            print(f"Warning: Could not write extraction cache {self.cache_file}: {e}")
+    
+    @staticmethod
+    def _stat_key(file_path):
+        """Return the (size, mtime) pair used to detect file changes, or None."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    def get(self, file_path):
+        """Return cached URLs for an unchanged file, or None on a cache miss."""
+        key = os.path.abspath(file_path)
+        self.seen.add(key)
+        entry = self.entries.get(key)
+        if entry is not None and entry.get('stat') == self._stat_key(file_path):
+            self.hits += 1
+            return list(entry['urls'])
+        self.misses += 1
+        return None
+    
+    def put(self, file_path, urls):
+        """Store the URLs extracted from a file."""
+        stat_key = self._stat_key(file_path)
+        if stat_key is None:
+            return
+        key = os.path.abspath(file_path)
+        self.seen.add(key)
+        self.entries[key] = {'stat': stat_key, 'urls': list(urls)}
+        self.dirty = True
+    
+    def prune(self):
+        """
+        Drop entries for files not looked up since the cache was loaded.
+        
+        Keeps the cache from growing without bound as files are deleted or
+        renamed. Only call this after a run that visited every file it cares about.
+        
+        Returns:
+            Number of entries removed
+        """
+        stale = [key for key in self.entries if key not in self.seen]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self.dirty = True
+        return len(stale)
+
+# Markdown syntax recognized when extracting headers (CommonMark allows up to 3 spaces of indentation)
+ATX_HEADING_REGEX = re.compile(r'^ {0,3}#{1,6}(?:[ \t]+|$)')      # "## Heading"
+SETEXT_UNDERLINE_REGEX = re.compile(r'^ {0,3}(?:=+|-+)[ \t]*$')    # "Heading" underlined with === or ---
+CODE_FENCE_REGEX = re.compile(r'^ {0,3}(`{3,}|~{3,})')             # Start or end of a fenced code block
+HEADING_LINK_REGEX = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')         # Links and images keep their text only
+HEADING_HTML_TAG_REGEX = re.compile(r'</?[A-Za-z][^>]*>')
+HEADING_EMPHASIS_REGEX = re.compile(r'(?<!\w)_+|_+(?!\w)')         # Underscores that are emphasis, not part of a word
+NOT_SETEXT_TEXT_REGEX = re.compile(r'^(?: {4}|\t| {0,3}(?:[-*+>]|\d+[.)])(?:[ \t]|$))')  # Code, list items and quotes
+
+def slugify_header(header_text):
+    """
+    Convert heading text to the anchor GitHub generates for it (before duplicates are numbered).
+    
+    The rendered text is lowercased, punctuation is removed and every space
+    becomes a hyphen, so runs of spaces left by removed characters give runs
+    of hyphens: "C++ & Go: Tips" -> "c--go-tips".
+    """
+    text = HEADING_LINK_REGEX.sub(r'\1', header_text)
+    text = HEADING_HTML_TAG_REGEX.sub('', text)
+    text = HEADING_EMPHASIS_REGEX.sub('', text.replace('*', '').replace('`', ''))
+    text = re.sub(r'[^\w\- ]', '', text.lower().replace('\t', ' '))
+    return text.replace(' ', '-')
+
+def extract_headers(md_file):
+    """
+    Extract all headers from a markdown file and convert them to the anchors GitHub generates.
+    
+    ATX (#) and setext (underlined) headings are recognized; lines in fenced code
+    blocks and YAML front matter are ignored. Repeated slugs get GitHub's
+    duplicate suffixes: the second "## Install" is "install-1".
+    """
+    headers = []
+    # Only attempt to extract headers from markdown files
+    if not md_file.lower().endswith('.md'):
+        print(f"Warning: Attempted to extract headers from non-markdown file: {md_file}")
+        return headers
+        
+    try:
+        with open(md_file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
     except Exception as e:
         print(f"Warning: Could not extract headers from {md_file}: {str(e)}")
+        return headers
+    
+    occurrences = {}  # Slug -> number of times it was repeated, as counted by GitHub
+    fence = None      # Opening fence of the code block the current line is in
+    previous = ''     # Previous line, if it could be the text of a setext heading
+    index = 0
+    if lines and lines[0].strip() == '---':
+        # Skip YAML front matter
+        closing = next((i for i, line in enumerate(lines[1:], 1) if line.strip() in ('---', '...')), None)
+        if closing is not None:
+            index = closing + 1
+    for line in lines[index:]:
+        if fence:
+            stripped = line.strip()
+            if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                fence = None
+            continue
+        fence_match = CODE_FENCE_REGEX.match(line)
+        if fence_match:
+            fence = fence_match.group(1)
+            previous = ''
+            continue
+        
+        header_text = None
+        heading_match = ATX_HEADING_REGEX.match(line)
+        if heading_match:
+            # Remove the # and an optional closing sequence of #s
+            header_text = re.sub(r'(?:^|[ \t]+)#+[ \t]*$', '', line[heading_match.end():]).strip()
+            previous = ''
+        elif previous and SETEXT_UNDERLINE_REGEX.match(line):
+            header_text = previous.strip()
+            previous = ''
+        else:
+            previous = line if line.strip() and not NOT_SETEXT_TEXT_REGEX.match(line) else ''
+        if header_text is None:
+            continue
+        
+        # Number repeated slugs the way GitHub does: "install", "install-1", "install-2", ...
+        base_slug = header_slug = slugify_header(header_text)
+        while header_slug in occurrences:
+            occurrences[base_slug] += 1
+            header_slug = f"{base_slug}-{occurrences[base_slug]}"
+        occurrences[header_slug] = 0
+        
+        # Add to the list of headers
+        headers.append(header_slug)
+        print(f"Found header: '{header_text}' -> slug: '{header_slug}'")
+    return headers
+
+# Headers per markdown file, keyed by path: ((size, mtime_ns), headers)
+HEADER_CACHE = {}
+
+def get_headers(md_file):
+    """Get the header slugs of a markdown file, re-reading it only when it has changed."""
+    try:
+        stat = os.stat(md_file)
+        key = (stat.st_size, stat.st_mtime_ns)
+    except OSError:
+        return extract_headers(md_file)
+    cached = HEADER_CACHE.get(md_file)
+    if cached and cached[0] == key:
+        return cached[1]
+    headers = extract_headers(md_file)
+    HEADER_CACHE[md_file] = (key, headers)
     return headers
 
+# =============================================================================
+# LOCAL ANCHOR INDEX
+# =============================================================================
+# A file#anchor link to an in-repo file is validated against the anchors of the
+# target: heading slugs and HTML id/name attributes for Markdown, id and
+# <a name> attributes for HTML. The index is built lazily the first time a file
+# is linked to and is shared by every file that refers to it, so each target is
+# parsed once per change (keyed on size and mtime).
+# =============================================================================
+
+ANCHOR_INDEX_EXTENSIONS = ('.md', '.html', '.htm')  # Targets whose anchors can be validated
+
+def extract_html_anchors(text):
+    """Collect the id attributes and <a name> anchors of an HTML (or Markdown with inline HTML) document."""
+    from html.parser import HTMLParser
+    anchors = set()
+    def collect_anchors(tag, attrs):
+        for name, value in attrs:
+            if value and (name == 'id' or (name == 'name' and tag == 'a')):
+                anchors.add(value)
+    parser = HTMLParser(convert_charrefs=True)
+    parser.handle_starttag = collect_anchors
+    parser.handle_startendtag = collect_anchors
+    parser.feed(text)
+    parser.close()
+    return anchors
+
+class LocalAnchorIndex:
+    """
+    Anchors of in-repo files, built lazily per target file and shared by all referring files.
+    
+    Files with an extension outside ANCHOR_INDEX_EXTENSIONS, and files that
+    cannot be read, have no index; anchors pointing at them are reported as
+    not validated rather than broken.
+    """
+    def __init__(self):
+        self.entries = {}      # Absolute path -> ((size, mtime_ns), anchors or None)
+        self.lock = threading.Lock()
+        self.parses = 0        # Files parsed to build an index
+        self.validated = 0     # Anchors found in their target
+        self.missing = 0       # Anchors not found in their target
+    
+    def build(self, file_path):
+        """
+        Parse a file and collect its anchors.
+        
+        Returns:
+            Set of anchors, or None if the file cannot be indexed
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        except OSError as e:
+            print(f"Warning: Could not read {file_path} to index anchors: {str(e)}")
+            return None
+        self.parses += 1
+        anchors = extract_html_anchors(text)
+        if file_path.lower().endswith('.md'):
+            anchors.update(get_headers(file_path))
+        return anchors
+    
+    def get_anchors(self, file_path):
+        """Get the anchors of a file, parsing it only on first use or when it has changed."""
+        if not file_path.lower().endswith(ANCHOR_INDEX_EXTENSIONS):
+            return None
+        abs_path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(abs_path)
+            key = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            return None
+        with self.lock:
+            cached = self.entries.get(abs_path)
+            if cached and cached[0] == key:
+                return cached[1]
+            anchors = self.build(abs_path)
+            self.entries[abs_path] = (key, anchors)
+            return anchors
+    
+    def check(self, file_path, anchor):
+        """
+        Check whether an anchor exists in a file.
+        
+        Returns:
+            True if found, False if missing from an indexed file, or None if the file cannot be indexed
+        """
+        from urllib.parse import unquote
+        anchors = self.get_anchors(file_path)
+        if anchors is None:
+            return None
+        if anchor in anchors or unquote(anchor) in anchors:
+            self.validated += 1
+            return True
+        self.missing += 1
+        return False
+
+LOCAL_ANCHORS = LocalAnchorIndex()
+
+def check_local_anchor(target_file, anchor, md_file, detail):
+    """
+    Validate the anchor of a link to an existing in-repo file.
+    
+    Args:
+        target_file: Existing file the link points to
+        anchor: Anchor part of the link, without the #
+        md_file: Source file containing the link
+        detail: How the target was resolved, for the log entry
+        
+    Returns:
+        Log entry for the link
+    """
+    found = LOCAL_ANCHORS.check(target_file, anchor)
+    if found is None:
+        log_entry = f"{Colors.OKGREEN}[OK RELATIVE] {target_file}#{anchor} ({detail}, anchor not validated){Colors.ENDC}"
+    elif found:
+        log_entry = f"{Colors.OKGREEN}[OK RELATIVE] {target_file}#{anchor} ({detail}, anchor found){Colors.ENDC}"
+    else:
+        log_entry = f"{Colors.FAIL}[BROKEN RELATIVE WITH ANCHOR] {target_file}#{anchor} (anchor not found, linked from {md_file}){Colors.ENDC}"
+    print(log_entry)
+    return log_entry
+
 def is_ip_based_url(url):
     """Check if a URL uses an IP address instead of a domain name."""
+    import ipaddress
     try:
         host = urlparse(url).hostname
+        if not host:
+            return False  # Relative paths have no host
         ipaddress.ip_address(host)
         return True
     except ValueError:
@@ -710,8 +1638,460 @@ def is_ip_based_url(url):
 
 # Define a list of temporary error status codes
 TEMPORARY_ERROR_CODES = [502, 503, 504, 429]  # Added 429 (Too Many Requests)
+CHECK_RETRIES = 3  # Attempts per URL before a temporary error is reported
+
+# Retry backoff - transient failures of a run are retried after a delay instead of back to back
+RETRY_BACKOFF_BASE = 2.0   # Seconds before the first retry, doubled for every further retry
+RETRY_AFTER_MAX = 60.0     # Upper bound for waits requested by a Retry-After header (seconds)
+
+class RetryBackoff:
+    """
+    Delays before transient failures are retried.
+    
+    The delay grows exponentially with the attempt, and a Retry-After header on
+    a 429 or 5xx response holds back every retry to that host until it has passed.
+    """
+    
+    def __init__(self):
+        self.host_ready_at = {}   # host -> time.monotonic() before which the host asked not to be retried
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def parse_retry_after(value):
+        """Parse a Retry-After header (seconds or an HTTP date) into seconds, or None if invalid."""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        from email.utils import parsedate_to_datetime
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            return None
+        return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+    
+    def record_retry_after(self, host, value):
+        """Remember the Retry-After header of a temporary error response from a host."""
+        seconds = self.parse_retry_after(value)
+        if seconds is None:
+            return
+        ready_at = time.monotonic() + min(seconds, RETRY_AFTER_MAX)
+        with self.lock:
+            self.host_ready_at[host] = max(ready_at, self.host_ready_at.get(host, 0))
+    
+    def get_delay(self, host, attempt):
+        """Get the seconds to wait before the given (1-based) retry attempt of a URL on a host."""
+        delay = RETRY_BACKOFF_BASE * (2 ** (attempt - 1))
+        with self.lock:
+            host_wait = self.host_ready_at.get(host, 0) - time.monotonic()
+        return max(delay, host_wait)
+
+# Shared retry backoff state for the whole run
+RETRY_BACKOFF = RetryBackoff()
+
+class RetryLater(Exception):
+    """
+    Raised by check_absolute_url when a transient failure should be retried later instead of inline.
+    
+    Args:
+        attempt: Zero-based attempt to make next
+        delay: Seconds to wait before that attempt
+        reason: Description of the transient failure
+    """
+    def __init__(self, attempt, delay, reason):
+        super().__init__(reason)
+        self.attempt = attempt
+        self.delay = delay
+        self.reason = reason
+
+class CheckDeferred(Exception):
+    """
+    Raised by check_absolute_url when a failure cannot be retried because the time
+    budget has run out or the run was interrupted. The URL is neither OK nor
+    broken: it is deferred to the next run, or left pending for --resume (see
+    CheckScheduler).
+    
+    Args:
+        reason: Description of the transient failure
+    """
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+# Host health settings
+HOST_FAILURE_THRESHOLD = 3   # Consecutive connection failures before a host is treated as down
+DNS_RESOLVE_WORKERS = 32     # Concurrent DNS lookups during pre-resolution
+
+class HostHealthTracker:
+    """
+    Track which hosts are unreachable so their remaining URLs can be short-circuited.
+    
+    A host is marked down when its DNS name does not exist, or after
+    `failure_threshold` consecutive connection failures. Later URLs on a down host
+    are reported as broken without sending a request.
+    """
+    
+    def __init__(self, failure_threshold=HOST_FAILURE_THRESHOLD):
+        self.failure_threshold = failure_threshold
+        self.consecutive_failures = {}
+        self.down_hosts = {}        # host -> reason the host was marked down
+        self.short_circuited = {}   # host -> number of URLs reported without a request
+        self.lock = threading.Lock()
+    
+    def preresolve(self, hosts):
+        """
+        Resolve DNS for all hosts concurrently and mark hosts that do not exist as down.
+        
+        Skipped when a proxy is configured, because the proxy resolves names itself.
+        
+        Args:
+            hosts: Iterable of hostnames
+            
+        Returns:
+            Number of hosts marked down
+        """
+        hosts = sorted(set(host for host in hosts if host))
+        if not hosts:
+            return 0
+        from urllib.request import getproxies
+        if getproxies():
+            print("Proxy configured - skipping DNS pre-resolution")
+            return 0
+        
+        from concurrent.futures import ThreadPoolExecutor
+        print(f"Pre-resolving DNS for {len(hosts)} hosts...")
+        with ThreadPoolExecutor(max_workers=min(DNS_RESOLVE_WORKERS, len(hosts))) as executor:
+            errors = list(executor.map(self._resolve, hosts))
+        
+        failed = 0
+        for host, error in zip(hosts, errors):
+            if error is not None:
+                self.mark_down(host, f"DNS resolution failed: {error}")
+                failed += 1
+        print(f"DNS pre-resolution complete: {len(hosts) - failed} resolved, {failed} failed")
+        return failed
+    
+    @staticmethod
+    def _resolve(host):
+        """Resolve a hostname, returning None on success or the error for names that don't exist."""
+        try:
+            socket.getaddrinfo(host, None)
+        except socket.gaierror as e:
+            # Temporary resolver failures are not proof that the host is down
+            if e.errno == getattr(socket, 'EAI_AGAIN', None):
+                return None
+            return e.strerror or str(e)
+        except (OSError, UnicodeError) as e:
+            return str(e)
+        return None
+    
+    def is_down(self, host):
+        """Return the reason a host was marked down, or None if it is considered healthy."""
+        return self.down_hosts.get(host)
+    
+    def mark_down(self, host, reason):
+        """Mark a host as down."""
+        with self.lock:
+            if host not in self.down_hosts:
+                self.down_hosts[host] = reason
+                print(f"Marking host as down: {host} ({reason})")
+    
+    def record_success(self, host):
+        """Reset the failure count after the host answered a request."""
+        with self.lock:
+            self.consecutive_failures.pop(host, None)
+    
+    def record_failure(self, host, error):
+        """
+        Record a connection failure for a host.
+        
+        Returns:
+            True if the host is now considered down
+        """
+        if not self.failure_threshold:
+            return False
+        with self.lock:
+            failures = self.consecutive_failures.get(host, 0) + 1
+            self.consecutive_failures[host] = failures
+        if failures >= self.failure_threshold:
+            self.mark_down(host, f"{failures} consecutive connection failures, last: {type(error).__name__}")
+            return True
+        return False
+    
+    def record_short_circuit(self, host):
+        """Count a URL that was reported broken without being requested."""
+        with self.lock:
+            self.short_circuited[host] = self.short_circuited.get(host, 0) + 1
+    
+    def reset(self):
+        """Forget all host state, e.g. when a long-running daemon expires its results."""
+        with self.lock:
+            self.consecutive_failures.clear()
+            self.down_hosts.clear()
+            self.short_circuited.clear()
+
+# Shared host health state for the whole run
+HOST_HEALTH = HostHealthTracker()
+
+class LatencyTracker:
+    """
+    Track response latency per host and derive adaptive read deadlines from it.
+    
+    Slow-but-healthy hosts get a deadline above the configured read timeout so
+    they stop timing out. The deadline never drops below the read timeout, so a
+    slow page on an otherwise fast host is not reported broken.
+    """
+    
+    def __init__(self):
+        self.samples = {}   # host -> deque of recent latencies in seconds
+        self.enabled = True
+        self.lock = threading.Lock()
+    
+    def record(self, host, latency):
+        """Record the latency of a request that got a response."""
+        with self.lock:
+            self.samples.setdefault(host, deque(maxlen=LATENCY_WINDOW)).append(latency)
+    
+    def p95(self, host):
+        """Return the host's 95th percentile latency, or None without enough samples."""
+        with self.lock:
+            samples = sorted(self.samples.get(host, ()))
+        if len(samples) < ADAPTIVE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    
+    def read_deadline(self, host):
+        """Return the read deadline for a host based on its observed p95 latency."""
+        p95 = self.p95(host) if self.enabled else None
+        if p95 is None:
+            return TIMEOUT
+        return max(TIMEOUT, min(MAX_READ_TIMEOUT, p95 * ADAPTIVE_TIMEOUT_MULTIPLIER))
+
+# Shared latency statistics for the whole run
+HOST_LATENCY = LatencyTracker()
+
+def get_request_timeout(host, attempt=0):
+    """
+    Get the (connect, read) timeout for a request to a host.
+    
+    The read deadline doubles on every retry (up to MAX_READ_TIMEOUT) so a page
+    that is slower than the rest of its host still gets a fair chance.
+    
+    Args:
+        host: Hostname being requested
+        attempt: Zero-based retry attempt
+        
+    Returns:
+        Tuple containing: (connect_timeout, read_timeout)
+    """
+    read_timeout = HOST_LATENCY.read_deadline(host)
+    if attempt:
+        read_timeout = max(read_timeout, min(MAX_READ_TIMEOUT, read_timeout * (2 ** attempt)))
+    return CONNECT_TIMEOUT, read_timeout
+
+def is_connection_failure(error):
+    """Check if a request error means the host could not be reached at all."""
+    import requests
+    if isinstance(error, requests.exceptions.SSLError):
+        return False  # The host answered, the certificate is the problem
+    return isinstance(error, (requests.ConnectionError, requests.exceptions.ConnectTimeout))
+
+# Redirect handling - redirects are followed hop by hop so every hop can be memoized
+REDIRECT_STATUS_CODES = [301, 302, 303, 307, 308]
+MAX_REDIRECTS = 30  # Same limit requests uses when following redirects itself
+
+# Connection pooling - one session for the whole run keeps connections to each host alive
+HTTP_POOL_SIZE = 32          # Connections kept per host
+POOLED_BODY_LIMIT = 64 * 1024  # Bodies up to this size are drained so their connection can be reused
+HTTP_SESSION = None
+HTTP_SESSION_LOCK = threading.Lock()
+
+def build_ca_bundle(path):
+    """
+    Combine the default CA bundle of requests (certifi) with extra CA certificates.
+    
+    requests replaces the default CAs with the bundle passed as `verify`, so
+    trusting only the given file would make every public HTTPS link fail. The
+    combined bundle is written to the cache directory.
+    
+    Returns:
+        Path of the combined bundle
+        
+    Raises:
+        ValueError: If a bundle cannot be read or the combined bundle cannot be written
+    """
+    from requests.certs import where
+    try:
+        with open(where(), 'r', encoding='utf-8') as f:
+            default_cas = f.read()
+        with open(path, 'r', encoding='utf-8') as f:
+            extra_cas = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        raise ValueError(str(e))
+    if 'BEGIN CERTIFICATE' not in extra_cas:
+        raise ValueError("no PEM certificates found")
+    digest = hashlib.sha1(os.path.abspath(path).encode('utf-8')).hexdigest()[:12]
+    bundle = os.path.join(CACHE_DIR, f'ca_bundle_{digest}.pem')
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f"{bundle}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(default_cas.rstrip('\n') + '\n' + extra_cas)
+        os.replace(tmp_file, bundle)
+    except OSError as e:
+        raise ValueError(str(e))
+    return bundle
+
+def get_http_session():
+    """Get the shared requests session, creating it on first use."""
+    import requests
+    global HTTP_SESSION
+    with HTTP_SESSION_LOCK:
+        if HTTP_SESSION is None:
+            HTTP_SESSION = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+            HTTP_SESSION.mount('http://', adapter)
+            HTTP_SESSION.mount('https://', adapter)
+        return HTTP_SESSION
+
+def release_response(response):
+    """
+    Close a streamed response, returning its connection to the pool when possible.
+    
+    Unread bodies force the connection to be dropped, so small bodies are drained
+    first; large or unknown-length bodies are not worth downloading.
+    """
+    import requests
+    content_length = response.headers.get('Content-Length', '')
+    if content_length.isdigit() and int(content_length) <= POOLED_BODY_LIMIT:
+        try:
+            response.content
+        except requests.RequestException:
+            pass
+    response.close()
+
+# URL normalization - variants of a URL that differ only in trivial ways share one request
+URL_TRAILING_PUNCTUATION = '.,;:!?'  # Sentence punctuation the extraction regexes may capture
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+TRACKING_PARAMETERS = {'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', 'wt.mc_id', 'ocid'}  # Besides utm_*
+
+def is_tracking_parameter(name):
+    """Check if a query parameter only tracks the visit and doesn't change the page."""
+    name = name.lower()
+    return name.startswith('utm_') or name in TRACKING_PARAMETERS
+
+def normalize_url(url):
+    """
+    Canonicalize an absolute URL so trivially different variants are checked once.
+    
+    Strips quotes, trailing sentence punctuation and unbalanced closing
+    parentheses, lowercases the scheme and host, drops default ports, tracking
+    query parameters (utm_*, gclid, ...) and the #fragment, and turns an empty
+    path into "/". URLs that cannot be parsed are returned stripped but otherwise
+    unchanged.
+    """
+    from urllib.parse import urlsplit, urlunsplit, unquote_plus
+    url = url.strip().lstrip('"\'')
+    while url and (url[-1] in URL_TRAILING_PUNCTUATION or url[-1] in '"\'' or (url[-1] == ')' and url.count(')') > url.count('('))):
+        url = url[:-1]
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        host = f"[{host}]"  # IPv6 literal
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username is not None:
+        userinfo = parts.username + (f":{parts.password}" if parts.password is not None else "")
+        host = f"{userinfo}@{host}"
+    # Parameters are filtered as written, so the encoding of the others is kept as is
+    query = '&'.join(parameter for parameter in parts.query.split('&')
+                     if parameter and not is_tracking_parameter(unquote_plus(parameter.split('=', 1)[0])))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
+
+# Shared redirect state for the whole run
+REDIRECT_MAP = {}      # URL -> next hop URL, for every redirect response seen
+RESOLVED_URLS = {}     # URL -> (status_code, final_url, hops_to_final), for every hop of a completed chain
+CANONICAL_URLS = {}    # Checked URL -> (final_url, hop_count), for URLs that redirect
+
+def resolve_url(url, attempt=0):
+    """
+    Follow the redirect chain for a URL one hop at a time.
+    
+    Every hop is recorded in REDIRECT_MAP and the final result in RESOLVED_URLS,
+    so later URLs that reach an already-seen hop (e.g. the same aka.ms shortlink
+    or an http:// to https:// upgrade) reuse the result instead of re-requesting it.
+    
+    Args:
+        url: The URL to resolve
+        attempt: Zero-based retry attempt, used to pick the read deadline
+        
+    Returns:
+        Tuple containing: (status_code, final_url, hop_count)
+    """
+    import requests
+    chain = []
+    current = normalize_url(url)  # Fragments are never sent and variants of a URL share one request
+    remaining_hops = 0  # Hops beyond the end of `chain`, known from a memoized result
+    
+    while True:
+        if current in RESOLVED_URLS:
+            status_code, final_url, remaining_hops = RESOLVED_URLS[current]
+            print(f"Reusing memoized result for {current}: {status_code} ({final_url})")
+            break
+        
+        if current in chain or len(chain) >= MAX_REDIRECTS:
+            raise requests.TooManyRedirects(f"Exceeded {MAX_REDIRECTS} redirects or hit a redirect loop at {current}")
+        
+        if current in REDIRECT_MAP:
+            chain.append(current)
+            current = REDIRECT_MAP[current]
+            continue
+        
+        host = urlparse(current).hostname
+        response = get_http_session().get(current, headers=HEADERS, allow_redirects=False,
+                                          timeout=get_request_timeout(host, attempt), stream=True, verify=CA_BUNDLE or True)
+        release_response(response)  # Only the status line and headers are needed
+        HOST_LATENCY.record(host, response.elapsed.total_seconds())
+        if response.status_code in TEMPORARY_ERROR_CODES:
+            RETRY_BACKOFF.record_retry_after(host, response.headers.get('Retry-After'))
+            CONCURRENCY.record_congestion(f"status code {response.status_code} from {host}")
+        else:
+            CONCURRENCY.record_response(response.elapsed.total_seconds())
+        
+        location = response.headers.get('Location')
+        if response.status_code in REDIRECT_STATUS_CODES and location:
+            next_url = urljoin(current, location)
+            print(f"Redirect {response.status_code}: {current} -> {next_url}")
+            REDIRECT_MAP[current] = next_url
+            chain.append(current)
+            current = next_url
+            continue
+        
+        status_code, final_url = response.status_code, current
+        break
+    
+    hop_count = len(chain) + remaining_hops
+    
+    # Temporary errors are not memoized so that retries hit the network again
+    if status_code not in TEMPORARY_ERROR_CODES:
+        for index, hop in enumerate(chain):
+            RESOLVED_URLS[hop] = (status_code, final_url, hop_count - index)
+        RESOLVED_URLS.setdefault(current, (status_code, final_url, remaining_hops))
+    
+    if hop_count:
+        CANONICAL_URLS[url] = (final_url, hop_count)
+    
+    return status_code, final_url, hop_count
 
-def check_absolute_url(url, md_file=None, retries=3):
+def check_absolute_url(url, md_file=None, retries=CHECK_RETRIES, attempt=None):
     """
     Check if an absolute URL (http/https) is reachable.
     
@@ -719,55 +2099,117 @@ def check_absolute_url(url, md_file=None, retries=3):
         url: The URL to check
         md_file: Source markdown file containing this URL
         retries: Number of attempts before giving up
+        attempt: Zero-based attempt to start at. When given, timeouts, connection
+            failures and temporary status codes raise RetryLater instead of being
+            retried inline (or CheckDeferred once the time budget is exhausted or
+            the run is interrupted);
+            when None, all attempts are made back to back
         
     Returns:
         Log entry string with result
+        
+    Raises:
+        RetryLater: If a transient failure should be retried later (only when `attempt` is given)
+        CheckDeferred: If a failure cannot be retried in this run (only when `attempt` is given)
     """
+    # Validate links to files in GitHub repositories against the repository tree
+    log_entry = GITHUB_TREES.check(url, md_file)
+    if log_entry:
+        return log_entry
+    
+    # Validate links on sitemap hosts against the sitemap; unlisted paths are requested, throttled
+    log_entry = SITEMAPS.check(url)
+    if log_entry:
+        return log_entry
+    
+    import requests
     # Extract domain from URL for domain-based verification
     parsed_url = urlparse(url)
     domain = parsed_url.netloc
-    is_trusted_domain = domain in KNOWN_VALID_DOMAINS
+    is_trusted_domain = domain in get_skip_rules().known_valid_hosts
     
     print(f"Checking absolute URL: {url}")
     print(f"Domain: {domain}, Trusted: {is_trusted_domain}")
     
-    attempt = 0
+    # Short-circuit URLs on hosts that are already known to be unreachable
+    down_reason = HOST_HEALTH.is_down(parsed_url.hostname)
+    if down_reason:
+        file_info = f" (in file: {md_file})" if md_file else ""
+        HOST_HEALTH.record_short_circuit(parsed_url.hostname)
+        if is_trusted_domain:
+            log_entry = f"{Colors.OKGREEN}[OK ABSOLUTE] {url} (trusted domain, host unreachable: {down_reason}){file_info}{Colors.ENDC}"
+        else:
+            log_entry = f"{Colors.FAIL}[BROKEN ABSOLUTE] {url} - Host unreachable, not requested ({down_reason}){file_info}{Colors.ENDC}"
+        print(log_entry)
+        return log_entry
+    
+    defer_retries = attempt is not None
+    attempt = attempt or 0
     while attempt < retries:
         try:
-            # Make the request with configured timeout
-            response = requests.get(url, headers=HEADERS, allow_redirects=True, timeout=TIMEOUT, stream=True)
+            # Follow redirects with the configured timeout, reusing memoized hops
+            status_code, final_url, hop_count = resolve_url(url, attempt)
+            HOST_HEALTH.record_success(parsed_url.hostname)
             
-            if response.status_code < 400:
-                log_entry = f"{Colors.OKGREEN}[OK ABSOLUTE] {url}{Colors.ENDC}"
+            if status_code < 400:
+                redirect_info = f" (redirects to {final_url})" if hop_count else ""
+                # Validate the #fragment against the anchors of the page it lands on
+                if REMOTE_ANCHORS.enabled and parsed_url.fragment:
+                    if REMOTE_ANCHORS.check(final_url, parsed_url.fragment) is False:
+                        file_info = f" (in file: {md_file})" if md_file else ""
+                        log_entry = f"{Colors.FAIL}[BROKEN ABSOLUTE] {url} - Anchor #{parsed_url.fragment} not found on the page{redirect_info}{file_info}{Colors.ENDC}"
+                        print(log_entry)
+                        return log_entry
+                log_entry = f"{Colors.OKGREEN}[OK ABSOLUTE] {url}{redirect_info}{Colors.ENDC}"
                 print(log_entry)
                 return log_entry
-            elif response.status_code in TEMPORARY_ERROR_CODES:
+            elif status_code in TEMPORARY_ERROR_CODES:
                 # For temporary errors, handle differently based on trusted status
-                print(f"Status Code {response.status_code} for {url}. Retrying... ({attempt + 1}/{retries})")
+                print(f"Status Code {status_code} for {url}. Retrying... ({attempt + 1}/{retries})")
                 attempt += 1
                 
-                if attempt >= retries:
+                if defer_retries and attempt < retries and (TIME_BUDGET.is_exhausted() or INTERRUPTED.is_set()):
+                    # Out of time (--time-budget) or interrupted - leave the URL unverified rather than report a transient failure
+                    raise CheckDeferred(f"status code {status_code}")
+                if attempt >= retries or STOP_EVENT.is_set() or TIME_BUDGET.is_exhausted():
                     file_info = f" (in file: {md_file})" if md_file else ""
                     
                     if is_trusted_domain:
                         # For trusted domains, mark as OK even with temporary errors
-                        log_entry = f"{Colors.OKGREEN}[OK ABSOLUTE] {url} (trusted domain with temporary status code: {response.status_code}){file_info}{Colors.ENDC}"
+                        log_entry = f"{Colors.OKGREEN}[OK ABSOLUTE] {url} (trusted domain with temporary status code: {status_code}){file_info}{Colors.ENDC}"
                         print(log_entry)
                         return log_entry
                     else:
                         # For non-trusted domains, still mark as broken but note it might be temporary
-                        log_entry = f"{Colors.FAIL}[BROKEN ABSOLUTE] {url} - Temporary error: {response.status_code}{file_info}{Colors.ENDC}"
+                        log_entry = f"{Colors.FAIL}[BROKEN ABSOLUTE] {url} - Temporary error: {status_code}{file_info}{Colors.ENDC}"
                         print(log_entry)
                         return log_entry
+                if defer_retries:
+                    raise RetryLater(attempt, RETRY_BACKOFF.get_delay(parsed_url.hostname, attempt), f"status code {status_code}")
             else:
                 file_info = f" (in file: {md_file})" if md_file else ""
                 # For non-temporary errors, mark as broken even for trusted domains
-                log_entry = f"{Colors.FAIL}[BROKEN ABSOLUTE] {url} - Status Code: {response.status_code}{file_info}{Colors.ENDC}"
+                log_entry = f"{Colors.FAIL}[BROKEN ABSOLUTE] {url} - Status Code: {status_code}{file_info}{Colors.ENDC}"
                 print(log_entry)
                 return log_entry
                 
         except requests.RequestException as e:
             file_info = f" (in file: {md_file})" if md_file else ""
+            failed_url = e.request.url if getattr(e, 'request', None) is not None else url
+            is_transient = isinstance(e, (requests.Timeout, requests.ConnectionError)) and not isinstance(e, requests.exceptions.SSLError)
+            if is_transient:
+                CONCURRENCY.record_congestion(f"{type(e).__name__} on {urlparse(failed_url).hostname}")
+            
+            # Stop retrying once the host has failed too many times in a row
+            if is_connection_failure(e):
+                failed_host = urlparse(failed_url).hostname
+                if HOST_HEALTH.record_failure(failed_host, e):
+                    if is_trusted_domain:
+                        log_entry = f"{Colors.OKGREEN}[OK ABSOLUTE] {url} (trusted domain, connection issue: {type(e).__name__}){file_info}{Colors.ENDC}"
+                    else:
+                        log_entry = f"{Colors.FAIL}[BROKEN ABSOLUTE] {url} - Error: {e} (host marked down after {HOST_HEALTH.failure_threshold} consecutive connection failures){file_info}{Colors.ENDC}"
+                    print(log_entry)
+                    return log_entry
             
             # For connection errors on trusted domains, consider as temporarily unavailable
             if is_trusted_domain and isinstance(e, (
@@ -782,16 +2224,26 @@ def check_absolute_url(url, md_file=None, retries=3):
                     return log_entry
             
             # Special handling for certificate errors on trusted domains
+            # (the failing hop may be a redirect target such as an Azure Front Door CDN host)
             if isinstance(e, requests.exceptions.SSLError):
-                if any(trusted_domain in domain for trusted_domain in TRUSTED_DOMAINS_WITH_CERT_ISSUES) or any(trusted_domain in url for trusted_domain in TRUSTED_DOMAINS_WITH_CERT_ISSUES):
+                if any(trusted_domain in domain or trusted_domain in url or trusted_domain in failed_url for trusted_domain in get_skip_rules().cert_issue_domains):
                     log_entry = f"{Colors.OKGREEN}[OK ABSOLUTE] {url} (trusted domain with certificate issue){file_info}{Colors.ENDC}"
                     print(log_entry)
                     return log_entry
             
+            if defer_retries and attempt + 1 < retries and (INTERRUPTED.is_set() or (is_transient and TIME_BUDGET.is_exhausted())):
+                # Interrupted, or out of time (--time-budget) - leave the URL unverified rather than report a failure that would be retried
+                raise CheckDeferred(type(e).__name__)
+            
             log_entry = f"{Colors.FAIL}[BROKEN ABSOLUTE] {url} - Error: {e}{file_info}{Colors.ENDC}"
             print(log_entry)
             attempt += 1
+            if STOP_EVENT.is_set() or TIME_BUDGET.is_exhausted():
+                # The run is already failing (--fail-fast) or out of time (--time-budget) - don't spend time on retries
+                return log_entry
             if attempt < retries:
+                if defer_retries and is_transient:
+                    raise RetryLater(attempt, RETRY_BACKOFF.get_delay(parsed_url.hostname, attempt), type(e).__name__)
                 print(f"Retrying... ({attempt}/{retries})")
             else:
                 return log_entry
@@ -915,8 +2367,8 @@ def check_relative_url(url, md_file):
         anchor_text = anchor
         # If it's a same-page link (just #header)
         if not base_url:
-            headers = extract_headers(md_file)
-            if anchor in headers:
+            headers = get_headers(md_file)
+            if LOCAL_ANCHORS.check(md_file, anchor):
                 log_entry = f"{Colors.OKGREEN}[OK HEADER] #{anchor} (header in {md_file}){Colors.ENDC}"
                 print(log_entry)
                 return log_entry, False, False, False, has_anchor
@@ -935,16 +2387,14 @@ def check_relative_url(url, md_file):
                 # Check if an _index.md file exists in the directory
                 index_file = os.path.join(target_file, "_index.md")
                 if os.path.exists(index_file):
-                    log_entry = f"{Colors.OKGREEN}[OK RELATIVE] {index_file}#{anchor} (directory with _index.md, anchor not validated){Colors.ENDC}"
-                    print(log_entry)
+                    log_entry = check_local_anchor(index_file, anchor, md_file, "directory with _index.md")
                     return log_entry, False, False, False, has_anchor
                 
                 # Also check for other common index files
                 for index_name in ["index.md", "README.md"]:
                     index_file = os.path.join(target_file, index_name)
                     if os.path.exists(index_file):
-                        log_entry = f"{Colors.OKGREEN}[OK RELATIVE] {index_file}#{anchor} (directory with {index_name}, anchor not validated){Colors.ENDC}"
-                        print(log_entry)
+                        log_entry = check_local_anchor(index_file, anchor, md_file, f"directory with {index_name}")
                         return log_entry, False, False, False, has_anchor
             
             # Check if file exists without case sensitivity
@@ -956,19 +2406,16 @@ def check_relative_url(url, md_file):
                     for index_name in ["_index.md", "index.md", "README.md"]:
                         index_file = os.path.join(case_insensitive_path, index_name)
                         if os.path.exists(index_file):
-                            log_entry = f"{Colors.OKGREEN}[OK RELATIVE] {index_file}#{anchor} (directory with {index_name}, case-insensitive match, anchor not validated){Colors.ENDC}"
-                            print(log_entry)
+                            log_entry = check_local_anchor(index_file, anchor, md_file, f"directory with {index_name}, case-insensitive match")
                             return log_entry, False, False, False, has_anchor
                 else:
                     # It's a file
-                    log_entry = f"{Colors.OKGREEN}[OK RELATIVE] {case_insensitive_path}#{anchor} (file exists, case-insensitive match, anchor not validated){Colors.ENDC}"
-                    print(log_entry)
+                    log_entry = check_local_anchor(case_insensitive_path, anchor, md_file, "file exists, case-insensitive match")
                     return log_entry, False, False, False, has_anchor
             
             # Original check if file exists (case sensitive)
             if os.path.exists(target_file):
-                log_entry = f"{Colors.OKGREEN}[OK RELATIVE] {target_file}#{anchor} (file exists, anchor not validated){Colors.ENDC}"
-                print(log_entry)
+                log_entry = check_local_anchor(target_file, anchor, md_file, "file exists")
                 return log_entry, False, False, False, has_anchor
             else:
                 log_entry = f"{Colors.FAIL}[BROKEN RELATIVE WITH ANCHOR] {target_file}#{anchor} (file not found){Colors.ENDC}"
@@ -979,16 +2426,25 @@ def check_relative_url(url, md_file):
     elif has_anchor:
         base_url, anchor = url.split('#', 1)
         anchor_text = anchor
-        # For non-markdown file links with anchors, we just check if the file exists
+        # For non-markdown file links with anchors, the anchor is checked against the target's index when it has one
         if not base_url:
-            # Same-file anchor in non-markdown file, we can't validate this
-            log_entry = f"{Colors.OKGREEN}[OK HEADER] #{anchor} (in non-markdown file {md_file}){Colors.ENDC}"
+            # Same-file anchor in a non-markdown file, validated if the file itself is HTML
+            found = LOCAL_ANCHORS.check(md_file, anchor)
+            if found is None:
+                log_entry = f"{Colors.OKGREEN}[OK HEADER] #{anchor} (in non-markdown file {md_file}, anchor not validated){Colors.ENDC}"
+            elif found:
+                log_entry = f"{Colors.OKGREEN}[OK HEADER] #{anchor} (anchor in {md_file}){Colors.ENDC}"
+            else:
+                log_entry = f"{Colors.FAIL}[BROKEN HEADER] #{anchor} (anchor not found in {md_file}){Colors.ENDC}"
             print(log_entry)
             return log_entry, False, False, False, has_anchor
         else:
             target_file = os.path.join(os.path.dirname(md_file), base_url)
-            if os.path.exists(target_file):
-                log_entry = f"{Colors.OKGREEN}[OK RELATIVE] {target_file}#{anchor} (file exists, anchor not validated){Colors.ENDC}"
+            if os.path.isfile(target_file):
+                log_entry = check_local_anchor(target_file, anchor, md_file, "file exists")
+                return log_entry, False, False, False, has_anchor
+            elif os.path.exists(target_file):
+                log_entry = f"{Colors.OKGREEN}[OK RELATIVE] {target_file}#{anchor} (directory exists, anchor not validated){Colors.ENDC}"
                 print(log_entry)
                 return log_entry, False, False, False, has_anchor
             else:
@@ -1005,7 +2461,7 @@ def check_relative_url(url, md_file):
     is_root_relative = url.startswith('/')
     if is_root_relative:
         # URLs starting with / are relative to repo root, not the current file
-        file_path = os.path.join(REPO_PATH, url[1:])  # Remove leading / and join with repo root
+        file_path = os.path.join(get_repo_path(), url[1:])  # Remove leading / and join with repo root
         print(f"Root-relative path detected. Checking against repo root: {file_path}")
     else:
         # Regular document-relative URL
@@ -1029,7 +2485,7 @@ def check_relative_url(url, md_file):
             path_parts = os.path.normpath(file_path).split(os.sep)
             
             # Start from an existing directory
-            current = os.path.dirname(md_file) if not is_root_relative else REPO_PATH
+            current = os.path.dirname(md_file) if not is_root_relative else get_repo_path()
             built_path = current
             
             # Process each segment of the relative path
@@ -1125,335 +2581,896 @@ def check_relative_url(url, md_file):
         print(log_entry)
         return log_entry, is_image, is_svg, is_root_relative, has_anchor
 
+def get_absolute_url_hosts(links):
+    """
+    Collect the hostnames of all absolute URLs that will be checked.
+    
+    Links that a skip rule matches (placeholder and example domains, trusted
+    hosts, ...) are left out, so their hosts are not resolved and reported down.
+    
+    Args:
+        links: List of (file_path, url) tuples
+        
+    Returns:
+        Set of hostnames
+    """
+    skip_rules = get_skip_rules()
+    hosts = set()
+    for file_path, url in links:
+        # Same verdict as is_false_positive, without logging or counting a rule hit
+        if skip_rules.get_matcher(file_path).match(url) is not None:
+            continue
+        try:
+            parsed_url = urlparse(url.strip('"\''))
+            host = parsed_url.hostname
+        except ValueError:
+            continue
+        if parsed_url.scheme not in ('http', 'https') or not host or host == 'localhost':
+            continue
+        if parsed_url.netloc in get_skip_rules().known_valid_hosts or is_ip_based_url(url.strip('"\'')):
+            continue
+        hosts.add(host)
+    return hosts
+
+def format_down_host(host, reason):
+    """Format a host that was marked down for the report."""
+    skipped = HOST_HEALTH.short_circuited.get(host, 0)
+    return f"[HOST DOWN] {host} - {reason} ({skipped} URL{'s' if skipped != 1 else ''} not requested)"
+
+def format_host_latency(host):
+    """Format a host's latency statistics and adaptive read deadline for the report."""
+    samples = len(HOST_LATENCY.samples.get(host, ()))
+    p95 = HOST_LATENCY.p95(host)
+    p95_info = f"p95 {p95:.2f}s" if p95 is not None else "p95 n/a"
+    return f"[LATENCY] {host} - {samples} request{'s' if samples != 1 else ''}, {p95_info}, read deadline {HOST_LATENCY.read_deadline(host):.1f}s"
+
 def strip_ansi_escape_codes(text):
     """Remove ANSI color codes from text (for clean log files)."""
     return ANSI_ESCAPE_REGEX.sub('', text)
 
+def format_redirect(url, target):
+    """Format a redirected URL and its canonical target for the report."""
+    final_url, hop_count = target
+    return f"[REDIRECT] {url} -> {final_url} ({hop_count} redirect{'s' if hop_count != 1 else ''})"
+
 # =============================================================================
-# MAIN EXECUTION
+# GITHUB TREE RESOLVER
+# =============================================================================
+# Links to files in GitHub repositories (github.com/<owner>/<repo>/blob|tree/<ref>/<path>
+# and raw.githubusercontent.com/<owner>/<repo>/<ref>/<path>) are validated against
+# the repository's file tree, which is listed once per (repository, ref) - from a
+# local clone with "git ls-tree", or with one recursive call to the GitHub trees
+# API - instead of requesting every link.
 # =============================================================================
 
-def main():
-    # Parse arguments
-    args = parse_arguments()
+GITHUB_FILE_URL_REGEX = re.compile(r'^https?://(?:www\.)?github\.com/([^/?#]+)/([^/?#]+)/(blob|tree|raw)/([^?#]+)', re.IGNORECASE)
+GITHUB_RAW_FILE_URL_REGEX = re.compile(r'^https?://raw\.githubusercontent\.com/([^/?#]+)/([^/?#]+)/([^?#]+)', re.IGNORECASE)
+GITHUB_REMOTE_REGEX = re.compile(r'github\.com[:/]([^/]+)/([^/]+?)(?:\.git)?/?$', re.IGNORECASE)
+GITHUB_TREES_API = "https://api.github.com/repos/{owner}/{repo}/git/trees/{ref}?recursive=1"
+GITHUB_MAX_REF_SEGMENTS = 4  # Refs containing slashes (e.g. feature/x) are tried up to this many path segments
+
+class GitHubTreeResolver:
+    """
+    Validate GitHub file links against in-memory repository trees.
     
-    # Override timeout if provided
-    global TIMEOUT
-    if args.timeout:
-        TIMEOUT = args.timeout
-        print(f"Using custom timeout: {TIMEOUT} seconds")
+    Trees are loaded lazily, once per (repository, ref): from a local clone when
+    one is known (the checked repository itself if its origin is on GitHub, or
+    clones given with --github-clone), otherwise from the GitHub trees API
+    (authenticated with GITHUB_TOKEN when set). Links that cannot be decided from
+    a tree - unknown refs, private repositories, API errors or truncated trees -
+    fall back to a normal HTTP check.
+    """
+    def __init__(self):
+        self.enabled = True
+        self.clones = {}          # "owner/repo" (lowercase) -> local clone path
+        self.detected_origin = False
+        self.trees = {}           # ("owner/repo", ref, source) -> tree dict, False if the ref does not exist, None if unavailable
+        self.lock = threading.Lock()
+        self.fetch_locks = {}     # ("owner/repo", ref, source) -> lock, so each tree is fetched once even with concurrent checks
+        self.api_available = True  # Cleared after a rate limit or connection error, so the API is not hammered
+        self.validated = 0        # Links decided from a tree without a request
+        self.sources = {'clone': 0, 'api': 0}  # Trees loaded per source
     
-    # Lists to track results
-    broken_absolute_urls = []
-    ok_absolute_urls = []
-    broken_relative_urls_with_anchor = []
-    broken_relative_urls_without_anchor = []
-    ok_relative_urls = []
-    broken_image_urls = []
-    ok_image_urls = []
-    broken_svg_urls = []
-    ok_svg_urls = []
-    broken_header_urls = []
-    ok_header_urls = []
-    broken_root_relative_urls = []
-    ok_root_relative_urls = []
-    no_links_types = []
+    def reset(self):
+        """Forget all loaded trees, so they are listed again on next use."""
+        with self.lock:
+            self.trees.clear()
+            self.fetch_locks.clear()
     
-    # If a specific directory is provided, only check files there
-    if args.dir:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        test_dir = os.path.join(script_dir, args.dir)
-        print(f"Only checking files in test directory: {test_dir}")
-        files_to_check = find_files_in_directory(test_dir, args.exclude)
-    else:
-        files_to_check = find_files_to_check(args.exclude)
+    def add_clone(self, repository, path):
+        """Use a local clone for "owner/repo" instead of the API."""
+        self.clones[repository.lower()] = path
     
-    # Create log file with timestamp
-    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-    log_file_with_timestamp = os.path.join(LOG_DIR, f'broken_urls_{timestamp}.log')
+    def detect_origin(self):
+        """Register the checked repository as a clone of its GitHub origin (once)."""
+        if self.detected_origin:
+            return
+        self.detected_origin = True
+        import subprocess
+        try:
+            remote = subprocess.check_output(['git', '-C', get_repo_path(), 'remote', 'get-url', 'origin'],
+                                             text=True, stderr=subprocess.DEVNULL).strip()
+        except (subprocess.CalledProcessError, OSError):
+            return
+        match = GITHUB_REMOTE_REGEX.search(remote)
+        if match:
+            self.clones.setdefault(f"{match.group(1)}/{match.group(2)}".lower(), get_repo_path())
     
-    print(f"Starting URL check on {len(files_to_check)} files...")
-    start_time = datetime.now()
+    @staticmethod
+    def parse_url(url):
+        """
+        Split a GitHub file link into its parts.
+        
+        Returns:
+            Tuple containing: (owner, repo, kind, ref_and_path) where kind is "blob", "tree", "raw"
+            or "raw-host", or None if the URL is not a GitHub file link
+        """
+        match = GITHUB_FILE_URL_REGEX.match(url)
+        if match:
+            return match.group(1), match.group(2), match.group(3).lower(), match.group(4)
+        match = GITHUB_RAW_FILE_URL_REGEX.match(url)
+        if match:
+            return match.group(1), match.group(2), 'raw-host', match.group(3)
+        return None
     
-    # Process all files and URLs - write to log in real-time for monitoring
-    with open(log_file_with_timestamp, 'w', encoding='utf-8') as log:
-        log.write(f"URL Checker Results\n\n")
-        log.write(f"Log generated on: {timestamp}\n")
-        log.write("Processing URLs in real-time...\n\n")
-        log.flush()
+    def load_from_clone(self, path, ref):
+        """
+        List the tree of a ref in a local clone.
         
-        for file_path in files_to_check:
-            file_ext = os.path.splitext(file_path)[1].lower()
-            file_type = SUPPORTED_FILE_TYPES.get(file_ext, 'Unknown')
-            print(f"Processing {file_type} file: {file_path}")
-            urls = extract_urls(file_path)
-            
-            for url in urls:
-                # Skip email links
-                if EMAIL_REGEX.match(url):
-                    print(f"Skipping email URL: {url}")
-                    continue
-                
-                # Skip localhost and IP-based URLs
-                if url.startswith("http://localhost") or is_ip_based_url(url):
-                    print(f"Skipping localhost or IP-based URL: {url}")
-                    continue
-                
-                # Skip false positive URLs
-                if is_false_positive(url):
+        Returns:
+            Tree dict, or False if the clone does not have the ref
+        """
+        import subprocess
+        for candidate in (ref, f"origin/{ref}"):
+            try:
+                output = subprocess.check_output(['git', '-C', path, 'ls-tree', '-r', '-t', '-z', '--full-tree', candidate],
+                                                 stderr=subprocess.DEVNULL)
+            except (subprocess.CalledProcessError, OSError):
+                continue
+            blobs, trees = set(), set()
+            for line in output.decode('utf-8', 'surrogateescape').split('\0'):
+                if not line:
                     continue
+                info, _, entry_path = line.partition('\t')
+                (trees if info.split(' ')[1] == 'tree' else blobs).add(entry_path)
+            return {'blobs': blobs, 'trees': trees, 'truncated': False, 'source': f"local clone {path}"}
+        return False
+    
+    def load_from_api(self, owner, repo, ref):
+        """
+        Fetch the tree of a ref with one recursive GitHub trees API call.
+        
+        Returns:
+            Tree dict, False if the ref (or repository) was not found, or None if the API is unavailable
+        """
+        import requests
+        from urllib.parse import quote
+        headers = {"Accept": "application/vnd.github+json", **HEADERS}
+        token = os.environ.get('GITHUB_TOKEN') or os.environ.get('GH_TOKEN')
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        api_url = GITHUB_TREES_API.format(owner=owner, repo=repo, ref=quote(ref, safe=''))
+        try:
+            response = get_http_session().get(api_url, headers=headers, timeout=(CONNECT_TIMEOUT, TIMEOUT))
+        except requests.RequestException as e:
+            print(f"{Colors.NEUTRAL}GitHub trees API unavailable ({e}) - checking GitHub links over HTTP{Colors.ENDC}")
+            self.api_available = False
+            return None
+        if response.status_code in (404, 409, 422):
+            return False  # No such ref (or repository), or an empty repository
+        if response.status_code in (403, 429):
+            print(f"{Colors.NEUTRAL}GitHub trees API rate limit reached - checking GitHub links over HTTP (set GITHUB_TOKEN for a higher limit){Colors.ENDC}")
+            self.api_available = False
+            return None
+        if response.status_code != 200:
+            print(f"{Colors.NEUTRAL}GitHub trees API returned {response.status_code} for {owner}/{repo}@{ref} - checking its links over HTTP{Colors.ENDC}")
+            return None
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        blobs = {entry['path'] for entry in data.get('tree', []) if entry.get('type') == 'blob'}
+        trees = {entry['path'] for entry in data.get('tree', []) if entry.get('type') == 'tree'}
+        return {'blobs': blobs, 'trees': trees, 'truncated': bool(data.get('truncated')), 'source': "GitHub trees API"}
+    
+    def get_tree(self, owner, repo, ref, source):
+        """
+        Get the tree of a ref from a local clone or the API, loading it on first use.
+        
+        Returns:
+            Tree dict, False if the source does not have the ref, or None if the source is unavailable
+        """
+        key = (f"{owner}/{repo}".lower(), ref, source)
+        if key in self.trees:
+            return self.trees[key]
+        with self.lock:
+            fetch_lock = self.fetch_locks.setdefault(key, threading.Lock())
+        with fetch_lock:
+            if key in self.trees:
+                return self.trees[key]
+            if source == 'clone':
+                self.detect_origin()
+                clone = self.clones.get(key[0])
+                tree = self.load_from_clone(clone, ref) if clone else None
+            else:
+                tree = self.load_from_api(owner, repo, ref) if self.api_available else None
+            if tree:
+                self.sources[source] += 1
+                print(f"Loaded {len(tree['blobs'])} files of {owner}/{repo}@{ref} from the {tree['source']}")
+            self.trees[key] = tree
+            return tree
+    
+    def check(self, url, md_file=None):
+        """
+        Validate a GitHub file link against its repository tree.
+        
+        Returns:
+            Log entry string, or None if the link is not a GitHub file link or cannot be
+            decided from the tree (the caller then checks it over HTTP)
+        """
+        if not self.enabled:
+            return None
+        parts = self.parse_url(url)
+        if parts is None:
+            return None
+        owner, repo, kind, ref_and_path = parts
+        from urllib.parse import unquote
+        segments = unquote(ref_and_path).strip('/').split('/')
+        
+        # Local clones are free to ask, so try them for every possible ref before the API.
+        # The ref may itself contain slashes, so try the shortest ref first.
+        for source in ('clone', 'api'):
+            for ref_length in range(1, min(len(segments), GITHUB_MAX_REF_SEGMENTS) + 1):
+                ref = '/'.join(segments[:ref_length])
+                tree = self.get_tree(owner, repo, ref, source)
+                if tree is None:
+                    break  # Source unavailable
+                if tree is False:
+                    continue  # No such ref - try a longer one
                 
-                # Add error handling for URL parsing
-                try:
-                    # Check URL based on whether it's absolute or relative
-                    parsed_url = urlparse(url)
-                    if parsed_url.scheme in ('http', 'https'):
-                        # It's an absolute URL - pass the file path to track source
-                        log_entry = check_absolute_url(url, file_path)
-                        if "[OK ABSOLUTE]" in log_entry:
-                            ok_absolute_urls.append(log_entry)
-                        else:
-                            broken_absolute_urls.append(log_entry)
-                    else:
-                        # Strip quotes before further processing to avoid false positives
-                        url_clean = url.strip('"\'')
-                        
-                        try:
-                            parsed_clean = urlparse(url_clean)
-                            
-                            # Check again if it's actually an absolute URL after stripping quotes
-                            if parsed_clean.scheme in ('http', 'https'):
-                                # Skip false positive URLs after cleaning
-                                if is_false_positive(url_clean):
-                                    continue
-                                log_entry = check_absolute_url(url_clean, file_path)
-                                if "[OK ABSOLUTE]" in log_entry:
-                                    ok_absolute_urls.append(log_entry)
-                                else:
-                                    broken_absolute_urls.append(log_entry)
-                            else:
-                                # It's a relative URL, image, SVG, root-relative, or header link
-                                log_entry, is_image, is_svg, is_root_relative, has_anchor = check_relative_url(url, file_path)
-                                
-                                # ...existing categorization code...
-                                if "[BROKEN HEADER]" in log_entry:
-                                    broken_header_urls.append(log_entry)
-                                elif "[OK HEADER]" in log_entry:
-                                    ok_header_urls.append(log_entry)
-                                elif is_svg:
-                                    if "[OK SVG]" in log_entry:
-                                        ok_svg_urls.append(log_entry)
-                                    else:
-                                        broken_svg_urls.append(log_entry)
-                                elif is_image:
-                                    if "[OK IMAGE]" in log_entry:
-                                        ok_image_urls.append(log_entry)
-                                    else:
-                                        broken_image_urls.append(log_entry)
-                                elif is_root_relative:
-                                    if "[OK ROOT-RELATIVE]" in log_entry:
-                                        ok_root_relative_urls.append(log_entry)
-                                    else:
-                                        broken_root_relative_urls.append(log_entry)
-                                else:
-                                    if "[OK RELATIVE]" in log_entry:
-                                        ok_relative_urls.append(log_entry)
-                                    else:
-                                        # Use the new log message format for categorization
-                                        if "[BROKEN RELATIVE WITH ANCHOR]" in log_entry:
-                                            broken_relative_urls_with_anchor.append(log_entry)
-                                        elif "[BROKEN RELATIVE WITHOUT ANCHOR]" in log_entry:
-                                            broken_relative_urls_without_anchor.append(log_entry)
-                        
-                        except ValueError as e:
-                            # Handle URL parsing errors for the cleaned URL
-                            error_message = str(e)
-                            log_entry = f"{Colors.FAIL}[MALFORMED URL] {url_clean} - Error: {error_message} (in file: {file_path}){Colors.ENDC}"
-                            print(log_entry)
-                            broken_absolute_urls.append(log_entry)
+                path = '/'.join(segments[ref_length:])
+                if kind in ('raw', 'raw-host'):
+                    found = path in tree['blobs']
+                else:
+                    # github.com redirects between blob and tree views, so either is fine
+                    found = not path or path in tree['blobs'] or path in tree['trees']
+                if not found and tree['truncated']:
+                    return None  # Incomplete tree - the path may still exist
                 
-                except ValueError as e:
-                    # Handle URL parsing errors
-                    error_message = str(e)
-                    if "Invalid IPv6 URL" in error_message:
-                        log_entry = f"{Colors.FAIL}[MALFORMED URL] {url} - Invalid IPv6 URL format (in file: {file_path}){Colors.ENDC}"
+                self.validated += 1
+                file_info = f" (in file: {md_file})" if md_file else ""
+                if found:
+                    log_entry = f"{Colors.OKGREEN}[OK ABSOLUTE] {url} (found in {owner}/{repo}@{ref}){Colors.ENDC}"
+                else:
+                    log_entry = f"{Colors.FAIL}[BROKEN ABSOLUTE] {url} - Path not found in {owner}/{repo}@{ref} ({tree['source']}){file_info}{Colors.ENDC}"
+                print(log_entry)
+                return log_entry
+        return None  # Not decidable from a tree - check over HTTP
+
+GITHUB_TREES = GitHubTreeResolver()
+
+def parse_github_clone(value):
+    """
+    Parse a --github-clone value of the form "OWNER/REPO=PATH".
+    
+    Returns:
+        Tuple containing: (repository, path)
+    """
+    repository, _, path = value.partition('=')
+    if repository.count('/') != 1 or not path:
+        raise argparse.ArgumentTypeError(f"invalid clone '{value}', expected OWNER/REPO=PATH")
+    if not os.path.isdir(path):
+        raise argparse.ArgumentTypeError(f"clone directory not found: {path}")
+    return repository, os.path.abspath(path)
+
+# =============================================================================
+# SITEMAP HOSTS
+# =============================================================================
+# Documentation hosts are too large (and too quick to throttle) to request link
+# by link, so they are normally skipped as known valid domains. Hosts enabled
+# with --sitemap are validated against their sitemaps instead: the sitemaps are
+# downloaded once per TTL, cached on disk, and links are looked up in the set of
+# listed paths. Only paths missing from the sitemap are requested, throttled.
+# =============================================================================
+
+SITEMAP_CACHE_DIR = os.path.join(CACHE_DIR, 'sitemaps')
+SITEMAP_TTL_HOURS = 24          # Hours before a host's cached sitemap is downloaded again
+SITEMAP_THROTTLE_SECONDS = 1.0  # Minimum seconds between fallback requests to a sitemap host
+SITEMAP_MAX_FILES = 500         # Upper bound on sitemap files followed from sitemap indexes per host
+# Locale prefix such as /en-us, /zh-hans, /sr-latn-rs or /es-419: a language followed by a region
+# and/or one of the scripts used in documentation URLs (a bare language like /en is too ambiguous)
+SITEMAP_LOCALE_REGEX = re.compile(r'^/[a-z]{2,3}-(?:(?:hans|hant|latn|cyrl|arab)(?:-(?:[a-z]{2}|[0-9]{3}))?|[a-z]{2}|[0-9]{3})(?=/|$)')
+
+def normalize_sitemap_path(path, strip_locale=False):
+    """
+    Normalize a URL path for sitemap lookups.
+    
+    Paths are compared case-insensitively and without a trailing slash. On hosts
+    whose sitemap lists localized paths, the leading locale segment is dropped
+    as well (/en-us/azure/... and /azure/... are the same page, since
+    documentation hosts redirect unlocalized links to the reader's locale).
+    
+    Args:
+        path: URL path
+        strip_locale: Drop a leading segment that matches SITEMAP_LOCALE_REGEX
+    """
+    from urllib.parse import unquote
+    path = unquote(path).lower().rstrip('/')
+    if strip_locale:
+        path = SITEMAP_LOCALE_REGEX.sub('', path)
+    return path or '/'
+
+def parse_sitemap_argument(value):
+    """
+    Parse a --sitemap value of the form "HOST" or "HOST=SITEMAP_URL".
+    
+    Returns:
+        Tuple containing: (host, sitemap URL or None to discover it)
+    """
+    host, _, sitemap_url = value.partition('=')
+    host = host.strip().lower()
+    if not host or '/' in host:
+        raise argparse.ArgumentTypeError(f"invalid sitemap host '{value}', expected HOST or HOST=SITEMAP_URL")
+    return host, sitemap_url.strip() or None
+
+class SitemapValidator:
+    """
+    Validate links on selected hosts against the paths listed in their sitemaps.
+    
+    Sitemaps are found through robots.txt (or /sitemap.xml) unless given
+    explicitly, sitemap indexes are followed, and gzipped sitemaps are supported.
+    Each host's path set is cached in .cache/sitemaps for the TTL, so most runs
+    need no download at all. Links whose path is not listed are checked over
+    HTTP, at most one request per throttle interval per host.
+    """
+    def __init__(self):
+        self.hosts = {}            # host -> explicit sitemap URL, or None to discover it
+        self.paths = {}            # host -> set of normalized paths, or None if no sitemap could be loaded
+        self.locales = {}          # host -> locale prefixes its sitemap lists paths under (e.g. "en-us")
+        self.ttl = timedelta(hours=SITEMAP_TTL_HOURS)
+        self.throttle_seconds = SITEMAP_THROTTLE_SECONDS
+        self.lock = threading.Lock()
+        self.host_locks = {}       # host -> lock, so a sitemap is loaded once even with concurrent checks
+        self.last_request = {}     # host -> time.monotonic() of the last fallback request
+        self.validated = 0         # Links found in a sitemap, without a request
+        self.fallbacks = 0         # Links requested because their path was not listed
+    
+    def add_host(self, host, sitemap_url=None):
+        """Validate links on a host against its sitemap."""
+        self.hosts[host.lower()] = sitemap_url
+    
+    def get_cache_file(self, host):
+        """Get the file a host's sitemap paths are cached in."""
+        return os.path.join(SITEMAP_CACHE_DIR, re.sub(r'[^a-z0-9.-]', '_', host) + '.json')
+    
+    def fetch(self, url):
+        """
+        Download a sitemap, robots.txt or similar file, decompressing gzip.
+        
+        Returns:
+            The body as bytes, or None if it could not be downloaded
+        """
+        import requests
+        import gzip
+        try:
+            response = get_http_session().get(url, headers=HEADERS, timeout=(CONNECT_TIMEOUT, TIMEOUT), verify=CA_BUNDLE or True)
+        except requests.RequestException as e:
+            print(f"{Colors.NEUTRAL}Could not download {url}: {e}{Colors.ENDC}")
+            return None
+        if response.status_code != 200:
+            return None
+        body = response.content
+        if body[:2] == b'\x1f\x8b':
+            try:
+                body = gzip.decompress(body)
+            except OSError:
+                return None
+        return body
+    
+    def discover_sitemaps(self, host):
+        """Find a host's sitemaps from the Sitemap: lines of its robots.txt, falling back to /sitemap.xml."""
+        robots = self.fetch(f"https://{host}/robots.txt")
+        sitemaps = []
+        if robots:
+            for line in robots.decode('utf-8', 'replace').splitlines():
+                name, _, value = line.partition(':')
+                if name.strip().lower() == 'sitemap' and value.strip():
+                    sitemaps.append(value.strip())
+        return sitemaps or [f"https://{host}/sitemap.xml"]
+    
+    def download_paths(self, host):
+        """
+        Download all sitemaps of a host and collect the normalized paths they list.
+        
+        Localized paths are listed both with and without their locale prefix, and
+        the locales are returned, so only hosts with localized sitemaps get the
+        locale segment of their links stripped.
+        
+        Returns:
+            Tuple containing: (set of paths, set of locales), or None if no sitemap could be downloaded
+        """
+        from xml.etree import ElementTree
+        pending = [self.hosts[host]] if self.hosts[host] else self.discover_sitemaps(host)
+        seen = set()
+        paths = set()
+        locales = set()
+        loaded = 0
+        while pending and len(seen) < SITEMAP_MAX_FILES:
+            sitemap_url = pending.pop()
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+            body = self.fetch(sitemap_url)
+            if body is None:
+                continue
+            try:
+                # Sitemap indexes list more sitemaps, regular sitemaps list pages - both in <loc>
+                root = ElementTree.fromstring(body)
+            except ElementTree.ParseError as e:
+                print(f"{Colors.NEUTRAL}Could not parse sitemap {sitemap_url}: {e}{Colors.ENDC}")
+                continue
+            loaded += 1
+            is_index = root.tag.endswith('sitemapindex')
+            for element in root.iter():
+                if element.tag.endswith('loc') and element.text:
+                    location = element.text.strip()
+                    if is_index:
+                        pending.append(location)
                     else:
-                        log_entry = f"{Colors.FAIL}[MALFORMED URL] {url} - Error: {error_message} (in file: {file_path}){Colors.ENDC}"
-                    print(log_entry)
-                    broken_absolute_urls.append(log_entry)
-                
-                # Write to log file (real-time monitoring)
-                log.write(strip_ansi_escape_codes(log_entry) + "\n")
-                log.flush()
+                        parsed = urlparse(location)
+                        if parsed.netloc.lower() == host:
+                            path = normalize_sitemap_path(parsed.path)
+                            paths.add(path)
+                            locale = SITEMAP_LOCALE_REGEX.match(path)
+                            if locale:
+                                locales.add(locale.group(0)[1:])
+                                paths.add(path[locale.end():] or '/')
+        if pending:
+            print(f"{Colors.NEUTRAL}Stopped after {SITEMAP_MAX_FILES} sitemaps for {host} - unlisted paths are checked over HTTP{Colors.ENDC}")
+        return (paths, locales) if loaded else None
     
-    # Calculate runtime
-    end_time = datetime.now()
-    runtime_duration = end_time - start_time
-    runtime_seconds = runtime_duration.total_seconds()
+    def load_paths(self, host):
+        """Get the path set of a host, from the disk cache while it is fresh, downloading it otherwise."""
+        if host in self.paths:
+            return self.paths[host]
+        with self.lock:
+            host_lock = self.host_locks.setdefault(host, threading.Lock())
+        with host_lock:
+            if host in self.paths:
+                return self.paths[host]
+            cache_file = self.get_cache_file(host)
+            paths = None
+            locales = set()
+            try:
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if (data.get('sitemap') == self.hosts[host]
+                        and datetime.now() - datetime.fromisoformat(data['fetched_at']) < self.ttl):
+                    # Caches written before locales were recorded are downloaded again
+                    paths, locales = set(data['paths']), set(data['locales'])
+            except (OSError, ValueError, KeyError):
+                pass
+            
+            if paths is None:
+                start = time.perf_counter()
+                downloaded = self.download_paths(host)
+                if downloaded is None:
+                    print(f"{Colors.NEUTRAL}No sitemap found for {host} - its links are checked over HTTP (throttled){Colors.ENDC}")
+                else:
+                    paths, locales = downloaded
+                    print(f"Downloaded sitemap of {host}: {len(paths)} paths in {time.perf_counter() - start:.1f}s")
+                    try:
+                        os.makedirs(SITEMAP_CACHE_DIR, exist_ok=True)
+                        with open(cache_file, 'w', encoding='utf-8') as f:
+                            json.dump({'sitemap': self.hosts[host], 'fetched_at': datetime.now().isoformat(timespec='seconds'),
+                                       'locales': sorted(locales), 'paths': sorted(paths)}, f)
+                    except OSError as e:
+                        print(f"Warning: Could not write sitemap cache {cache_file}: {e}")
+            self.locales[host] = locales
+            self.paths[host] = paths
+            return paths
     
-    # Create a human-readable runtime string
-    if runtime_seconds < 60:
-        runtime_str = f"{runtime_seconds:.2f} seconds"
-    elif runtime_seconds < 3600:
-        runtime_str = f"{runtime_seconds/60:.2f} minutes ({runtime_duration})"
-    else:
-        runtime_str = f"{runtime_seconds/3600:.2f} hours ({runtime_duration})"
+    def throttle(self, host):
+        """Wait until the next fallback request to a host is allowed."""
+        with self.lock:
+            host_lock = self.host_locks.setdefault(f"throttle:{host}", threading.Lock())
+        with host_lock:
+            wait = self.last_request.get(host, 0) + self.throttle_seconds - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.last_request[host] = time.monotonic()
     
-    # Write the log file with organized results
-    with open(log_file_with_timestamp, 'w', encoding='utf-8') as log:
-        log.write(f"URL Checker Results\n\n")
-        log.write(f"Log generated on: {timestamp}\n")
-        log.write(f"Runtime: {runtime_str}\n")
-        log.write(f"Runtime duration: {runtime_duration}\n\n")
+    def check(self, url):
+        """
+        Validate a link on a sitemap host.
         
-        # Write broken sections first (most important)
-        log.write(f"=== Broken Absolute URLs ({len(broken_absolute_urls)} links found) ===\n\n")
-        if broken_absolute_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in broken_absolute_urls) + "\n\n")
-        else:
-            log.write("No broken absolute URLs found.\n\n")
+        Returns:
+            Log entry string if the path is listed in the host's sitemap, otherwise None - the
+            caller then checks the link over HTTP (after throttle has been applied)
+        """
+        if not self.hosts:
+            return None
+        parsed_url = urlparse(url)
+        host = parsed_url.netloc.lower()
+        if host not in self.hosts:
+            return None
+        paths = self.load_paths(host)
+        if paths is not None and normalize_sitemap_path(parsed_url.path, bool(self.locales[host])) in paths:
+            self.validated += 1
+            log_entry = f"{Colors.OKGREEN}[OK ABSOLUTE] {url} (listed in sitemap of {host}){Colors.ENDC}"
+            print(log_entry)
+            return log_entry
+        self.fallbacks += 1
+        self.throttle(host)
+        return None
+
+SITEMAPS = SitemapValidator()
+
+# =============================================================================
+# REMOTE ANCHORS
+# =============================================================================
+# With --check-fragments, a #fragment on an absolute URL is validated against
+# the id/name attributes of the page. Each page is downloaded once, streamed
+# through an incremental HTML parser up to a size cap, and its anchor set is
+# cached, so all fragments pointing at the same page share one download.
+# =============================================================================
+
+FRAGMENT_MAX_BYTES = 2 * 1024 * 1024  # Stop reading a page after this many bytes
+FRAGMENT_CHUNK_SIZE = 64 * 1024
+# Fragments that are not element ids: scroll-to-top, client-side routes, text fragments and GitHub line links
+UNVERIFIABLE_FRAGMENT_REGEX = re.compile(r'^(?:top|[/!].*|:~:.*|L\d+(?:C\d+)?(?:-L\d+(?:C\d+)?)?)$')
+
+class RemoteAnchorCache:
+    """
+    Anchors (id and <a name> attributes) of remote pages, downloaded once per page.
+    
+    Pages are streamed in chunks through html.parser and reading stops at the
+    byte cap. A fragment that is not found on a page that was only partly read,
+    that is not HTML, or that could not be downloaded is reported as unverified
+    rather than broken.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.max_bytes = FRAGMENT_MAX_BYTES
+        self.pages = {}        # Page URL -> (anchors, complete), or None if the page has no parseable HTML
+        self.lock = threading.Lock()
+        self.page_locks = {}   # Page URL -> lock, so each page is downloaded once even with concurrent checks
+        self.downloads = 0     # Pages downloaded
+        self.validated = 0     # Fragments found on their page
+        self.missing = 0       # Fragments not found on a fully read page
+        self.unverified = 0    # Fragments that could not be decided
+    
+    def download_anchors(self, page_url):
+        """
+        Stream a page through an HTML parser and collect its anchors.
         
-        log.write(f"=== Broken Relative URLs Without Anchors ({len(broken_relative_urls_without_anchor)} links found) ===\n\n")
-        if broken_relative_urls_without_anchor:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in broken_relative_urls_without_anchor) + "\n\n")
-        else:
-            log.write("No broken relative URLs without anchors found.\n\n")
+        Returns:
+            Tuple containing: (set of anchors, True if the whole page was read), or None
+        """
+        import requests
+        import codecs
+        from html.parser import HTMLParser
+        try:
+            response = get_http_session().get(page_url, headers=HEADERS, stream=True,
+                                              timeout=(CONNECT_TIMEOUT, TIMEOUT), verify=CA_BUNDLE or True)
+        except requests.RequestException as e:
+            print(f"{Colors.NEUTRAL}Could not download {page_url} to check anchors: {e}{Colors.ENDC}")
+            return None
+        try:
+            content_type = response.headers.get('Content-Type', '')
+            if response.status_code >= 400 or ('html' not in content_type and content_type):
+                return None
+            
+            anchors = set()
+            def collect_anchors(tag, attrs):
+                for name, value in attrs:
+                    if value and (name == 'id' or (name == 'name' and tag == 'a')):
+                        anchors.add(value)
+            parser = HTMLParser(convert_charrefs=True)
+            parser.handle_starttag = collect_anchors
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+            
+            received = 0
+            complete = True
+            for chunk in response.iter_content(FRAGMENT_CHUNK_SIZE):
+                parser.feed(decoder.decode(chunk))
+                received += len(chunk)
+                if received >= self.max_bytes:
+                    complete = False
+                    break
+            parser.feed(decoder.decode(b'', final=True))
+            parser.close()
+            self.downloads += 1
+            return anchors, complete
+        except (requests.RequestException, LookupError) as e:
+            print(f"{Colors.NEUTRAL}Could not read {page_url} to check anchors: {e}{Colors.ENDC}")
+            return None
+        finally:
+            response.close()
+    
+    def get_anchors(self, page_url):
+        """Get the anchors of a page, downloading it on first use."""
+        if page_url in self.pages:
+            return self.pages[page_url]
+        with self.lock:
+            page_lock = self.page_locks.setdefault(page_url, threading.Lock())
+        with page_lock:
+            if page_url not in self.pages:
+                self.pages[page_url] = self.download_anchors(page_url)
+            return self.pages[page_url]
+    
+    def check(self, page_url, fragment):
+        """
+        Check whether a fragment exists on a page.
         
-        log.write(f"=== Broken Relative URLs With Anchors ({len(broken_relative_urls_with_anchor)} links found) ===\n\n")
-        if broken_relative_urls_with_anchor:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in broken_relative_urls_with_anchor) + "\n\n")
-        else:
-            log.write("No broken relative URLs with anchors found.\n\n")
+        Returns:
+            True if found, False if missing from a fully read HTML page, or None if it cannot be verified
+        """
+        from urllib.parse import unquote
+        fragment = unquote(fragment)
+        if not fragment or UNVERIFIABLE_FRAGMENT_REGEX.match(fragment):
+            return None
+        page = self.get_anchors(page_url.split('#', 1)[0])
+        if page is None:
+            self.unverified += 1
+            return None
+        anchors, complete = page
+        # GitHub prefixes the ids of rendered markdown with "user-content-"
+        candidates = (fragment, f"user-content-{fragment}", f"user-content-{fragment.lower()}")
+        if any(candidate in anchors for candidate in candidates):
+            self.validated += 1
+            return True
+        if not complete:
+            self.unverified += 1
+            return None
+        self.missing += 1
+        return False
+
+REMOTE_ANCHORS = RemoteAnchorCache()
+
+# =============================================================================
+# LINK CHECKING & REPORTING
+# =============================================================================
+
+# Result categories in report order: (key, section title, message when empty, is_broken)
+RESULT_SECTIONS = [
+    ('broken_absolute', "Broken Absolute URLs", "No broken absolute URLs found.", True),
+    ('broken_relative_without_anchor', "Broken Relative URLs Without Anchors", "No broken relative URLs without anchors found.", True),
+    ('broken_relative_with_anchor', "Broken Relative URLs With Anchors", "No broken relative URLs with anchors found.", True),
+    ('broken_root_relative', "Broken Root-Relative URLs", "No broken root-relative URLs found.", True),
+    ('broken_image', "Broken Image URLs", "No broken image URLs found.", True),
+    ('broken_svg', "Broken SVG URLs", "No broken SVG URLs found.", True),
+    ('broken_header', "Broken Header Links", "No broken header links found.", True),
+    ('ok_absolute', "OK Absolute URLs", "No absolute URLs found.", False),
+    ('ok_relative', "OK Relative URLs", "No relative URLs found.", False),
+    ('ok_root_relative', "OK Root-Relative URLs", "No root-relative URLs found.", False),
+    ('ok_image', "OK Image URLs", "No image URLs found.", False),
+    ('ok_svg', "OK SVG URLs", "No SVG URLs found.", False),
+    ('ok_header', "OK Header Links", "No header links found.", False),
+]
+
+# Console totals in display order: (label, category key)
+RESULT_TOTALS = [
+    ("broken absolute URLs", 'broken_absolute'),
+    ("broken relative URLs (without anchors)", 'broken_relative_without_anchor'),
+    ("broken relative URLs (with anchors)", 'broken_relative_with_anchor'),
+    ("OK absolute URLs", 'ok_absolute'),
+    ("OK relative URLs", 'ok_relative'),
+    ("broken root-relative URLs", 'broken_root_relative'),
+    ("OK root-relative URLs", 'ok_root_relative'),
+    ("broken image URLs", 'broken_image'),
+    ("OK image URLs", 'ok_image'),
+    ("broken SVG URLs", 'broken_svg'),
+    ("OK SVG URLs", 'ok_svg'),
+    ("broken header links", 'broken_header'),
+    ("OK header links", 'ok_header'),
+]
+
+# Summary groups: (label, [(broken label, broken category key), ...], OK category key)
+SUMMARY_GROUPS = [
+    ("Absolute URLs", [("Absolute URLs", 'broken_absolute')], 'ok_absolute'),
+    ("Relative URLs", [("Relative URLs without anchors", 'broken_relative_without_anchor'),
+                       ("Relative URLs with anchors", 'broken_relative_with_anchor')], 'ok_relative'),
+    ("Root-relative URLs", [("Root-relative URLs", 'broken_root_relative')], 'ok_root_relative'),
+    ("Image URLs", [("Image URLs", 'broken_image')], 'ok_image'),
+    ("SVG URLs", [("SVG URLs", 'broken_svg')], 'ok_svg'),
+    ("Header links", [("Header links", 'broken_header')], 'ok_header'),
+]
+
+def new_results():
+    """Create an empty result list for every category."""
+    return {key: [] for key, _, _, _ in RESULT_SECTIONS}
+
+def is_broken_category(category):
+    """Check if a result category holds broken links."""
+    return category.startswith('broken_')
+
+def check_link(url, file_path, attempt=None):
+    """
+    Check a single link found in a file and categorize the result.
+    
+    Args:
+        url: The link as extracted from the file
+        file_path: Source file containing the link
+        attempt: Zero-based attempt for absolute URLs whose transient failures are
+            retried later (see check_absolute_url), or None to retry inline
         
-        log.write(f"=== Broken Root-Relative URLs ({len(broken_root_relative_urls)} links found) ===\n\n")
-        if broken_root_relative_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in broken_root_relative_urls) + "\n\n")
-        else:
-            log.write("No broken root-relative URLs found.\n\n")
+    Returns:
+        Tuple containing: (category, log_entry), or None if the link was skipped
         
-        log.write(f"=== Broken Image URLs ({len(broken_image_urls)} links found) ===\n\n")
-        if broken_image_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in broken_image_urls) + "\n\n")
-        else:
-            log.write("No broken image URLs found.\n\n")
+    Raises:
+        RetryLater: If a transient failure should be retried later (only when `attempt` is given)
+        CheckDeferred: If a failure cannot be retried in this run (only when `attempt` is given)
+    """
+    # Skip email links
+    if EMAIL_REGEX.match(url):
+        print(f"Skipping email URL: {url}")
+        return None
+    
+    # Skip kinds of links that were not selected with --only / --skip-external
+    if len(ENABLED_LINK_KINDS) < len(LINK_KINDS) and get_link_kind(url) not in ENABLED_LINK_KINDS:
+        return None
+    
+    # Skip localhost and IP-based URLs (unless checking against a local test server)
+    if not ALLOW_LOCAL_URLS and (url.startswith("http://localhost") or is_ip_based_url(url)):
+        print(f"Skipping localhost or IP-based URL: {url}")
+        return None
+    
+    # Skip false positive URLs
+    if is_false_positive(url, file_path):
+        return None
+    
+    # Add error handling for URL parsing
+    try:
+        # Check URL based on whether it's absolute or relative
+        parsed_url = urlparse(url)
+        if parsed_url.scheme in ('http', 'https'):
+            # It's an absolute URL - pass the file path to track source
+            log_entry = check_absolute_url(url, file_path, attempt=attempt)
+            return ('ok_absolute' if "[OK ABSOLUTE]" in log_entry else 'broken_absolute'), log_entry
         
-        log.write(f"=== Broken SVG URLs ({len(broken_svg_urls)} links found) ===\n\n")
-        if broken_svg_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in broken_svg_urls) + "\n\n")
-        else:
-            log.write("No broken SVG URLs found.\n\n")
+        # Strip quotes before further processing to avoid false positives
+        url_clean = url.strip('"\'')
         
-        log.write(f"=== Broken Header Links ({len(broken_header_urls)} links found) ===\n\n")
-        if broken_header_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in broken_header_urls) + "\n\n")
-        else:
-            log.write("No broken header links found.\n\n")
+        try:
+            parsed_clean = urlparse(url_clean)
+            
+            # Check again if it's actually an absolute URL after stripping quotes
+            if parsed_clean.scheme in ('http', 'https'):
+                # Skip false positive URLs after cleaning
+                if is_false_positive(url_clean, file_path):
+                    return None
+                log_entry = check_absolute_url(url_clean, file_path, attempt=attempt)
+                return ('ok_absolute' if "[OK ABSOLUTE]" in log_entry else 'broken_absolute'), log_entry
+            
+            # It's a relative URL, image, SVG, root-relative, or header link
+            log_entry, is_image, is_svg, is_root_relative, has_anchor = check_relative_url(url, file_path)
+            
+            if "[BROKEN HEADER]" in log_entry:
+                return 'broken_header', log_entry
+            elif "[OK HEADER]" in log_entry:
+                return 'ok_header', log_entry
+            elif is_svg:
+                return ('ok_svg' if "[OK SVG]" in log_entry else 'broken_svg'), log_entry
+            elif is_image:
+                return ('ok_image' if "[OK IMAGE]" in log_entry else 'broken_image'), log_entry
+            elif is_root_relative:
+                return ('ok_root_relative' if "[OK ROOT-RELATIVE]" in log_entry else 'broken_root_relative'), log_entry
+            elif "[OK RELATIVE]" in log_entry:
+                return 'ok_relative', log_entry
+            elif "[BROKEN RELATIVE WITH ANCHOR]" in log_entry:
+                return 'broken_relative_with_anchor', log_entry
+            elif "[BROKEN RELATIVE WITHOUT ANCHOR]" in log_entry:
+                return 'broken_relative_without_anchor', log_entry
+            return None
         
-        log.write(f"=== OK Absolute URLs ({len(ok_absolute_urls)} links found) ===\n\n")
-        if ok_absolute_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in ok_absolute_urls) + "\n\n")
+        except ValueError as e:
+            # Handle URL parsing errors for the cleaned URL
+            error_message = str(e)
+            log_entry = f"{Colors.FAIL}[MALFORMED URL] {url_clean} - Error: {error_message} (in file: {file_path}){Colors.ENDC}"
+            print(log_entry)
+            return 'broken_absolute', log_entry
+    
+    except ValueError as e:
+        # Handle URL parsing errors
+        error_message = str(e)
+        if "Invalid IPv6 URL" in error_message:
+            log_entry = f"{Colors.FAIL}[MALFORMED URL] {url} - Invalid IPv6 URL format (in file: {file_path}){Colors.ENDC}"
         else:
-            log.write("No absolute URLs found.\n\n")
+            log_entry = f"{Colors.FAIL}[MALFORMED URL] {url} - Error: {error_message} (in file: {file_path}){Colors.ENDC}"
+        print(log_entry)
+        return 'broken_absolute', log_entry
+
+def summarize_results(results):
+    """
+    Group result categories for the summary.
+    
+    Args:
+        results: Dict mapping category keys to lists of log entries
         
-        log.write(f"=== OK Relative URLs ({len(ok_relative_urls)} links found) ===\n\n")
-        if ok_relative_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in ok_relative_urls) + "\n\n")
+    Returns:
+        Tuple containing: (total_broken, total_ok, broken_types, no_links_types, zero_broken_types)
+    """
+    no_links_types = []  # Categories with no links at all (neither broken nor OK)
+    zero_broken_types = []  # Categories with OK links but no broken links
+    broken_types = []  # Categories with broken links
+    
+    for label, broken_keys, ok_key in SUMMARY_GROUPS:
+        broken_counts = [(broken_label, len(results[key])) for broken_label, key in broken_keys]
+        ok_count = len(results[ok_key])
+        if not any(count for _, count in broken_counts):
+            if ok_count == 0:
+                no_links_types.append((label, 0))
+            else:
+                zero_broken_types.append((label, ok_count))
         else:
-            log.write("No relative URLs found.\n\n")
+            # Only show the parts of the group that actually have broken links
+            broken_types.extend((broken_label, count) for broken_label, count in broken_counts if count > 0)
+    
+    total_broken = sum(len(entries) for key, entries in results.items() if is_broken_category(key))
+    total_ok = sum(len(entries) for key, entries in results.items() if not is_broken_category(key))
+    return total_broken, total_ok, broken_types, no_links_types, zero_broken_types
+
+def format_runtime(runtime_seconds):
+    """Create a human-readable runtime string."""
+    runtime_duration = timedelta(seconds=runtime_seconds)
+    if runtime_seconds < 60:
+        return f"{runtime_seconds:.2f} seconds"
+    elif runtime_seconds < 3600:
+        return f"{runtime_seconds/60:.2f} minutes ({runtime_duration})"
+    else:
+        return f"{runtime_seconds/3600:.2f} hours ({runtime_duration})"
+
+def write_log_report(log_path, results, timestamp, runtime_seconds):
+    """
+    Write the organized results and summary to the log file.
+    
+    Args:
+        log_path: Log file to write
+        results: Dict mapping category keys to lists of log entries
+        timestamp: Timestamp of the run
+        runtime_seconds: Runtime of the run in seconds
+    """
+    runtime_str = format_runtime(runtime_seconds)
+    total_broken, total_ok, broken_types, no_links_types, zero_broken_types = summarize_results(results)
+    total_links = total_broken + total_ok
+    
+    with open(log_path, 'w', encoding='utf-8') as log:
+        log.write(f"URL Checker Results\n\n")
+        log.write(f"Log generated on: {timestamp}\n")
+        log.write(f"Runtime: {runtime_str}\n")
+        log.write(f"Runtime duration: {timedelta(seconds=runtime_seconds)}\n\n")
         
-        log.write(f"=== OK Root-Relative URLs ({len(ok_root_relative_urls)} links found) ===\n\n")
-        if ok_root_relative_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in ok_root_relative_urls) + "\n\n")
-        else:
-            log.write("No root-relative URLs found.\n\n")
+        # Broken sections come first (most important), then OK sections
+        for key, title, empty_message, _ in RESULT_SECTIONS:
+            entries = results[key]
+            log.write(f"=== {title} ({len(entries)} links found) ===\n\n")
+            if entries:
+                log.write("\n".join(strip_ansi_escape_codes(entry) for entry in entries) + "\n\n")
+            else:
+                log.write(f"{empty_message}\n\n")
         
-        log.write(f"=== OK Image URLs ({len(ok_image_urls)} links found) ===\n\n")
-        if ok_image_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in ok_image_urls) + "\n\n")
+        # Canonical targets for redirecting URLs, so links can be rewritten to skip the redirects
+        log.write(f"=== Redirected URLs ({len(CANONICAL_URLS)} URLs with a canonical target) ===\n\n")
+        if CANONICAL_URLS:
+            log.write("\n".join(format_redirect(url, target) for url, target in sorted(CANONICAL_URLS.items())) + "\n\n")
         else:
-            log.write("No image URLs found.\n\n")
+            log.write("No redirected URLs found.\n\n")
         
-        log.write(f"=== OK SVG URLs ({len(ok_svg_urls)} links found) ===\n\n")
-        if ok_svg_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in ok_svg_urls) + "\n\n")
+        # Hosts whose remaining URLs were reported broken without waiting on them
+        log.write(f"=== Short-Circuited Hosts ({len(HOST_HEALTH.down_hosts)} hosts marked down) ===\n\n")
+        if HOST_HEALTH.down_hosts:
+            log.write("\n".join(format_down_host(host, reason) for host, reason in sorted(HOST_HEALTH.down_hosts.items())) + "\n\n")
         else:
-            log.write("No SVG URLs found.\n\n")
+            log.write("No hosts were marked down.\n\n")
         
-        log.write(f"=== OK Header Links ({len(ok_header_urls)} links found) ===\n\n")
-        if ok_header_urls:
-            log.write("\n".join(strip_ansi_escape_codes(url) for url in ok_header_urls) + "\n\n")
+        # Observed latency per host and the read deadline it produced
+        latency_lines = [format_host_latency(host) for host in sorted(HOST_LATENCY.samples)]
+        log.write(f"=== Host Latency ({len(latency_lines)} hosts) ===\n\n")
+        if latency_lines:
+            log.write("\n".join(latency_lines) + "\n\n")
         else:
-            log.write("No header links found.\n\n")
-        
-        # Add summary with improved informative title and hierarchical format
-        total_broken = (len(broken_absolute_urls) + 
-                        len(broken_relative_urls_with_anchor) + 
-                        len(broken_relative_urls_without_anchor) + 
-                        len(broken_root_relative_urls) + 
-                        len(broken_image_urls) + 
-                        len(broken_svg_urls) + 
-                        len(broken_header_urls)
-                        )
-        
-        total_ok = len(ok_absolute_urls) + len(ok_relative_urls) + len(ok_root_relative_urls) + len(ok_image_urls) + len(ok_svg_urls) + len(ok_header_urls)
-        total_links = total_broken + total_ok
-        
-        # Updated categorization logic
-        no_links_types = []  # Categories with no links at all (neither broken nor OK)
-        zero_broken_types = []  # Categories with OK links but no broken links
-        broken_types = []  # Categories with broken links
-        
-        # Absolute URLs
-        if len(broken_absolute_urls) == 0 and len(ok_absolute_urls) == 0:
-            no_links_types.append(("Absolute URLs", 0))
-        elif len(broken_absolute_urls) == 0:
-            zero_broken_types.append(("Absolute URLs", len(ok_absolute_urls)))
-        else:
-            broken_types.append(("Absolute URLs", len(broken_absolute_urls)))
-            
-        # Relative URLs without anchors and with anchors combined
-        if len(broken_relative_urls_without_anchor) == 0 and len(broken_relative_urls_with_anchor) == 0 and len(ok_relative_urls) == 0:
-            no_links_types.append(("Relative URLs", 0))
-        elif len(broken_relative_urls_without_anchor) == 0 and len(broken_relative_urls_with_anchor) == 0:
-            zero_broken_types.append(("Relative URLs", len(ok_relative_urls)))
-        else:
-            # Count broken relative URLs with and without anchors separately
-            if len(broken_relative_urls_without_anchor) > 0:
-                broken_types.append(("Relative URLs without anchors", len(broken_relative_urls_without_anchor)))
-            if len(broken_relative_urls_with_anchor) > 0:
-                broken_types.append(("Relative URLs with anchors", len(broken_relative_urls_with_anchor)))
-                
-        # Root-relative URLs
-        if len(broken_root_relative_urls) == 0 and len(ok_root_relative_urls) == 0:
-            no_links_types.append(("Root-relative URLs", 0))
-        elif len(broken_root_relative_urls) == 0:
-            zero_broken_types.append(("Root-relative URLs", len(ok_root_relative_urls)))
-        else:
-            broken_types.append(("Root-relative URLs", len(broken_root_relative_urls)))
-            
-        # Image URLs
-        if len(broken_image_urls) == 0 and len(ok_image_urls) == 0:
-            no_links_types.append(("Image URLs", 0))
-        elif len(broken_image_urls) == 0:
-            zero_broken_types.append(("Image URLs", len(ok_image_urls)))
-        else:
-            broken_types.append(("Image URLs", len(broken_image_urls)))
-            
-        # SVG URLs
-        if len(broken_svg_urls) == 0 and len(ok_svg_urls) == 0:
-            no_links_types.append(("SVG URLs", 0))
-        elif len(broken_svg_urls) == 0:
-            zero_broken_types.append(("SVG URLs", len(ok_svg_urls)))
-        else:
-            broken_types.append(("SVG URLs", len(broken_svg_urls)))
-            
-        # Header links
-        if len(broken_header_urls) == 0 and len(ok_header_urls) == 0:
-            no_links_types.append(("Header links", 0))
-        elif len(broken_header_urls) == 0:
-            zero_broken_types.append(("Header links", len(ok_header_urls)))
-        else:
-            broken_types.append(("Header links", len(broken_header_urls)))
+            log.write("No HTTP requests were made.\n\n")
         
         # Write modernized summary to log file
         log.write("\n" + "═" * 80 + "\n")
@@ -1486,141 +3503,71 @@ def main():
             
         log.write(f"✅ OK LINKS: {total_ok}\n\n")
         
+        if CANONICAL_URLS:
+            log.write(f"🔀 REDIRECTED URLS: {len(CANONICAL_URLS)} (canonical targets listed above)\n\n")
+        
+        if HOST_HEALTH.down_hosts:
+            log.write(f"⚡ SHORT-CIRCUITED HOSTS: {len(HOST_HEALTH.down_hosts)} ({sum(HOST_HEALTH.short_circuited.values())} URLs marked broken without a request)\n\n")
+        
         # Add runtime to log summary
         log.write(f"⏱️ RUNTIME: {runtime_str}\n\n")
         
         # Add final conclusion with emoji
-        broken_links_found = bool(broken_absolute_urls or broken_relative_urls_with_anchor or broken_relative_urls_without_anchor or
-                                 broken_root_relative_urls or broken_image_urls or broken_svg_urls or broken_header_urls)
-        if broken_links_found:
+        if total_broken > 0:
             log.write(f"❌ Broken links were found. Check the logs for details.\n")
         else:
             log.write(f"✅ All links are valid!\n")
+
+def print_report(results, log_path, timestamp, runtime_seconds):
+    """
+    Print the categorized results and summary to the console.
     
-    # Print results to console
-    print(f"Check complete. See {log_file_with_timestamp} for details.")
+    Args:
+        results: Dict mapping category keys to lists of log entries
+        log_path: Log file the full results were written to
+        timestamp: Timestamp of the run
+        runtime_seconds: Runtime of the run in seconds
+        
+    Returns:
+        True if any broken links were found
+    """
+    runtime_str = format_runtime(runtime_seconds)
+    total_broken, total_ok, broken_types, no_links_types, zero_broken_types = summarize_results(results)
+    total_links = total_broken + total_ok
+    
+    print(f"Check complete. See {log_path} for details.")
     
     print(f"\nLog generated on: {timestamp}")
     print(f"{Colors.INFO}Runtime: {runtime_str}{Colors.ENDC}")
-    print(f"Runtime duration: {runtime_duration}")
-    print(f"Total broken absolute URLs: {len(broken_absolute_urls)}")
-    print(f"Total broken relative URLs (without anchors): {len(broken_relative_urls_without_anchor)}")
-    print(f"Total broken relative URLs (with anchors): {len(broken_relative_urls_with_anchor)}")
-    print(f"Total OK absolute URLs: {len(ok_absolute_urls)}")
-    print(f"Total OK relative URLs: {len(ok_relative_urls)}")
-    print(f"Total broken root-relative URLs: {len(broken_root_relative_urls)}")
-    print(f"Total OK root-relative URLs: {len(ok_root_relative_urls)}")
-    print(f"Total broken image URLs: {len(broken_image_urls)}")
-    print(f"Total OK image URLs: {len(ok_image_urls)}")
-    print(f"Total broken SVG URLs: {len(broken_svg_urls)}")
-    print(f"Total OK SVG URLs: {len(ok_svg_urls)}")
-    print(f"Total broken header links: {len(broken_header_urls)}")
-    print(f"Total OK header links: {len(ok_header_urls)}")
-    
-    # Update these sections to match log file format
-    print(f"\n=== Broken Absolute URLs ({len(broken_absolute_urls)} links found) ===")
-    if broken_absolute_urls:
-        for url in broken_absolute_urls:
-            print(f"{Colors.FAIL}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No broken absolute URLs found.")
+    print(f"Runtime duration: {timedelta(seconds=runtime_seconds)}")
+    for label, key in RESULT_TOTALS:
+        print(f"Total {label}: {len(results[key])}")
     
-    print(f"\n=== Broken Relative URLs Without Anchors ({len(broken_relative_urls_without_anchor)} links found) ===")
-    if broken_relative_urls_without_anchor:
-        for url in broken_relative_urls_without_anchor:
-            print(f"{Colors.FAIL}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No broken relative URLs without anchors found.")
-        
-    print(f"\n=== Broken Relative URLs With Anchors ({len(broken_relative_urls_with_anchor)} links found) ===")
-    if broken_relative_urls_with_anchor:
-        for url in broken_relative_urls_with_anchor:
-            print(f"{Colors.FAIL}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No broken relative URLs with anchors found.")
-        
-    print(f"\n=== Broken Root-Relative URLs ({len(broken_root_relative_urls)} links found) ===")
-    if broken_root_relative_urls:
-        for url in broken_root_relative_urls:
-            print(f"{Colors.FAIL}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No broken root-relative URLs found.")
-
-    print(f"\n=== Broken Image URLs ({len(broken_image_urls)} links found) ===")
-    if broken_image_urls:
-        for url in broken_image_urls:
-            print(f"{Colors.FAIL}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No broken image URLs found.")
-
-    print(f"\n=== Broken SVG URLs ({len(broken_svg_urls)} links found) ===")
-    if broken_svg_urls:
-        for url in broken_svg_urls:
-            print(f"{Colors.FAIL}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No broken SVG URLs found.")
-
-    print(f"\n=== Broken Header Links ({len(broken_header_urls)} links found) ===")
-    if broken_header_urls:
-        for url in broken_header_urls:
-            print(f"{Colors.FAIL}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No broken header links found.")
-
-    print(f"\n=== OK Absolute URLs ({len(ok_absolute_urls)} links found) ===")
-    if ok_absolute_urls:
-        for url in ok_absolute_urls:
-            print(f"{Colors.OKGREEN}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No absolute URLs found.")
-
-    print(f"\n=== OK Relative URLs ({len(ok_relative_urls)} links found) ===")
-    if ok_relative_urls:
-        for url in ok_relative_urls:
-            print(f"{Colors.OKGREEN}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No relative URLs found.")
-
-    print(f"\n=== OK Root-Relative URLs ({len(ok_root_relative_urls)} links found) ===")
-    if ok_root_relative_urls:
-        for url in ok_root_relative_urls:
-            print(f"{Colors.OKGREEN}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No root-relative URLs found.")
+    # Print each category in the same order as the log file
+    for key, title, empty_message, is_broken in RESULT_SECTIONS:
+        entries = results[key]
+        color = Colors.FAIL if is_broken else Colors.OKGREEN
+        print(f"\n=== {title} ({len(entries)} links found) ===")
+        if entries:
+            for entry in entries:
+                print(f"{color}{strip_ansi_escape_codes(entry)}{Colors.ENDC}")
+        else:
+            print(empty_message)
 
-    print(f"\n=== OK Image URLs ({len(ok_image_urls)} links found) ===")
-    if ok_image_urls:
-        for url in ok_image_urls:
-            print(f"{Colors.OKGREEN}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
+    print(f"\n=== Redirected URLs ({len(CANONICAL_URLS)} URLs with a canonical target) ===")
+    if CANONICAL_URLS:
+        for url, target in sorted(CANONICAL_URLS.items()):
+            print(f"{Colors.INFO}{format_redirect(url, target)}{Colors.ENDC}")
     else:
-        print("No image URLs found.")
+        print("No redirected URLs found.")
 
-    print(f"\n=== OK SVG URLs ({len(ok_svg_urls)} links found) ===")
-    if ok_svg_urls:
-        for url in ok_svg_urls:
-            print(f"{Colors.OKGREEN}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
+    print(f"\n=== Short-Circuited Hosts ({len(HOST_HEALTH.down_hosts)} hosts marked down) ===")
+    if HOST_HEALTH.down_hosts:
+        for host, reason in sorted(HOST_HEALTH.down_hosts.items()):
+            print(f"{Colors.FAIL}{format_down_host(host, reason)}{Colors.ENDC}")
     else:
-        print("No SVG URLs found.")
+        print("No hosts were marked down.")
 
-    print(f"\n=== OK Header Links ({len(ok_header_urls)} links found) ===")
-    if ok_header_urls:
-        for url in ok_header_urls:
-            print(f"{Colors.OKGREEN}{strip_ansi_escape_codes(url)}{Colors.ENDC}")
-    else:
-        print("No header links found.")
-
-    # Print modernized summary table with improved title and color coding
-    total_broken = (len(broken_absolute_urls) + 
-                    len(broken_relative_urls_with_anchor) + 
-                    len(broken_relative_urls_without_anchor) + 
-                    len(broken_root_relative_urls) + 
-                    len(broken_image_urls) + 
-                    len(broken_svg_urls) + 
-                    len(broken_header_urls))
-    
-    total_ok = len(ok_absolute_urls) + len(ok_relative_urls) + len(ok_root_relative_urls) + len(ok_image_urls) + len(ok_svg_urls) + len(ok_header_urls)
-    total_links = total_broken + total_ok
-    
     # Enhanced title with borders - keep this one cyan
     print(f"\n{Colors.INFO}═════════════════════════════════════════════════════════{Colors.ENDC}")
     print(f"{Colors.INFO}📊  LINK VALIDATION SUMMARY ({total_links} links checked){Colors.ENDC}")
@@ -1656,24 +3603,2113 @@ def main():
     print(f"{Colors.OKGREEN}✅  OK LINKS: {total_ok}{Colors.ENDC}")
     print()
 
-    # Add runtime to console summary with emoji - use the same color as the section headers
-    print(f"{Colors.INFO}⏱️  RUNTIME: {runtime_str}{Colors.ENDC}")
-    print()
+    if LOCAL_ANCHORS.validated or LOCAL_ANCHORS.missing:
+        print(f"{Colors.INFO}🔖  LOCAL ANCHORS: {LOCAL_ANCHORS.validated + LOCAL_ANCHORS.missing} anchors checked against {LOCAL_ANCHORS.parses} in-repo files "
+              f"({LOCAL_ANCHORS.missing} missing){Colors.ENDC}")
+        print()
+
+    if REMOTE_ANCHORS.downloads:
+        print(f"{Colors.INFO}⚓  REMOTE ANCHORS: {REMOTE_ANCHORS.validated + REMOTE_ANCHORS.missing} fragments checked on {REMOTE_ANCHORS.downloads} pages "
+              f"({REMOTE_ANCHORS.missing} missing, {REMOTE_ANCHORS.unverified} could not be verified){Colors.ENDC}")
+        print()
+
+    if SITEMAPS.validated or SITEMAPS.fallbacks:
+        print(f"{Colors.INFO}🗺️  SITEMAP LINKS: {SITEMAPS.validated} validated against sitemaps without requests, "
+              f"{SITEMAPS.fallbacks} not listed and checked over HTTP{Colors.ENDC}")
+        print()
+
+    if GITHUB_TREES.validated:
+        print(f"{Colors.INFO}🌳  GITHUB LINKS: {GITHUB_TREES.validated} validated against {sum(GITHUB_TREES.sources.values())} repository trees without requests "
+              f"({GITHUB_TREES.sources['clone']} from local clones, {GITHUB_TREES.sources['api']} from the API){Colors.ENDC}")
+        print()
 
-    # Determine if any broken links were found
-    broken_links_found = bool(broken_absolute_urls or broken_relative_urls_with_anchor or broken_relative_urls_without_anchor or broken_root_relative_urls or broken_image_urls or broken_svg_urls or broken_header_urls)
+    if CANONICAL_URLS:
+        print(f"{Colors.INFO}🔀  REDIRECTED URLS: {len(CANONICAL_URLS)} (canonical targets listed above){Colors.ENDC}")
+        print()
+
+    if HOST_HEALTH.down_hosts:
+        print(f"{Colors.FAIL}⚡  SHORT-CIRCUITED HOSTS: {len(HOST_HEALTH.down_hosts)} ({sum(HOST_HEALTH.short_circuited.values())} URLs marked broken without a request){Colors.ENDC}")
+        print()
+
+    # Add runtime to console summary with emoji - use the same color as the section headers
+    print(f"{Colors.INFO}⏱️  RUNTIME: {runtime_str}{Colors.ENDC}")
+    print()
 
     # Add a message about where the log file is saved - use the same color as the section headers
-    print(f"{Colors.INFO}📄 FULL LOGS: {log_file_with_timestamp}{Colors.ENDC}")
+    print(f"{Colors.INFO}📄 FULL LOGS: {log_path}{Colors.ENDC}")
     print()
 
-    # Exit with appropriate code and final conclusion
-    if broken_links_found:
+    # Final conclusion
+    if total_broken > 0:
         print(f"{Colors.FAIL}❌  Broken links were found. Check the logs for details.{Colors.ENDC}")
-        sys.exit(1)  # Exit code 1 signals that broken links were found
     else:
         print(f"{Colors.OKGREEN}✅  All links are valid!{Colors.ENDC}")
-        sys.exit(0)  # Exit code 0 signals that all links are valid
+    return total_broken > 0
+
+def write_skip_rule_hits(log_path, rule_hits):
+    """
+    Append the hit count of every skip rule to the log file, so dead rules can be pruned.
+    
+    Args:
+        log_path: Log file to append to
+        rule_hits: List of dicts with the category, rule, source and hits of every rule
+    """
+    dead_rules = sum(1 for rule in rule_hits if not rule['hits'])
+    with open(log_path, 'a', encoding='utf-8') as log:
+        log.write(f"\n=== Skip Rule Hits ({len(rule_hits)} rules, {dead_rules} never matched) ===\n")
+        for rule in rule_hits:
+            dead_info = " [never matched]" if not rule['hits'] else ""
+            log.write(f"{rule['hits']:>7}  {rule['category']}: {rule['rule']} ({rule['source']}){dead_info}\n")
+
+def write_concurrency_history(log_path):
+    """Append the changes of the adaptive concurrency limit to the log file."""
+    if len(CONCURRENCY.history) < 2:
+        return
+    with open(log_path, 'a', encoding='utf-8') as log:
+        log.write("\n=== Concurrency Limit ===\n")
+        for seconds, limit, reason in CONCURRENCY.history:
+            log.write(f"{seconds:8.2f}s  {limit:3d}  {reason}\n")
+
+def print_skip_rule_hits(rule_hits):
+    """Print how many links the skip rules matched and how many rules never matched."""
+    if not rule_hits:
+        return
+    matched = [rule for rule in rule_hits if rule['hits']]
+    skipped = sum(rule['hits'] for rule in matched)
+    print()
+    print(f"{Colors.INFO}🧹  SKIP RULES: {len(matched)} of {len(rule_hits)} rules skipped {skipped} links, "
+          f"{len(rule_hits) - len(matched)} never matched (hit counts per rule are in the log){Colors.ENDC}")
+
+# =============================================================================
+# FAILURE POLICY
+# =============================================================================
+
+# Broken-link categories counted against each policy gate (--max-broken GATE=N)
+POLICY_GATES = {
+    'total': [key for key, _, _, is_broken in RESULT_SECTIONS if is_broken],
+    'external': ['broken_absolute'],
+    'relative': ['broken_relative_without_anchor', 'broken_relative_with_anchor', 'broken_root_relative',
+                 'broken_image', 'broken_svg', 'broken_header'],
+    'anchors': ['broken_relative_with_anchor', 'broken_header'],
+    'images': ['broken_image', 'broken_svg'],
+}
+# Every broken category can also be gated on its own, e.g. "root_relative" or "header"
+POLICY_GATES.update({key[len('broken_'):]: [key] for key in POLICY_GATES['total']})
+
+STOP_EVENT = threading.Event()   # Set by --fail-fast once a gate is exceeded (or on SIGINT/SIGTERM), so in-flight checks stop retrying
+INTERRUPTED = threading.Event()  # Set on SIGINT/SIGTERM: checks that would retry are left pending for --resume instead
+
+def parse_policy_gate(value):
+    """
+    Parse a --max-broken value of the form "GATE=N".
+    
+    Returns:
+        Tuple containing: (gate, limit)
+    """
+    gate, separator, limit = value.partition('=')
+    gate = gate.strip()
+    if gate not in POLICY_GATES:
+        raise argparse.ArgumentTypeError(f"unknown gate '{gate}' (choose from {', '.join(POLICY_GATES)})")
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = -1
+    if not separator or limit < 0:
+        raise argparse.ArgumentTypeError(f"invalid limit in '{value}', expected GATE=N with N >= 0 (e.g. external=5)")
+    return gate, limit
+
+class FailurePolicy:
+    """
+    Decide whether a run passes, based on how many broken links each gate allows.
+    
+    Without any gates, a single broken link fails the run. Broken categories that
+    none of the given gates cover still allow no broken links, so relaxing one gate
+    (e.g. external=5) never silently relaxes the others.
+    
+    Args:
+        limits: List of (gate, limit) tuples from --max-broken
+    """
+    def __init__(self, limits=None):
+        self.gates = []  # (gate, categories, limit)
+        for gate, limit in limits or []:
+            self.gates = [entry for entry in self.gates if entry[0] != gate]  # Last value for a gate wins
+            self.gates.append((gate, set(POLICY_GATES[gate]), limit))
+        covered = set().union(*(categories for _, categories, _ in self.gates))
+        uncovered = [key for key in POLICY_GATES['total'] if key not in covered]
+        if uncovered:
+            self.gates.append(('total' if not self.gates else 'other', set(uncovered), 0))
+        self.counts = {gate: 0 for gate, _, _ in self.gates}
+    
+    def record(self, category):
+        """
+        Count a checked link against the gates that cover its category.
+        
+        Returns:
+            Name of the first gate this link pushed over its limit, or None
+        """
+        exceeded = None
+        for gate, categories, limit in self.gates:
+            if category in categories:
+                self.counts[gate] += 1
+                if self.counts[gate] == limit + 1 and exceeded is None:
+                    exceeded = gate
+        return exceeded
+    
+    def record_all(self, categories):
+        """Count many checked links at once (e.g. merged or daemon results)."""
+        for category in categories:
+            self.record(category)
+    
+    def violations(self):
+        """Get the gates whose limit was exceeded, as (gate, count, limit) tuples."""
+        return [(gate, self.counts[gate], limit) for gate, _, limit in self.gates if self.counts[gate] > limit]
+    
+    def describe(self, gate):
+        """Format a gate's count against its limit, e.g. "external: 3/5 broken"."""
+        limit = next(limit for name, _, limit in self.gates if name == gate)
+        return f"{gate}: {self.counts[gate]}/{limit} broken"
+    
+    def print_report(self):
+        """
+        Print the result of every gate.
+        
+        Returns:
+            True if the run passes the policy
+        """
+        failed = {gate for gate, _, _ in self.violations()}
+        print()
+        print(f"{Colors.INFO}🚦  FAILURE POLICY:{Colors.ENDC}")
+        for gate, _, _ in self.gates:
+            if gate in failed:
+                print(f"{Colors.FAIL}   • {self.describe(gate)} - limit exceeded{Colors.ENDC}")
+            else:
+                print(f"{Colors.OKGREEN}   • {self.describe(gate)}{Colors.ENDC}")
+        print()
+        if failed:
+            print(f"{Colors.FAIL}❌  Failure policy not met ({', '.join(sorted(failed))}).{Colors.ENDC}")
+        else:
+            print(f"{Colors.OKGREEN}✅  Failure policy met.{Colors.ENDC}")
+        return not failed
+
+# =============================================================================
+# BASELINE OF KNOWN BROKEN LINKS
+# =============================================================================
+
+BASELINE_FORMAT_VERSION = 1
+BASELINE_RECHECK_DAYS = 7  # Known broken external links are re-requested at most this often
+
+class LinkBaseline:
+    """
+    Known broken links that should not be reported (or re-requested) on every run.
+    
+    Entries are keyed by source file (relative to the repository root) and URL.
+    Known broken external URLs are skipped until their re-check is due; offline
+    links are cheap, so they are always re-checked. A baseline link that is still
+    broken is suppressed from the report, and one that works again is reported as
+    fixed, so only new breakages show up as broken links.
+    
+    Args:
+        path: Baseline JSON file
+        recheck_days: Days before a known broken external link is requested again
+    """
+    def __init__(self, path, recheck_days=BASELINE_RECHECK_DAYS):
+        self.path = path
+        self.recheck_period = timedelta(days=recheck_days)
+        self.entries = {}      # (file, url) -> {'file', 'url', 'category', 'entry', 'last_checked'}
+        self.skipped = 0       # Known broken links not re-checked because they were not due
+        self.still_broken = 0  # Known broken links that were re-checked and are still broken
+        self.fixed = []        # (file, url) of known broken links that work again
+        self.seen = set()      # Keys of baseline entries whose link was found in this run
+        self.now = datetime.now()
+    
+    def key(self, file_path, url):
+        """Build the baseline key of a link, using a repository-relative file path."""
+        return os.path.relpath(os.path.abspath(file_path), get_repo_path()).replace(os.sep, '/'), url
+    
+    def load(self):
+        """
+        Load the baseline file. A missing file is an empty baseline.
+        
+        Returns:
+            False if the file exists but could not be read
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return True
+        except (OSError, ValueError) as e:
+            print(f"{Colors.FAIL}Error: Could not read baseline {self.path}: {e}{Colors.ENDC}")
+            return False
+        if data.get('version') != BASELINE_FORMAT_VERSION:
+            print(f"{Colors.FAIL}Error: Unsupported baseline format in {self.path}{Colors.ENDC}")
+            return False
+        self.entries = {(entry['file'], entry['url']): entry for entry in data['links']}
+        return True
+    
+    def is_due(self, entry):
+        """Check if a known broken link should be requested again."""
+        try:
+            last_checked = datetime.fromisoformat(entry['last_checked'])
+        except (KeyError, TypeError, ValueError):
+            return True
+        return self.now - last_checked >= self.recheck_period
+    
+    def skip(self, file_path, url):
+        """
+        Check if a link is a known broken external URL whose re-check is not due yet.
+        
+        Offline links are never skipped, since checking them costs no requests.
+        """
+        if not is_absolute_link(url):
+            return False
+        key = self.key(file_path, url)
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        self.seen.add(key)
+        if self.is_due(entry):
+            return False
+        self.skipped += 1
+        return True
+    
+    def suppress(self, file_path, url, category, plain_entry):
+        """
+        Record the result of a checked link against the baseline.
+        
+        Returns:
+            True if the link is a known broken link that is still broken and should not be reported
+        """
+        key = self.key(file_path, url)
+        entry = self.entries.get(key)
+        if entry is None:
+            return False
+        self.seen.add(key)
+        if not is_broken_category(category):
+            self.fixed.append(key)
+            return False
+        entry.update({'category': category, 'entry': plain_entry, 'last_checked': self.now.isoformat(timespec='seconds')})
+        self.still_broken += 1
+        return True
+    
+    def save(self, records, prune_files=None):
+        """
+        Write the baseline: still-broken known links plus the broken links of this run.
+        
+        Args:
+            records: Records of the links reported in this run
+            prune_files: Files that were fully checked in this run - their baseline
+                entries for links that no longer exist are dropped. None keeps them.
+        """
+        fixed = set(self.fixed)
+        checked_files = None
+        if prune_files is not None:
+            checked_files = {self.key(file_path, '')[0] for file_path in prune_files}
+        entries = {}
+        for key, entry in self.entries.items():
+            if key in fixed or (checked_files is not None and key[0] in checked_files and key not in self.seen):
+                continue
+            entries[key] = entry
+        for record in records:
+            if is_broken_category(record['category']):
+                key = self.key(record['file'], record['url'])
+                entries[key] = {
+                    'file': key[0],
+                    'url': record['url'],
+                    'category': record['category'],
+                    'entry': record['entry'],
+                    'last_checked': self.now.isoformat(timespec='seconds'),
+                }
+        data = {
+            'version': BASELINE_FORMAT_VERSION,
+            'updated': self.now.isoformat(timespec='seconds'),
+            'links': sorted(entries.values(), key=lambda entry: (entry['file'], entry['url'])),
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        print(f"Baseline written to: {self.path} ({len(entries)} known broken links)")
+    
+    def print_report(self):
+        """Print how many known broken links were suppressed and which ones were fixed."""
+        print()
+        print(f"{Colors.INFO}📌  BASELINE: {self.skipped + self.still_broken} known broken links not reported "
+              f"({self.skipped} not due for a re-check, {self.still_broken} re-checked and still broken){Colors.ENDC}")
+        if self.fixed:
+            print(f"{Colors.OKGREEN}🎉  FIXED SINCE BASELINE: {len(self.fixed)} (dropped when the baseline is updated){Colors.ENDC}")
+            for file_path, url in self.fixed:
+                print(f"{Colors.OKGREEN}   • {url} (in file: {file_path}){Colors.ENDC}")
+
+# =============================================================================
+# CHECK SCHEDULING
+# =============================================================================
+# Offline links (relative paths, anchors, images) are checked first, in file
+# order, since they only touch the filesystem. Absolute URLs are then checked
+# by a pool of workers, one task per unique URL, ordered by how many links
+# refer to them and interleaved across hosts: a slow host clustered in one
+# directory no longer stalls the run, and the breakages that affect the most
+# links are reported first. A URL whose check hits a transient failure (a
+# timeout, connection reset, 429 or 502/503/504) goes to a retry queue instead of
+# being retried back to back: it is checked again once its backoff delay (or the
+# host's Retry-After) has passed, after the URLs already scheduled.
+#
+# The number of checks in flight is adapted with AIMD (additive increase,
+# multiplicative decrease): it grows by one after a window of healthy responses
+# and is halved on timeouts, connection failures, 429s and 5xx overload errors.
+# =============================================================================
+
+CHECK_WORKERS = 8          # Initial number of unique absolute URLs checked concurrently
+CHECK_MAX_WORKERS = 32     # Upper bound for the adaptive concurrency (matches HTTP_POOL_SIZE)
+AIMD_DECREASE_FACTOR = 0.5 # The limit is multiplied by this on congestion
+AIMD_LATENCY_FACTOR = 3    # Responses slower than this multiple of the average don't count as healthy
+AIMD_LATENCY_SMOOTHING = 0.2  # Weight of the newest response in the average latency
+
+class ConcurrencyController:
+    """
+    Global AIMD limit on the number of absolute URL checks in flight.
+    
+    Checks call acquire() and release() around their work; responses and
+    failures of the requests they make are reported from resolve_url and
+    check_absolute_url. After `limit` healthy responses in a row the limit grows
+    by one, and a congestion signal (timeout, connection failure, 429 or 5xx
+    overload) multiplies it by AIMD_DECREASE_FACTOR. Signals from checks that
+    started before the last decrease are ignored, so one burst of failures only
+    halves the limit once and the limit only grows again on fresh responses. Requests made outside acquire() (watch mode, the
+    daemon) are not counted.
+    """
+    def __init__(self):
+        self.adaptive = True
+        self.limit = CHECK_WORKERS
+        self.min_limit = 1
+        self.max_limit = CHECK_MAX_WORKERS
+        self.in_flight = 0
+        self.condition = threading.Condition()
+        self.local = threading.local()   # Start time of the check running in each thread
+        self.healthy_streak = 0
+        self.latency_average = None
+        self.last_decrease_at = 0.0
+        self.started_at = time.monotonic()
+        self.history = []                # (seconds since start, limit, reason) for the initial limit and every change
+        self.increases = 0
+        self.decreases = 0
+    
+    def configure(self, initial, max_limit, adaptive=True):
+        """Set the initial and maximum limit before the checks start."""
+        self.adaptive = adaptive
+        self.max_limit = max(initial, max_limit) if adaptive else initial
+        self.limit = initial
+        self.started_at = time.monotonic()
+        self.history = [(0.0, initial, 'initial')]
+    
+    def acquire(self):
+        """Wait until another check may start."""
+        with self.condition:
+            while self.in_flight >= self.limit and not STOP_EVENT.is_set():
+                self.condition.wait(0.5)
+            self.in_flight += 1
+        self.local.started_at = time.monotonic()
+    
+    def release(self):
+        """Mark a check as finished."""
+        self.local.started_at = None
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+    
+    def set_limit(self, limit, reason):
+        """Change the limit and record it (called with the condition held)."""
+        if limit == self.limit:
+            return
+        print(f"Concurrency limit: {self.limit} -> {limit} ({reason})")
+        self.limit = limit
+        self.history.append((round(time.monotonic() - self.started_at, 2), limit, reason))
+        self.condition.notify_all()
+    
+    def record_response(self, latency):
+        """Record a response that was not a temporary error."""
+        started_at = getattr(self.local, 'started_at', None)
+        if not self.adaptive or started_at is None:
+            return
+        with self.condition:
+            if started_at < self.last_decrease_at:
+                return  # Sent at the old limit, so it says nothing about the new one
+            average = self.latency_average
+            self.latency_average = latency if average is None else (
+                average + AIMD_LATENCY_SMOOTHING * (latency - average))
+            if average is not None and latency > average * AIMD_LATENCY_FACTOR:
+                return  # Not congestion, but no reason to add load either
+            self.healthy_streak += 1
+            if self.healthy_streak >= self.limit and self.limit < self.max_limit:
+                self.healthy_streak = 0
+                self.increases += 1
+                self.set_limit(self.limit + 1, f"{self.limit} healthy responses")
+    
+    def record_congestion(self, reason):
+        """Record a timeout, connection failure or overload response."""
+        started_at = getattr(self.local, 'started_at', None)
+        if not self.adaptive or started_at is None:
+            return
+        with self.condition:
+            self.healthy_streak = 0
+            if started_at < self.last_decrease_at:
+                return  # Sent before the last decrease took effect
+            self.last_decrease_at = time.monotonic()
+            new_limit = max(self.min_limit, int(self.limit * AIMD_DECREASE_FACTOR))
+            if new_limit < self.limit:
+                self.decreases += 1
+            self.set_limit(new_limit, reason)
+    
+    def print_report(self):
+        """Print how the concurrency limit changed over the run."""
+        if len(self.history) < 2:
+            return
+        limits = [limit for _, limit, _ in self.history]
+        print(f"{Colors.INFO}🎚️  CONCURRENCY: started at {limits[0]}, ranged {min(limits)}-{max(limits)}, ended at {limits[-1]} "
+              f"({self.increases} increases, {self.decreases} decreases; history in the log){Colors.ENDC}")
+        print()
+
+# Shared concurrency limit for the whole run
+CONCURRENCY = ConcurrencyController()
+
+def get_url_host(url):
+    """Get the lowercase host of a link, or an empty string if it cannot be parsed."""
+    try:
+        return (urlparse(url.strip('"\'').strip()).hostname or '').lower()
+    except ValueError:
+        return ''
+
+def schedule_urls(fan_in):
+    """
+    Order unique URLs by fan-in, interleaving their hosts.
+    
+    URLs are taken in rounds with at most one URL per host in each round, so
+    consecutive checks go to different hosts while any are left. Each host's URLs
+    are taken in order of fan-in, and each round is sorted by fan-in as well.
+    Ties keep the order the URLs were found in.
+    
+    Args:
+        fan_in: Dictionary of URL -> number of links referring to it, in the order the URLs were found
+        
+    Returns:
+        List of URLs in check order
+    """
+    by_host = {}
+    for position, (url, count) in enumerate(fan_in.items()):
+        by_host.setdefault(get_url_host(url), []).append((-count, position, url))
+    queues = [deque(sorted(entries)) for entries in by_host.values()]
+    
+    order = []
+    while queues:
+        round_entries = sorted(queue.popleft() for queue in queues)
+        order.extend(url for _, _, url in round_entries)
+        queues = [queue for queue in queues if queue]
+    return order
+
+class CheckScheduler:
+    """
+    Check the links of a run: offline links first, then unique absolute URLs in priority order.
+    
+    Links are grouped by their normalized URL (see normalize_url), so variants
+    such as a trailing ")" or a tracking parameter are one task. Every link of
+    a URL is checked by the worker that owns the URL, one after another, with
+    the text it was written with: the first check does the network request and
+    the others reuse the memoized result, so each link still gets its own log
+    entry and per-directory skip rules. Results are yielded in schedule order, followed by
+    the results of retried URLs, and the pending checks are cancelled when the
+    caller stops early.
+    
+    URLs in `priority_urls` (e.g. the ones deferred by the last time-budgeted
+    run) are scheduled before all others. Once the time budget no longer allows
+    new checks, the remaining URLs are not checked and are listed in `deferred`.
+    
+    Args:
+        links: List of (file_path, url) tuples
+        workers: Number of unique absolute URLs checked concurrently
+        priority_urls: Normalized URLs to check before all others
+    """
+    def __init__(self, links, workers=CHECK_WORKERS, priority_urls=()):
+        self.workers = max(1, workers)
+        self.offline_links = []
+        self.url_links = {}   # Normalized URL -> (file_path, url) of the links to it, in the order they were found
+        variants = set()
+        for file_path, url in links:
+            if is_absolute_link(url):
+                self.url_links.setdefault(normalize_url(url), []).append((file_path, url))
+                variants.add(url)
+            else:
+                self.offline_links.append((file_path, url))
+        self.saved_requests = len(variants) - len(self.url_links)  # Variants that share another's request
+        priority_urls = set(priority_urls)
+        fan_in = {url: len(url_links) for url, url_links in self.url_links.items()}
+        self.priority_count = sum(1 for url in fan_in if url in priority_urls)
+        self.order = (schedule_urls({url: count for url, count in fan_in.items() if url in priority_urls})
+                      + schedule_urls({url: count for url, count in fan_in.items() if url not in priority_urls}))
+        self.checked_urls = set()  # URLs whose links were all checked
+        self.deferred = []         # URLs not checked because the time budget ran out
+        self.retry_queue = []      # Heap of (ready_at, sequence, url, attempt) for transient failures
+        self.retried = {}          # URL -> number of times it was put in the retry queue
+        self.recovered = 0         # Retried URLs that ended up OK
+    
+    def describe(self):
+        """Describe the schedule for the console."""
+        if not self.order:
+            return f"Checking {len(self.offline_links)} offline links"
+        hosts = len(set(get_url_host(url) for url in self.order))
+        top_url = self.order[self.priority_count] if self.priority_count < len(self.order) else self.order[0]
+        priority_info = f", {self.priority_count} deferred last run checked first" if self.priority_count else ""
+        workers = f"{self.workers}-{CONCURRENCY.max_limit} adaptive" if CONCURRENCY.adaptive else self.workers
+        return (f"Checking {len(self.offline_links)} offline links, then {len(self.order)} unique URLs on {hosts} hosts "
+                f"with {workers} workers (most referenced: {top_url}, {len(self.url_links[top_url])} links{priority_info})")
+    
+    def check_url(self, url, attempt=0):
+        """
+        Check every link to an absolute URL.
+        
+        Only the first link that is actually checked may be put in the retry
+        queue; the others are checked with a single, final attempt, since they
+        normally reuse its memoized result.
+        
+        Args:
+            url: URL to check
+            attempt: Zero-based attempt to start at
+            
+        Returns:
+            List of (file_path, link_url, result) tuples, where result is the value of check_link,
+            None if the time budget left no room to check the URL (or to retry a transient
+            failure, see CheckDeferred), or the RetryLater exception if the URL should be
+            retried later. Links whose check was interrupted are left out, so they stay
+            pending for --resume
+        """
+        if not TIME_BUDGET.can_start():
+            return None
+        CONCURRENCY.acquire()
+        try:
+            results = []
+            for file_path, link_url in self.url_links[url]:
+                if STOP_EVENT.is_set():
+                    break
+                first_check = all(result is None for _, _, result in results)
+                try:
+                    result = check_link(link_url, file_path, attempt if first_check else CHECK_RETRIES - 1)
+                except RetryLater as retry:
+                    return retry
+                except CheckDeferred as deferred:
+                    if INTERRUPTED.is_set():
+                        print(f"{Colors.NEUTRAL}Left {url} pending for --resume ({deferred.reason}, interrupted){Colors.ENDC}")
+                        return results
+                    print(f"{Colors.NEUTRAL}Deferred {url} to the next run ({deferred.reason}, time budget exhausted){Colors.ENDC}")
+                    return None
+                results.append((file_path, link_url, result))
+            return results
+        finally:
+            CONCURRENCY.release()
+    
+    def queue_retry(self, url, retry):
+        """Put a URL in the retry queue."""
+        import heapq
+        self.retried[url] = self.retried.get(url, 0) + 1
+        ready_at = time.monotonic() + retry.delay
+        heapq.heappush(self.retry_queue, (ready_at, sum(self.retried.values()), url, retry.attempt))
+        print(f"Queued {url} for retry {retry.attempt}/{CHECK_RETRIES - 1} in {retry.delay:.1f}s ({retry.reason})")
+    
+    def submit_due_retries(self, executor, futures):
+        """Submit the queued retries whose delay has passed."""
+        import heapq
+        now = time.monotonic()
+        while self.retry_queue and self.retry_queue[0][0] <= now:
+            _, _, url, attempt = heapq.heappop(self.retry_queue)
+            futures.append((url, executor.submit(self.check_url, url, attempt)))
+    
+    def run(self):
+        """
+        Check all links.
+        
+        Yields:
+            Tuple containing: (file_path, url, result) where result is the value of check_link
+        """
+        for file_path, url in self.offline_links:
+            if STOP_EVENT.is_set():
+                return
+            yield file_path, url, check_link(url, file_path)
+        if not self.order or STOP_EVENT.is_set():
+            return
+        
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=min(max(self.workers, CONCURRENCY.max_limit), len(self.order)))
+        futures = deque((url, executor.submit(self.check_url, url)) for url in self.order)
+        try:
+            while futures or self.retry_queue:
+                self.submit_due_retries(executor, futures)
+                if not futures:
+                    # Only retries that are not due yet are left - wait for the first one
+                    ready_at = self.retry_queue[0][0]
+                    if not TIME_BUDGET.can_start(ready_at):
+                        self.deferred.extend(url for _, _, url, _ in sorted(self.retry_queue))
+                        self.retry_queue.clear()
+                        break
+                    if STOP_EVENT.wait(max(0.0, ready_at - time.monotonic())):
+                        break
+                    continue
+                url, future = futures.popleft()
+                url_results = future.result()
+                if url_results is None:
+                    self.deferred.append(url)
+                    continue
+                if isinstance(url_results, RetryLater):
+                    self.queue_retry(url, url_results)
+                    continue
+                for file_path, link_url, result in url_results:
+                    yield file_path, link_url, result
+                    if url in self.retried and result and not is_broken_category(result[0]):
+                        self.recovered += 1
+                if len(url_results) == len(self.url_links[url]):
+                    self.checked_urls.add(url)
+        finally:
+            # Stopping early (--fail-fast, or the caller closing the generator) drops the checks that haven't started
+            for _, future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+    
+    def get_files(self, url):
+        """Get the files that link to a normalized URL."""
+        return list(dict.fromkeys(file_path for file_path, _ in self.url_links[url]))
+    
+    def print_report(self):
+        """Print how many requests URL normalization saved and how transient failures were retried."""
+        if self.saved_requests:
+            print(f"{Colors.INFO}🧹  URL NORMALIZATION: {len(self.url_links) + self.saved_requests} URL variants checked as "
+                  f"{len(self.url_links)} normalized URLs ({self.saved_requests} requests saved){Colors.ENDC}")
+            print()
+        if self.retried:
+            print(f"{Colors.INFO}🔁  RETRY QUEUE: {len(self.retried)} URLs with transient failures retried after a backoff "
+                  f"({sum(self.retried.values())} retries, {self.recovered} links recovered){Colors.ENDC}")
+            print()
+
+# =============================================================================
+# TIME BUDGET
+# =============================================================================
+# With --time-budget, no new absolute URL check is started once the remaining
+# time is only enough for the checks in flight, and retries stop at the
+# deadline. URLs that were not reached are written to a deferred file and are
+# checked before all others on the next run, so consecutive budgeted runs work
+# through the whole backlog. The report is always written.
+# =============================================================================
+
+DEFERRED_FORMAT_VERSION = 1
+DEFERRED_FILE = os.path.join(CACHE_DIR, 'deferred_urls.json')
+TIME_BUDGET_RESERVE_FRACTION = 0.25  # Never reserve more than this share of the budget for checks in flight
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+def parse_duration(value):
+    """
+    Parse a duration such as "90s", "5m", "1.5h" or a number of seconds.
+    
+    Returns:
+        Duration in seconds
+    """
+    text = value.strip().lower()
+    unit = DURATION_UNITS.get(text[-1:]) if text else None
+    try:
+        seconds = float(text[:-1] if unit else text) * (unit or 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid duration '{value}', expected e.g. 90s, 5m or 1h")
+    if seconds <= 0:
+        raise argparse.ArgumentTypeError(f"invalid duration '{value}', must be positive")
+    return seconds
+
+class TimeBudget:
+    """
+    Wall-clock budget of a run (--time-budget).
+    
+    A new check may only start while at least `reserve` seconds are left, which
+    is roughly the time a single request can take, so checks in flight finish
+    before the deadline.
+    """
+    def __init__(self):
+        self.seconds = None
+        self.deadline = None
+        self.reserve = 0
+    
+    def start(self, seconds, started_at):
+        """Start the budget, counting from a time.monotonic() timestamp."""
+        self.seconds = seconds
+        self.deadline = started_at + seconds
+        self.reserve = min(CONNECT_TIMEOUT + TIMEOUT, seconds * TIME_BUDGET_RESERVE_FRACTION)
+    
+    def is_exhausted(self):
+        """Check if the deadline has passed."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+    
+    def can_start(self, at=None):
+        """Check if there is still time to start a new check now (or at a later time.monotonic() timestamp)."""
+        return self.deadline is None or (time.monotonic() if at is None else at) < self.deadline - self.reserve
+
+# Shared time budget for the whole run
+TIME_BUDGET = TimeBudget()
+
+class DeferredUrls:
+    """
+    URLs a time-budgeted run did not reach, persisted for the next run.
+    
+    Entries of URLs that are checked are dropped, and entries of URLs outside
+    the scope of a run (another shard or directory) are kept, so the file
+    always holds every URL that is still waiting for a check.
+    
+    Args:
+        path: Deferred JSON file
+    """
+    def __init__(self, path=DEFERRED_FILE):
+        self.path = path
+        self.entries = {}   # URL -> {'url', 'files', 'deferred_at'}
+    
+    def load(self):
+        """Load the deferred URLs; a missing or unreadable file means nothing is deferred."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read deferred URLs {self.path}: {e}")
+            return
+        if data.get('version') != DEFERRED_FORMAT_VERSION:
+            print(f"Warning: Ignoring deferred URLs in an unsupported format: {self.path}")
+            return
+        self.entries = {entry['url']: entry for entry in data.get('urls', [])}
+    
+    def save(self, scheduler, timestamp):
+        """
+        Drop the URLs that were checked, add the ones that were deferred and write the file.
+        
+        The file is removed when nothing is left to check.
+        """
+        for url in scheduler.checked_urls:
+            self.entries.pop(url, None)
+        for url in scheduler.deferred:
+            previous = self.entries.get(url, {})
+            self.entries[url] = {'url': url, 'files': scheduler.get_files(url),
+                                 'deferred_at': previous.get('deferred_at', timestamp)}
+        try:
+            if not self.entries:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_file = f"{self.path}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': DEFERRED_FORMAT_VERSION, 'timestamp': timestamp,
+                           'urls': list(self.entries.values())}, f, indent=1)
+            os.replace(tmp_file, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write deferred URLs {self.path}: {e}")
+
+def print_time_budget_report(scheduler, deferred_path):
+    """Print how much of the run the time budget left unchecked."""
+    if TIME_BUDGET.seconds is None and not scheduler.priority_count:
+        return
+    if scheduler.deferred:
+        deferred_links = sum(len(scheduler.url_links[url]) for url in scheduler.deferred)
+        print(f"{Colors.NEUTRAL}⏳  TIME BUDGET: {len(scheduler.deferred)} of {len(scheduler.order)} unique URLs ({deferred_links} links) "
+              f"not checked within {format_runtime(TIME_BUDGET.seconds)} - deferred to the next run in {deferred_path}{Colors.ENDC}")
+    else:
+        print(f"{Colors.INFO}⏳  TIME BUDGET: all {len(scheduler.order)} unique URLs checked"
+              + (f" ({scheduler.priority_count} deferred by the last run)" if scheduler.priority_count else "") + f"{Colors.ENDC}")
+    print()
+
+# =============================================================================
+# CHECKPOINTS
+# =============================================================================
+# While links are checked, the completed results and the links still pending
+# are written to a checkpoint every few seconds. The first SIGINT or SIGTERM
+# stops the run gracefully: checks that haven't started are cancelled, retries
+# are abandoned, a final checkpoint and the partial report are written, and
+# --resume continues with the pending links. A second signal aborts at once.
+# =============================================================================
+
+CHECKPOINT_FORMAT_VERSION = 1
+CHECKPOINT_FILE = os.path.join(CACHE_DIR, 'checkpoint.json')
+CHECKPOINT_INTERVAL = 30  # Seconds between checkpoints while links are checked
+
+class InterruptHandler:
+    """
+    Turn the first SIGINT or SIGTERM into a graceful stop of the run.
+    
+    The stop is signalled through STOP_EVENT, which cancels the checks that
+    haven't started and stops retries, and INTERRUPTED, which makes checks that
+    would have been retried stay pending instead of being reported broken. A
+    second signal raises KeyboardInterrupt.
+    """
+    def __init__(self):
+        self.signal_name = None   # Name of the signal that stopped the run
+        self.previous = {}
+    
+    def handle(self, signum, frame):
+        """Signal handler."""
+        import signal
+        if self.signal_name:
+            raise KeyboardInterrupt
+        self.signal_name = signal.Signals(signum).name
+        INTERRUPTED.set()
+        STOP_EVENT.set()
+        print(f"{Colors.NEUTRAL}Interrupted by {self.signal_name} - finishing the checks in flight and writing a partial report "
+              f"(send it again to abort){Colors.ENDC}")
+    
+    def install(self):
+        """Install the handler for SIGINT and SIGTERM (only possible in the main thread)."""
+        import signal
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            self.previous[signum] = signal.signal(signum, self.handle)
+    
+    def restore(self):
+        """Restore the previous handlers."""
+        import signal
+        for signum, handler in self.previous.items():
+            signal.signal(signum, handler)
+        self.previous.clear()
+
+class RunCheckpoint:
+    """
+    Completed results and pending links of a run, saved periodically so the run can be resumed.
+    
+    Links are identified by (file, url); a link that appears several times in a
+    file is counted, so each occurrence is resumed once. The checkpoint is only
+    valid for the same scope (directory, shard and link kinds).
+    
+    Args:
+        path: Checkpoint JSON file to write
+        interval: Seconds between periodic checkpoints, 0 to only write one when interrupted
+        scope: Dictionary describing the links the run covers
+    """
+    def __init__(self, path=CHECKPOINT_FILE, interval=CHECKPOINT_INTERVAL, scope=None):
+        from collections import Counter
+        self.path = path
+        self.interval = interval
+        self.scope = scope or {}
+        self.done = Counter()          # (file, url) -> occurrences completed
+        self.records = []              # Records of completed links restored from a checkpoint
+        self.previous_runtime = 0.0    # Seconds spent by the runs before the resume
+        self.started_at = time.monotonic()
+        self.last_saved = time.monotonic()
+        self.saves = 0
+    
+    def load(self, path):
+        """
+        Load a checkpoint to resume from.
+        
+        Returns:
+            False if it could not be read or was written for a different scope
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"{Colors.FAIL}Error: Could not read checkpoint {path}: {e}{Colors.ENDC}")
+            return False
+        if data.get('version') != CHECKPOINT_FORMAT_VERSION:
+            print(f"{Colors.FAIL}Error: Unsupported checkpoint format in {path}{Colors.ENDC}")
+            return False
+        if data.get('scope') != self.scope:
+            print(f"{Colors.FAIL}Error: Checkpoint {path} was written for a different run ({data.get('scope')}){Colors.ENDC}")
+            return False
+        for file_path, url in data['completed']:
+            self.done[(file_path, url)] += 1
+        self.records = data['records']
+        self.previous_runtime = data.get('runtime_seconds', 0.0)
+        print(f"Resuming from {path}: {sum(self.done.values())} links already checked, "
+              f"{len(data.get('pending', []))} pending when it was written")
+        return True
+    
+    def filter_links(self, links):
+        """Drop the links that were completed before the resume."""
+        remaining = self.done.copy()
+        pending = []
+        for link in links:
+            if remaining[link] > 0:
+                remaining[link] -= 1
+            else:
+                pending.append(link)
+        return pending
+    
+    def mark_done(self, file_path, url):
+        """Record a completed link."""
+        self.done[(file_path, url)] += 1
+    
+    def save(self, records, links):
+        """Write the checkpoint atomically."""
+        remaining = self.done.copy()
+        pending = []
+        for link in links:
+            if remaining[link] > 0:
+                remaining[link] -= 1
+            else:
+                pending.append(list(link))
+        data = {
+            'version': CHECKPOINT_FORMAT_VERSION,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'scope': self.scope,
+            'runtime_seconds': self.previous_runtime + time.monotonic() - self.started_at,
+            'completed': [list(link) for link, count in self.done.items() for _ in range(count)],
+            'pending': pending,
+            'records': records,
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_file = f"{self.path}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.path)
+            self.saves += 1
+        except OSError as e:
+            print(f"Warning: Could not write checkpoint {self.path}: {e}")
+        self.last_saved = time.monotonic()
+    
+    def save_if_due(self, records, links):
+        """Write a checkpoint if the interval has passed since the last one."""
+        if self.interval and time.monotonic() - self.last_saved >= self.interval:
+            self.save(records, links)
+    
+    def remove(self):
+        """Remove the checkpoint once the run has completed."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Warning: Could not remove checkpoint {self.path}: {e}")
+
+# =============================================================================
+# SHARDING & MERGING
+# =============================================================================
+
+RESULTS_FORMAT_VERSION = 1
+
+def parse_shard(value):
+    """
+    Parse a --shard value of the form "i/N" (1-based).
+    
+    Returns:
+        Tuple containing: (index, count)
+    """
+    try:
+        index, count = (int(part) for part in value.split('/', 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected the form i/N (e.g. 1/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', index must be between 1 and {max(count, 1)}")
+    return index, count
+
+def get_shard_for_url(url, shard_count):
+    """
+    Get the 1-based shard a URL belongs to.
+    
+    The URL text is hashed (not the file it was found in), so every occurrence of
+    a URL lands in the same shard and shards never check the same URL twice.
+    Absolute URLs are normalized first, so their variants land together too.
+    """
+    if is_absolute_link(url):
+        url = normalize_url(url)
+    digest = hashlib.sha1(url.strip('"\'').encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % shard_count + 1
+
+def write_json_results(json_path, records, timestamp, runtime_seconds, shard=None, rule_hits=None, deferred=None):
+    """
+    Write machine-readable results so shard runs can be merged later.
+    
+    Args:
+        json_path: File to write
+        records: List of dicts with the file, url, category and log entry of every checked link
+        timestamp: Timestamp of the run
+        runtime_seconds: Runtime of the run in seconds
+        shard: Optional (index, count) tuple for sharded runs
+        rule_hits: Hit counts of the skip rules (see SkipRules.get_hit_counts)
+        deferred: List of dicts with the url and files of every URL the time budget left unchecked
+    """
+    data = {
+        'version': RESULTS_FORMAT_VERSION,
+        'timestamp': timestamp,
+        'runtime_seconds': runtime_seconds,
+        'shard': f"{shard[0]}/{shard[1]}" if shard else None,
+        'links': records,
+        'redirects': {url: list(target) for url, target in CANONICAL_URLS.items()},
+        'down_hosts': HOST_HEALTH.down_hosts,
+        'short_circuited': HOST_HEALTH.short_circuited,
+        'latency': {host: list(samples) for host, samples in HOST_LATENCY.samples.items()},
+        'skip_rule_hits': rule_hits or [],
+        'deferred': deferred or [],
+        'concurrency': [list(change) for change in CONCURRENCY.history],
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+    print(f"JSON results written to: {json_path}")
+
+def parse_merge_arguments(argv):
+    """Parse command-line arguments for the merge subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="url_checker.py merge",
+        description="Merge the JSON results of sharded runs into a single categorized report."
+    )
+    parser.add_argument(
+        "results",
+        nargs="+",
+        help="JSON result files written by sharded runs (--json-output)"
+    )
+    parser.add_argument(
+        "--json-output",
+        help="Also write the merged results as JSON to this file"
+    )
+    parser.add_argument(
+        "--max-broken",
+        type=parse_policy_gate,
+        action="append",
+        default=[],
+        metavar="GATE=N",
+        help="Allow up to N broken links for a gate before the merge fails (can be repeated, default: total=0)"
+    )
+    return parser.parse_args(argv)
+
+def merge_main(argv):
+    """Merge per-shard JSON results into the regular report and exit with its status."""
+    args = parse_merge_arguments(argv)
+    init_colors()
+    ensure_log_dir()
+    
+    results = new_results()
+    records = []
+    shards_seen = {}
+    rule_hits = {}  # (category, rule) -> hit count record, summed over all shards
+    deferred = []
+    runtime_seconds = 0.0
+    
+    for path in args.results:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"{Colors.FAIL}Error: Could not read results file {path}: {e}{Colors.ENDC}")
+            sys.exit(2)
+        if data.get('version') != RESULTS_FORMAT_VERSION:
+            print(f"{Colors.FAIL}Error: Unsupported results format in {path}{Colors.ENDC}")
+            sys.exit(2)
+        
+        print(f"Merging {len(data['links'])} results from {path} (shard {data.get('shard') or 'n/a'})")
+        if data.get('shard'):
+            shards_seen.setdefault(data['shard'], []).append(path)
+        
+        for record in data['links']:
+            results[record['category']].append(record['entry'])
+            records.append(record)
+        for url, target in data.get('redirects', {}).items():
+            CANONICAL_URLS[url] = tuple(target)
+        HOST_HEALTH.down_hosts.update(data.get('down_hosts', {}))
+        for host, count in data.get('short_circuited', {}).items():
+            HOST_HEALTH.short_circuited[host] = HOST_HEALTH.short_circuited.get(host, 0) + count
+        for host, samples in data.get('latency', {}).items():
+            for latency in samples:
+                HOST_LATENCY.record(host, latency)
+        for rule in data.get('skip_rule_hits', []):
+            key = (rule['category'], rule['rule'])
+            if key in rule_hits:
+                rule_hits[key]['hits'] += rule['hits']
+            else:
+                rule_hits[key] = dict(rule)
+        deferred.extend(data.get('deferred', []))
+        # Shards run in parallel, so the slowest one determines the wall-clock time
+        runtime_seconds = max(runtime_seconds, data.get('runtime_seconds', 0.0))
+    
+    # Warn about duplicate or missing shards so a partial merge isn't mistaken for a full one
+    for shard, paths in sorted(shards_seen.items()):
+        if len(paths) > 1:
+            print(f"{Colors.NEUTRAL}Warning: Shard {shard} appears in multiple files: {', '.join(paths)}{Colors.ENDC}")
+    shard_counts = {int(shard.split('/')[1]) for shard in shards_seen}
+    if len(shard_counts) > 1:
+        print(f"{Colors.NEUTRAL}Warning: Results come from runs with different shard counts: {sorted(shard_counts)}{Colors.ENDC}")
+    for count in shard_counts:
+        missing = [f"{index}/{count}" for index in range(1, count + 1) if f"{index}/{count}" not in shards_seen]
+        if missing:
+            print(f"{Colors.NEUTRAL}Warning: Missing results for shards: {', '.join(missing)}{Colors.ENDC}")
+    
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    log_path = os.path.join(LOG_DIR, f'broken_urls_{timestamp}.log')
+    write_log_report(log_path, results, timestamp, runtime_seconds)
+    write_skip_rule_hits(log_path, list(rule_hits.values()))
+    if args.json_output:
+        write_json_results(args.json_output, records, timestamp, runtime_seconds, rule_hits=list(rule_hits.values()),
+                           deferred=deferred)
+    
+    print_report(results, log_path, timestamp, runtime_seconds)
+    print_skip_rule_hits(list(rule_hits.values()))
+    if deferred:
+        print(f"{Colors.NEUTRAL}⏳  TIME BUDGET: {len(deferred)} unique URLs were deferred by the time budget and not checked{Colors.ENDC}")
+        print()
+    
+    # Exit with the status of the failure policy
+    policy = FailurePolicy(args.max_broken)
+    policy.record_all(record['category'] for record in records)
+    sys.exit(0 if policy.print_report() else 1)
+
+# =============================================================================
+# WATCH MODE
+# =============================================================================
+
+WATCH_POLL_INTERVAL = 0.5  # Seconds between scans when watchdog is not installed
+WATCH_DEBOUNCE = 0.05      # Seconds to wait for more events after a change, so one save is one re-check
+
+def get_link_target(url, file_path):
+    """
+    Get the local path a relative link points to, normalized for index lookups.
+    
+    Paths are lower-cased because links are also resolved case-insensitively.
+    
+    Returns:
+        Normalized path, or None for absolute, email and same-file anchor links
+    """
+    url = url.strip('"\'')
+    if urlparse(url).scheme:
+        return None
+    base_url = url.split('#', 1)[0]
+    if not base_url:
+        return None
+    if base_url.startswith('/'):
+        path = os.path.join(get_repo_path(), base_url[1:])
+    else:
+        path = os.path.join(os.path.dirname(file_path), base_url)
+    return normalize_watch_path(path)
+
+def normalize_watch_path(path):
+    """Normalize a path for index lookups."""
+    return os.path.normcase(os.path.normpath(os.path.abspath(path))).lower()
+
+class LinkIndex:
+    """
+    In-memory index of the links in every watched file and their latest results.
+    
+    A reverse index from link targets to the files linking to them lets a change
+    to one file re-check only the files whose links may have changed outcome.
+    """
+    
+    def __init__(self):
+        self.links_by_file = {}     # File -> list of URLs extracted from it
+        self.results_by_file = {}   # File -> {url: (category, log_entry) or None if skipped}
+        self.targets_by_file = {}   # File -> set of normalized local paths it links to
+        self.linked_from = {}       # Normalized local path -> set of files linking to it
+    
+    def set_links(self, file_path, urls):
+        """Record the links in a file and update the reverse index."""
+        self.remove_file(file_path, keep_results=True)
+        self.links_by_file[file_path] = urls
+        targets = {target for target in (get_link_target(url, file_path) for url in urls) if target}
+        self.targets_by_file[file_path] = targets
+        for target in targets:
+            self.linked_from.setdefault(target, set()).add(file_path)
+    
+    def remove_file(self, file_path, keep_results=False):
+        """Drop a file's links from the index."""
+        self.links_by_file.pop(file_path, None)
+        if not keep_results:
+            self.results_by_file.pop(file_path, None)
+        for target in self.targets_by_file.pop(file_path, set()):
+            sources = self.linked_from.get(target)
+            if sources:
+                sources.discard(file_path)
+                if not sources:
+                    del self.linked_from[target]
+    
+    def get_dependents(self, path):
+        """Get the files linking to a path or to any directory containing it."""
+        dependents = set()
+        current = normalize_watch_path(path)
+        while True:
+            dependents.update(self.linked_from.get(current, ()))
+            parent = os.path.dirname(current)
+            if parent == current:
+                return dependents
+            current = parent
+    
+    def check_file(self, file_path):
+        """
+        Check every link in a file, reusing previous results for absolute URLs.
+        
+        Relative links are always re-checked since they only touch the filesystem.
+        """
+        previous = self.results_by_file.get(file_path, {})
+        results = {}
+        for url in self.links_by_file.get(file_path, []):
+            if url in results:
+                continue
+            if url in previous and is_absolute_link(url):
+                results[url] = previous[url]
+            else:
+                results[url] = check_link(url, file_path)
+        self.results_by_file[file_path] = results
+        return results
+    
+    def broken_files(self):
+        """Get the number of broken links and of files containing them."""
+        broken_links = 0
+        broken_files = 0
+        for results in self.results_by_file.values():
+            count = sum(1 for result in results.values() if result and is_broken_category(result[0]))
+            broken_links += count
+            broken_files += 1 if count else 0
+        return broken_links, broken_files
+
+def make_watch_filter(root, exclude_folders, skip_hidden):
+    """
+    Build a predicate that tells whether a path is a file the checker would scan,
+    matching find_files_to_check (skip_hidden=True) or find_files_in_directory.
+    """
+    abs_exclude_folders = [os.path.normpath(folder if os.path.isabs(folder) else os.path.join(root, folder))
+                           for folder in exclude_folders or []]
+    
+    def is_watched(path):
+        if os.path.splitext(path)[1].lower() not in SUPPORTED_FILE_TYPES:
+            return False
+        directory = os.path.dirname(os.path.abspath(path))
+        if any(directory.startswith(excluded) for excluded in abs_exclude_folders):
+            return False
+        if skip_hidden:
+            relative_dir = os.path.relpath(directory, root)
+            if relative_dir.startswith('..'):
+                return False
+            parts = [] if relative_dir == '.' else relative_dir.split(os.sep)
+            if any(part.lower() == 'archive' or part.startswith('.') for part in parts):
+                return False
+        return True
+    
+    return is_watched
+
+class PollingWatcher:
+    """Detect file changes by periodically comparing size and modification time."""
+    
+    def __init__(self, root, interval):
+        self.root = root
+        self.interval = interval
+        self.snapshot = self.scan()
+    
+    def scan(self):
+        """
+        Get (size, mtime_ns) for every file under the root.
+        
+        Files that are not checked themselves are included too, since links
+        to them (e.g. images) change outcome when they are added or removed.
+        """
+        snapshot = {}
+        for directory, dirs, files in os.walk(self.root):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in files:
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+    
+    def wait_for_changes(self):
+        """Block until watched files are added, removed or modified and return their paths."""
+        while True:
+            time.sleep(self.interval)
+            snapshot = self.scan()
+            changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed:
+                return changed
+    
+    def stop(self):
+        pass
+
+class WatchdogWatcher:
+    """Receive file change events from the operating system (inotify, FSEvents, ...) via watchdog."""
+    
+    def __init__(self, root):
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+        
+        self.changes = set()
+        self.condition = threading.Condition()
+        watcher = self
+        
+        class ChangeHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.event_type in ('opened', 'closed_no_write'):
+                    return
+                with watcher.condition:
+                    watcher.changes.add(os.path.abspath(event.src_path))
+                    if getattr(event, 'dest_path', None):
+                        watcher.changes.add(os.path.abspath(event.dest_path))
+                    watcher.condition.notify()
+        
+        self.observer = Observer()
+        self.observer.schedule(ChangeHandler(), root, recursive=True)
+        self.observer.start()
+    
+    def wait_for_changes(self):
+        """Block until files change and return their paths."""
+        with self.condition:
+            while not self.changes:
+                self.condition.wait()
+        # Let the rest of a burst of events (e.g. an editor's save sequence) arrive
+        time.sleep(WATCH_DEBOUNCE)
+        with self.condition:
+            changed, self.changes = self.changes, set()
+        return changed
+    
+    def stop(self):
+        self.observer.stop()
+        self.observer.join()
+
+def create_watcher(root, interval):
+    """Create a watchdog-based watcher, falling back to polling if watchdog is not installed."""
+    try:
+        watcher = WatchdogWatcher(root)
+        print("Watching for file system events")
+        return watcher
+    except ImportError:
+        print(f"watchdog is not installed - polling for changes every {interval}s (pip install watchdog for instant updates)")
+        return PollingWatcher(root, interval)
+
+def recheck_changed_files(index, changed_paths, is_watched, extraction_cache):
+    """
+    Re-extract changed files and re-check the links in them and in files linking to them.
+    
+    Returns:
+        List of files that were re-checked
+    """
+    affected = set()
+    for path in changed_paths:
+        if path in index.links_by_file or is_watched(path):
+            if os.path.isfile(path):
+                index.set_links(path, extract_urls(path, extraction_cache))
+                affected.add(path)
+            else:
+                index.remove_file(path)
+                affected.discard(path)
+        # Links to this path (or to a directory containing it) may have changed outcome
+        affected.update(index.get_dependents(path))
+    
+    affected = sorted(file_path for file_path in affected if file_path in index.links_by_file)
+    for file_path in affected:
+        index.check_file(file_path)
+    return affected
+
+def print_watch_update(index, changed_paths, affected, is_watched, elapsed_seconds):
+    """Print the outcome of re-checking files after a change."""
+    print(f"\n{Colors.INFO}🔄  {len(changed_paths)} changed path(s): re-checked {len(affected)} file(s) "
+          f"in {elapsed_seconds * 1000:.0f} ms{Colors.ENDC}")
+    for path in sorted(changed_paths):
+        if is_watched(path) and not os.path.exists(path):
+            print(f"{Colors.NEUTRAL}🗑️   Removed: {path}{Colors.ENDC}")
+    for file_path in affected:
+        results = index.results_by_file.get(file_path, {})
+        broken = [entry for entry in (result for result in results.values() if result) if is_broken_category(entry[0])]
+        if broken:
+            print(f"{Colors.FAIL}❌  {file_path}: {len(broken)} broken link(s){Colors.ENDC}")
+            for _, log_entry in broken:
+                print(f"{Colors.FAIL}   {strip_ansi_escape_codes(log_entry)}{Colors.ENDC}")
+        else:
+            print(f"{Colors.OKGREEN}✅  {file_path}: {len(results)} link(s) OK{Colors.ENDC}")
+    broken_links, broken_files = index.broken_files()
+    color = Colors.FAIL if broken_links else Colors.OKGREEN
+    print(f"{color}Total: {broken_links} broken link(s) in {broken_files} file(s){Colors.ENDC}")
+
+def run_watch_mode(root, is_watched, links, records, interval, extraction_cache):
+    """
+    Keep the results of the first check in memory and re-check files as they change.
+    
+    Args:
+        root: Directory to watch
+        is_watched: Predicate telling whether a path is a file the checker scans
+        links: List of (file_path, url) tuples from the first check
+        records: Result records from the first check
+        interval: Seconds between scans when polling
+        extraction_cache: ExtractionCache to reuse, or None
+    """
+    index = LinkIndex()
+    urls_by_file = {}
+    for file_path, url in links:
+        urls_by_file.setdefault(file_path, []).append(url)
+    for file_path, urls in urls_by_file.items():
+        index.set_links(file_path, urls)
+    for record in records:
+        index.results_by_file.setdefault(record['file'], {})[record['url']] = (record['category'], record['entry'])
+    # Links that were skipped (emails, localhost, false positives) stay skipped
+    for file_path, urls in urls_by_file.items():
+        file_results = index.results_by_file.setdefault(file_path, {})
+        for url in urls:
+            file_results.setdefault(url, None)
+    
+    watcher = create_watcher(root, interval)
+    print(f"\n{Colors.INFO}👀  Watching {root} for changes (Ctrl+C to stop){Colors.ENDC}")
+    try:
+        while True:
+            changed_paths = watcher.wait_for_changes()
+            start = time.perf_counter()
+            get_skip_rules().reload_if_changed()
+            affected = recheck_changed_files(index, changed_paths, is_watched, extraction_cache)
+            if not affected and not any(path in index.links_by_file or is_watched(path) for path in changed_paths):
+                continue  # Nothing the checker cares about changed
+            print_watch_update(index, changed_paths, affected, is_watched, time.perf_counter() - start)
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        watcher.stop()
+        if extraction_cache is not None:
+            extraction_cache.save()
+
+# =============================================================================
+# DAEMON & CLIENT
+# =============================================================================
+
+DAEMON_HOST = '127.0.0.1'   # Only accept local connections by default
+DAEMON_PORT = 8765
+DAEMON_RESULT_TTL = 3600    # Seconds before memoized URL results and host state are dropped
+DAEMON_CHECK_WORKERS = 16   # Absolute URLs checked concurrently per daemon
+CLIENT_TIMEOUT = 300        # Seconds the client waits for the daemon to answer
+
+class CheckerDaemon:
+    """
+    Warm checker state shared by every request to the daemon.
+    
+    Absolute URL results are cached until the result TTL expires, and callers
+    asking for a URL that is already being checked wait for that check instead
+    of starting another one. Results are keyed by the skip rule matcher that
+    applies to the linking file as well as the URL, so per-directory skip rules
+    are honored. Relative links are always re-checked since they only touch the
+    filesystem.
+    """
+    
+    def __init__(self, result_ttl=DAEMON_RESULT_TTL):
+        from concurrent.futures import ThreadPoolExecutor
+        self.result_ttl = result_ttl
+        self.url_results = {}   # (SkipRuleMatcher, URL) -> (category, log_entry), or None if skipped
+        self.in_flight = {}     # (SkipRuleMatcher, URL) -> Future for checks that are running
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=DAEMON_CHECK_WORKERS)
+        self.extraction_cache = ExtractionCache(EXTRACTION_CACHE_FILE)
+        self.extraction_cache.load()
+        self.started_at = time.monotonic()
+        self.state_reset_at = self.started_at
+        self.stats = {'requests': 0, 'checked': 0, 'cached': 0, 'shared': 0}
+    
+    def expire_state(self):
+        """Drop memoized URL results, redirects and host state once they are older than the TTL."""
+        with self.lock:
+            if time.monotonic() - self.state_reset_at < self.result_ttl:
+                return
+            self.url_results.clear()
+            REDIRECT_MAP.clear()
+            RESOLVED_URLS.clear()
+            CANONICAL_URLS.clear()
+            HOST_HEALTH.reset()
+            GITHUB_TREES.reset()
+            self.state_reset_at = time.monotonic()
+            print("Expired cached URL results")
+    
+    def check_url(self, url, file_path=None, refresh=False):
+        """
+        Check an absolute URL, sharing the result with concurrent and later callers
+        whose files get the same skip rules.
+        
+        Args:
+            url: URL to check
+            file_path: File containing the link, or None for a URL given on its own
+            refresh: Check the URL again even if a cached result exists
+        
+        Returns:
+            Tuple containing: (result, source) where result is (category, log_entry) or
+            None if the URL is skipped, and source is "checked", "cached" or "shared"
+        """
+        from concurrent.futures import Future
+        key = (get_skip_rules().get_matcher(file_path), url)
+        with self.lock:
+            if not refresh and key in self.url_results:
+                self.stats['cached'] += 1
+                return self.url_results[key], 'cached'
+            future = self.in_flight.get(key)
+            if future is None:
+                future = self.in_flight[key] = Future()
+                owner = True
+            else:
+                self.stats['shared'] += 1
+                owner = False
+        
+        if not owner:
+            return future.result(), 'shared'
+        
+        try:
+            result = check_link(url, file_path)
+        except Exception as e:
+            with self.lock:
+                self.in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self.lock:
+            self.url_results[key] = result
+            self.in_flight.pop(key, None)
+            self.stats['checked'] += 1
+        future.set_result(result)
+        return result, 'checked'
+    
+    def check(self, files, urls, refresh=False):
+        """
+        Check the links in files and a list of URLs.
+        
+        Returns:
+            Dictionary with one record per checked link, skipped links and errors
+        """
+        self.expire_state()
+        get_skip_rules().reload_if_changed()
+        with self.lock:
+            self.stats['requests'] += 1
+        
+        links = []
+        errors = []
+        for file_path in files:
+            if not os.path.isfile(file_path):
+                errors.append(f"File not found: {file_path}")
+                continue
+            links.extend((file_path, url) for url in extract_urls(file_path, self.extraction_cache))
+        for url in urls:
+            if is_absolute_link(url):
+                links.append((None, url))
+            else:
+                errors.append(f"Not an absolute http(s) URL: {url}")
+        
+        # Check all absolute URLs concurrently, most referenced first; each is checked at most
+        # once per set of skip rules (files in directories with their own rules get their own check)
+        skip_rules = get_skip_rules()
+        fan_in = {}
+        url_files = {}  # URL -> {SkipRuleMatcher: first file it applies to}
+        for file_path, url in links:
+            if is_absolute_link(url):
+                fan_in[url] = fan_in.get(url, 0) + 1
+                url_files.setdefault(url, {}).setdefault(skip_rules.get_matcher(file_path), file_path)
+        futures = {(matcher, url): self.executor.submit(self.check_url, url, file_path, refresh)
+                   for url in schedule_urls(fan_in) for matcher, file_path in url_files[url].items()}
+        
+        records = []
+        skipped = 0
+        for file_path, url in links:
+            key = (skip_rules.get_matcher(file_path), url)
+            if key in futures:
+                result, source = futures[key].result()
+            else:
+                result, source = check_link(url, file_path), 'checked'
+            if result is None:
+                skipped += 1
+                continue
+            category, log_entry = result
+            records.append({'file': file_path, 'url': url, 'category': category,
+                            'entry': strip_ansi_escape_codes(log_entry), 'source': source})
+        return {'links': records, 'skipped': skipped, 'errors': errors}
+    
+    def status(self):
+        """Get statistics about the daemon."""
+        with self.lock:
+            return {
+                'uptime_seconds': round(time.monotonic() - self.started_at, 1),
+                'cached_urls': len(self.url_results),
+                'in_flight': len(self.in_flight),
+                'down_hosts': len(HOST_HEALTH.down_hosts),
+                **self.stats,
+            }
+
+def create_daemon_handler(daemon):
+    """Create the HTTP request handler class for a CheckerDaemon (http.server is imported on first use)."""
+    from http.server import BaseHTTPRequestHandler
+    
+    class DaemonRequestHandler(BaseHTTPRequestHandler):
+        """
+        HTTP API of the daemon:
+        
+            POST /check   {"files": [...], "urls": [...], "refresh": false} -> results
+            GET  /status  -> statistics
+        """
+        
+        checker = daemon
+        
+        def log_message(self, format, *args):
+            pass  # Link checks are already logged
+        
+        def send_json(self, status, data):
+            body = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def do_GET(self):
+            if self.path == '/status':
+                self.send_json(200, self.checker.status())
+            else:
+                self.send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+        
+        def do_POST(self):
+            if self.path != '/check':
+                self.send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                files = [str(path) for path in request.get('files', [])]
+                urls = [str(url) for url in request.get('urls', [])]
+            except (ValueError, AttributeError, TypeError) as e:
+                self.send_json(400, {'error': f"Invalid request: {e}"})
+                return
+            
+            start = time.perf_counter()
+            try:
+                response = self.checker.check(files, urls, bool(request.get('refresh')))
+            except Exception as e:
+                self.send_json(500, {'error': f"Check failed: {e}"})
+                return
+            response['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            self.send_json(200, response)
+    
+    return DaemonRequestHandler
+
+def parse_serve_arguments(argv):
+    """Parse command-line arguments for the serve subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="url_checker.py serve",
+        description="Run a long-lived checker daemon that keeps URL results, file indexes and connections warm."
+    )
+    parser.add_argument(
+        "--host",
+        default=DAEMON_HOST,
+        help=f"Address to listen on (default: {DAEMON_HOST})"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DAEMON_PORT,
+        help=f"Port to listen on (default: {DAEMON_PORT})"
+    )
+    parser.add_argument(
+        "--result-ttl",
+        type=float,
+        default=DAEMON_RESULT_TTL,
+        help=f"Seconds before cached URL results are checked again (default: {DAEMON_RESULT_TTL})"
+    )
+    parser.add_argument(
+        "--allow-local",
+        action="store_true",
+        help="Check localhost and IP-based URLs instead of skipping them"
+    )
+    parser.add_argument(
+        "--ca-bundle",
+        help="Extra CA certificates to trust for HTTPS URLs, in addition to the default CAs"
+    )
+    return parser.parse_args(argv)
+
+def serve_main(argv):
+    """Serve check requests until interrupted."""
+    args = parse_serve_arguments(argv)
+    init_colors()
+    
+    global CA_BUNDLE, ALLOW_LOCAL_URLS
+    if args.ca_bundle:
+        try:
+            CA_BUNDLE = build_ca_bundle(args.ca_bundle)
+        except ValueError as e:
+            print(f"{Colors.FAIL}Error: Invalid CA bundle {args.ca_bundle}: {e}{Colors.ENDC}")
+            sys.exit(2)
+    ALLOW_LOCAL_URLS = args.allow_local
+    
+    from http.server import ThreadingHTTPServer
+    checker = CheckerDaemon(args.result_ttl)
+    try:
+        server = ThreadingHTTPServer((args.host, args.port), create_daemon_handler(checker))
+    except OSError as e:
+        print(f"{Colors.FAIL}Could not listen on {args.host}:{args.port}: {e}{Colors.ENDC}")
+        sys.exit(1)
+    server.daemon_threads = True
+    
+    print(f"{Colors.OKGREEN}URL checker daemon listening on http://{args.host}:{args.port}/ (Ctrl+C to stop){Colors.ENDC}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping URL checker daemon")
+    finally:
+        server.server_close()
+        checker.extraction_cache.save()
+    sys.exit(0)
+
+def parse_client_arguments(argv):
+    """Parse command-line arguments for the client subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="url_checker.py client",
+        description="Check files or URLs using a running checker daemon (url_checker.py serve)."
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Files whose links should be checked"
+    )
+    parser.add_argument(
+        "--url",
+        action="append",
+        default=[],
+        help="Absolute URL to check (can be repeated)"
+    )
+    parser.add_argument(
+        "--server",
+        default=f"http://{DAEMON_HOST}:{DAEMON_PORT}",
+        help=f"Address of the daemon (default: http://{DAEMON_HOST}:{DAEMON_PORT})"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-check absolute URLs even if the daemon has a cached result"
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print every link, not just broken ones"
+    )
+    parser.add_argument(
+        "--max-broken",
+        type=parse_policy_gate,
+        action="append",
+        default=[],
+        metavar="GATE=N",
+        help="Allow up to N broken links for a gate before the client fails (can be repeated, default: total=0)"
+    )
+    args = parser.parse_args(argv)
+    if not args.files and not args.url:
+        parser.error("nothing to check - pass files and/or --url")
+    return args
+
+def client_main(argv):
+    """Send files and URLs to the daemon, print the results and exit with the report status."""
+    import requests
+    args = parse_client_arguments(argv)
+    init_colors()
+    
+    payload = {
+        'files': [os.path.abspath(path) for path in args.files],
+        'urls': args.url,
+        'refresh': args.refresh,
+    }
+    try:
+        response = requests.post(f"{args.server.rstrip('/')}/check", json=payload, timeout=CLIENT_TIMEOUT)
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"{Colors.FAIL}Could not reach the URL checker daemon at {args.server}: {e}{Colors.ENDC}")
+        print("Start it with: python url_checker.py serve")
+        sys.exit(2)
+    if response.status_code != 200:
+        print(f"{Colors.FAIL}Daemon error: {data.get('error', response.status_code)}{Colors.ENDC}")
+        sys.exit(2)
+    
+    for error in data['errors']:
+        print(f"{Colors.NEUTRAL}{error}{Colors.ENDC}")
+    
+    broken = 0
+    sources = {}
+    for record in data['links']:
+        sources[record['source']] = sources.get(record['source'], 0) + 1
+        if is_broken_category(record['category']):
+            broken += 1
+            file_info = f" ({record['file']})" if record['file'] and record['file'] not in record['entry'] else ""
+            print(f"{Colors.FAIL}{record['entry']}{file_info}{Colors.ENDC}")
+        elif args.verbose:
+            print(f"{Colors.OKGREEN}{record['entry']}{Colors.ENDC}")
+    
+    source_info = ", ".join(f"{count} {source}" for source, count in sorted(sources.items()))
+    color = Colors.FAIL if broken else Colors.OKGREEN
+    print(f"{color}{len(data['links'])} links checked in {data['elapsed_ms']:.0f} ms ({source_info or 'none'}), "
+          f"{data['skipped']} skipped, {broken} broken{Colors.ENDC}")
+    
+    # Only report the policy when it is more than "no broken links"
+    policy = FailurePolicy(args.max_broken)
+    policy.record_all(record['category'] for record in data['links'])
+    if args.max_broken:
+        print()
+        policy.print_report()
+    sys.exit(1 if policy.violations() else 0)
+
+# =============================================================================
+# MAIN EXECUTION
+# =============================================================================
+
+# Subcommands that take over argument parsing when given as the first argument
+SUBCOMMANDS = {
+    'merge': merge_main,
+    'serve': serve_main,
+    'client': client_main,
+}
+
+def main():
+    # Dispatch subcommands before parsing the regular arguments
+    if len(sys.argv) > 1 and sys.argv[1] in SUBCOMMANDS:
+        SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+        return
+    
+    # Parse arguments
+    args = parse_arguments()
+    init_colors()
+    ensure_log_dir()
+    
+    # Override timeout if provided
+    global TIMEOUT, CONNECT_TIMEOUT, MAX_READ_TIMEOUT
+    if args.timeout:
+        TIMEOUT = CONNECT_TIMEOUT = args.timeout
+        print(f"Using custom timeout: {TIMEOUT} seconds")
+    if args.connect_timeout:
+        CONNECT_TIMEOUT = args.connect_timeout
+    if args.read_timeout:
+        TIMEOUT = args.read_timeout
+    MAX_READ_TIMEOUT = max(TIMEOUT, args.max_read_timeout or MAX_READ_TIMEOUT)
+    HOST_LATENCY.enabled = not args.no_adaptive_timeout
+    print(f"Timeouts: connect {CONNECT_TIMEOUT}s, read {TIMEOUT}s"
+          + (f" (adaptive per host, up to {MAX_READ_TIMEOUT}s)" if HOST_LATENCY.enabled else ""))
+    
+    # Load the skip rules before anything is checked, so an invalid rules file fails fast
+    global SKIP_RULES
+    rules_file = args.rules or (SKIP_RULES_FILE if os.path.exists(SKIP_RULES_FILE) else None)
+    try:
+        SKIP_RULES = SkipRules(rules_file)
+    except ValueError as e:
+        print(f"{Colors.FAIL}Error: Invalid skip rules file {rules_file}: {e}{Colors.ENDC}")
+        sys.exit(2)
+    if rules_file:
+        print(f"Using skip rules from: {rules_file}")
+    
+    # Settings for checking against a local test server
+    global CA_BUNDLE, ALLOW_LOCAL_URLS, ENABLED_LINK_KINDS
+    if args.ca_bundle:
+        try:
+            CA_BUNDLE = build_ca_bundle(args.ca_bundle)
+        except ValueError as e:
+            print(f"{Colors.FAIL}Error: Invalid CA bundle {args.ca_bundle}: {e}{Colors.ENDC}")
+            sys.exit(2)
+        print(f"Verifying HTTPS URLs with the default CAs plus {args.ca_bundle}")
+    ALLOW_LOCAL_URLS = args.allow_local
+    GITHUB_TREES.enabled = not args.no_github_trees
+    for repository, path in args.github_clone:
+        GITHUB_TREES.add_clone(repository, path)
+    for host, sitemap_url in args.sitemap:
+        SITEMAPS.add_host(host, sitemap_url)
+    REMOTE_ANCHORS.enabled = args.check_fragments
+    REMOTE_ANCHORS.max_bytes = args.fragment_max_bytes
+    SITEMAPS.ttl = timedelta(hours=args.sitemap_ttl)
+    SITEMAPS.throttle_seconds = args.sitemap_throttle
+    if SITEMAPS.hosts:
+        SKIP_RULES.set_exempt_hosts(SITEMAPS.hosts)
+        print(f"Validating links against sitemaps for: {', '.join(SITEMAPS.hosts)}")
+    ENABLED_LINK_KINDS = set(args.only or LINK_KINDS)
+    if args.skip_external:
+        ENABLED_LINK_KINDS.discard('external')
+    if ENABLED_LINK_KINDS != set(LINK_KINDS):
+        print(f"Only checking: {', '.join(kind for kind in LINK_KINDS if kind in ENABLED_LINK_KINDS)}")
+    
+    # Results per category, plus one record per checked link for JSON output
+    results = new_results()
+    records = []
+    
+    # If a specific directory is provided, only check files there
+    if args.dir:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        test_dir = os.path.join(script_dir, args.dir)
+        print(f"Only checking files in test directory: {test_dir}")
+        files_to_check = find_files_in_directory(test_dir, args.exclude)
+    else:
+        files_to_check = find_files_to_check(args.exclude)
+    
+    # Create log file with timestamp
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    log_file_with_timestamp = os.path.join(LOG_DIR, f'broken_urls_{timestamp}.log')
+    
+    # Load the extraction cache so unchanged files skip I/O and regex work
+    extraction_cache = None
+    if not args.no_cache:
+        extraction_cache = ExtractionCache(args.cache_file)
+        extraction_cache.load()
+    
+    print(f"Starting URL check on {len(files_to_check)} files...")
+    start_time = datetime.now()
+    if args.time_budget:
+        TIME_BUDGET.start(args.time_budget, time.monotonic())
+        print(f"Time budget: {format_runtime(args.time_budget)} (no new checks in the last {TIME_BUDGET.reserve:g} seconds)")
+    
+    # Extract URLs from every file up front so all hosts are known before checking
+    links = []
+    for file_path in files_to_check:
+        file_ext = os.path.splitext(file_path)[1].lower()
+        file_type = SUPPORTED_FILE_TYPES.get(file_ext, 'Unknown')
+        print(f"Processing {file_type} file: {file_path}")
+        for url in extract_urls(file_path, extraction_cache):
+            links.append((file_path, url))
+    
+    # Persist the extraction cache for the next run, dropping files this run no longer covers
+    if extraction_cache is not None:
+        extraction_cache.prune()
+        extraction_cache.save()
+        print(f"Extraction cache: {extraction_cache.hits} files reused, {extraction_cache.misses} files scanned")
+    
+    # Keep only this shard's URLs when the run is split across CI jobs
+    if args.shard:
+        shard_index, shard_count = args.shard
+        total_links = len(links)
+        links = [(file_path, url) for file_path, url in links if get_shard_for_url(url, shard_count) == shard_index]
+        print(f"Shard {shard_index}/{shard_count}: checking {len(links)} of {total_links} links")
+    
+    if ENABLED_LINK_KINDS != set(LINK_KINDS):
+        # Drop unselected links up front so they are not even looked at
+        total_links = len(links)
+        links = [(file_path, url) for file_path, url in links if get_link_kind(url) in ENABLED_LINK_KINDS]
+        print(f"Skipping {total_links - len(links)} of {total_links} links not selected by --only/--skip-external")
+    
+    # Skip known broken external URLs whose re-check is not due, before their hosts are resolved
+    baseline = None
+    if args.baseline:
+        baseline = LinkBaseline(args.baseline, args.baseline_recheck_days)
+        if not baseline.load():
+            sys.exit(2)
+        links = [(file_path, url) for file_path, url in links if not baseline.skip(file_path, url)]
+        print(f"Baseline: {len(baseline.entries)} known broken links, skipping {baseline.skipped} "
+              f"not due for a re-check (every {args.baseline_recheck_days:g} days)")
+    
+    # Continue an interrupted run: restore its results and drop the links it already checked
+    checkpoint = RunCheckpoint(args.checkpoint, args.checkpoint_interval, {
+        'dir': args.dir,
+        'shard': f"{args.shard[0]}/{args.shard[1]}" if args.shard else None,
+        'link_kinds': sorted(ENABLED_LINK_KINDS),
+    })
+    if args.resume:
+        if not checkpoint.load(args.resume):
+            sys.exit(2)
+        links = checkpoint.filter_links(links)
+    
+    # Resolve DNS for all unique hosts concurrently so dead hosts fail fast
+    HOST_HEALTH.failure_threshold = args.host_failure_threshold
+    if 'external' in ENABLED_LINK_KINDS and not args.no_dns_preresolve:
+        HOST_HEALTH.preresolve(get_absolute_url_hosts(links))
+    
+    # Gate the exit status on the failure policy; offline links are checked
+    # first, so with --fail-fast a failing gate is usually found within milliseconds
+    policy = FailurePolicy(args.max_broken)
+    deferred_urls = DeferredUrls(args.deferred_file)
+    deferred_urls.load()
+    CONCURRENCY.configure(args.workers, args.max_workers, adaptive=not args.no_adaptive_concurrency)
+    scheduler = CheckScheduler(links, args.workers, deferred_urls.entries)
+    print(scheduler.describe())
+    checked_links = 0
+    for record in checkpoint.records:
+        results[record['category']].append(record['entry'])
+        records.append(record)
+        policy.record(record['category'])
+    
+    # Stop gracefully on SIGINT/SIGTERM so a partial report and a checkpoint are written
+    interrupts = InterruptHandler()
+    interrupts.install()
+    
+    # Process all files and URLs - write to log in real-time for monitoring
+    with open(log_file_with_timestamp, 'w', encoding='utf-8') as log:
+        log.write(f"URL Checker Results\n\n")
+        log.write(f"Log generated on: {timestamp}\n")
+        log.write("Processing URLs in real-time...\n\n")
+        log.flush()
+        last_flush = time.monotonic()
+        
+        check_results = scheduler.run()
+        for file_path, url, result in check_results:
+            checkpoint.save_if_due(records, links)
+            checkpoint.mark_done(file_path, url)
+            checked_links += 1
+            if result is None:
+                continue
+            category, log_entry = result
+            plain_entry = strip_ansi_escape_codes(log_entry)
+            if baseline is not None and baseline.suppress(file_path, url, category, plain_entry):
+                continue  # Known broken link that is still broken
+            results[category].append(log_entry)
+            records.append({'file': file_path, 'url': url, 'category': category, 'entry': plain_entry})
+            exceeded_gate = policy.record(category)
+            if exceeded_gate and args.fail_fast:
+                STOP_EVENT.set()
+                print(f"{Colors.FAIL}Stopping early (--fail-fast): {policy.describe(exceeded_gate)} exceeds the limit{Colors.ENDC}")
+                log.write(f"Stopped early (--fail-fast) after {checked_links} of {len(links)} links: {policy.describe(exceeded_gate)}\n")
+                log.write(plain_entry + "\n")
+                break
+            
+            # Write to log file (real-time monitoring, flushed a few times per second
+            # rather than per link, which dominated fast offline runs)
+            log.write(plain_entry + "\n")
+            if time.monotonic() - last_flush >= LOG_FLUSH_INTERVAL:
+                log.flush()
+                last_flush = time.monotonic()
+        check_results.close()
+        if interrupts.signal_name:
+            log.write(f"Interrupted by {interrupts.signal_name} after {checked_links} of {len(links)} links\n")
+    interrupts.restore()
+    
+    # Keep a checkpoint only if the run was interrupted
+    if interrupts.signal_name:
+        checkpoint.save(records, links)
+    else:
+        checkpoint.remove()
+    
+    # Calculate runtime
+    runtime_seconds = (datetime.now() - start_time).total_seconds() + checkpoint.previous_runtime
+    
+    # Write the log file with organized results
+    rule_hits = get_skip_rules().get_hit_counts()
+    write_log_report(log_file_with_timestamp, results, timestamp, runtime_seconds)
+    write_skip_rule_hits(log_file_with_timestamp, rule_hits)
+    write_concurrency_history(log_file_with_timestamp)
+    
+    # Write machine-readable results for merging shards
+    json_output = args.json_output
+    if args.shard and not json_output:
+        json_output = os.path.join(LOG_DIR, f'results_shard_{args.shard[0]}_of_{args.shard[1]}.json')
+    deferred_urls.save(scheduler, timestamp)
+    if json_output:
+        write_json_results(json_output, records, timestamp, runtime_seconds, args.shard, rule_hits,
+                           [{'url': url, 'files': scheduler.get_files(url)} for url in scheduler.deferred])
+    
+    # Print results to console
+    print_report(results, log_file_with_timestamp, timestamp, runtime_seconds)
+    print_skip_rule_hits(rule_hits)
+    if interrupts.signal_name:
+        print(f"{Colors.NEUTRAL}⏹️  INTERRUPTED ({interrupts.signal_name}): {len(links) - checked_links} of {len(links)} links not checked - "
+              f"continue with --resume {checkpoint.path}{Colors.ENDC}")
+        print()
+    elif STOP_EVENT.is_set():
+        print(f"{Colors.NEUTRAL}⏹️  STOPPED EARLY (--fail-fast): {len(links) - checked_links} of {len(links)} links not checked{Colors.ENDC}")
+        print()
+    scheduler.print_report()
+    CONCURRENCY.print_report()
+    print_time_budget_report(scheduler, args.deferred_file)
+    if baseline is not None:
+        baseline.print_report()
+        if args.update_baseline:
+            # Only drop entries of links that disappeared when every link of a file was looked at
+            complete_run = not (args.shard or STOP_EVENT.is_set() or scheduler.deferred or ENABLED_LINK_KINDS != set(LINK_KINDS))
+            baseline.save(records, files_to_check if complete_run else None)
+    passed = policy.print_report()
+    
+    # Keep checking files as they are saved
+    if args.watch:
+        if args.dir:
+            is_watched = make_watch_filter(test_dir, args.exclude, skip_hidden=False)
+        else:
+            is_watched = make_watch_filter(get_repo_path(), args.exclude, skip_hidden=True)
+        run_watch_mode(test_dir if args.dir else get_repo_path(), is_watched, links, records,
+                       args.watch_interval, extraction_cache)
+        sys.exit(0)
+    
+    # Exit with appropriate code
+    if interrupts.signal_name:
+        sys.exit(130 if interrupts.signal_name == 'SIGINT' else 143)  # 128 + signal number, like a killed process
+    if not passed:
+        sys.exit(1)  # Exit code 1 signals that the failure policy was not met
+    else:
+        sys.exit(0)  # Exit code 0 signals that all links are within the policy
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()